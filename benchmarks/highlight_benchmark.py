@@ -0,0 +1,82 @@
+"""Micro-benchmark: cost of moving the lyric highlight as lyrics get longer.
+
+Compares the old full-document sweep (tag_remove over 1.0..end for the
+highlight and every glow tag, plus update_idletasks) with LineHighlighter,
+which only retags the previous and the new line.
+
+Run from the repository root (needs a display):
+    python -m benchmarks.highlight_benchmark
+"""
+import argparse
+import time
+import tkinter as tk
+
+from ui.line_highlighter import LineHighlighter
+
+GLOW_TAGS = [f"glow_{i}" for i in range(10)]
+
+
+def build_text(root, line_count):
+    text = tk.Text(root, width=60, height=20, spacing1=15, spacing3=15)
+    text.pack()
+    for i in range(line_count):
+        text.insert(tk.END, f"Lyric line number {i} with a few more words\n\n")
+    text.tag_configure("current_line", foreground="#7CB7EB")
+    for tag in GLOW_TAGS:
+        text.tag_configure(tag, foreground="#FFFFFF")
+    text.config(state='disabled')
+    root.update()
+    return text
+
+
+def full_sweep(text, line_num):
+    """The highlight update used before LineHighlighter."""
+    text.config(state='normal')
+    text.tag_remove("current_line", "1.0", tk.END)
+    for tag in GLOW_TAGS:
+        text.tag_remove(tag, "1.0", tk.END)
+    text.tag_add("current_line", f"{line_num}.0", f"{line_num}.end")
+    text.tag_add(GLOW_TAGS[0], f"{line_num}.0", f"{line_num}.end")
+    text.see(f"{line_num}.0")
+    text.update_idletasks()
+    text.config(state='disabled')
+
+
+def incremental(highlighter, line_num):
+    start, end = highlighter.highlight(line_num)
+    highlighter.text.tag_add(GLOW_TAGS[0], start, end)
+
+
+def measure(step, line_count, repeats):
+    """Average milliseconds per highlight while walking through the song."""
+    positions = [1 + 2 * (i % line_count) for i in range(repeats)]
+    started = time.perf_counter()
+    for line_num in positions:
+        step(line_num)
+    return (time.perf_counter() - started) * 1000 / repeats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[50, 200, 1000, 5000])
+    parser.add_argument('--repeats', type=int, default=200)
+    args = parser.parse_args()
+
+    root = tk.Tk()
+    print(f"{'lines':>8} {'full sweep ms':>15} {'incremental ms':>15}")
+    for line_count in args.sizes:
+        text = build_text(root, line_count)
+        sweep_ms = measure(lambda line: full_sweep(text, line), line_count, args.repeats)
+        text.destroy()
+
+        text = build_text(root, line_count)
+        highlighter = LineHighlighter(text, "current_line", GLOW_TAGS)
+        incremental_ms = measure(lambda line: incremental(highlighter, line),
+                                 line_count, args.repeats)
+        text.destroy()
+        print(f"{line_count:>8} {sweep_ms:>15.3f} {incremental_ms:>15.3f}")
+    root.destroy()
+
+
+if __name__ == '__main__':
+    main()
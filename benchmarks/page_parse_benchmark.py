@@ -0,0 +1,104 @@
+"""Benchmark: extracting lyrics from Genius pages.
+
+Compares the previous BeautifulSoup html.parser extraction (a full tree
+plus up to three find passes) with the single-pass extractor, both
+scanning for every format and with the domain's remembered format.
+
+Point --pages at a directory of saved Genius pages (*.html); it defaults
+to the page saved under tests/fixtures. --synthetic adds a large page
+shaped like a current Genius page.
+
+Run from the repository root:
+    python -m benchmarks.page_parse_benchmark --pages saved_pages/
+"""
+import argparse
+import glob
+import os
+import time
+
+from utils.lyrics_page import extract_lyrics, LYRICS_FORMATS, NEWEST_FORMAT
+
+FIXTURE_PAGES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                             'tests', 'fixtures')
+
+
+def synthetic_page(blocks=3, lines=20):
+    """A page with Genius-sized scripts, navigation and split lyrics containers."""
+    head = '<html><head>' + ''.join(
+        f'<script>var data{i} = {{"k": "{"x" * 4000}"}};</script>' for i in range(20)) + '</head><body>'
+    nav = ''.join(f'<div class="nav"><a href="/p{i}">Link {i}</a><span>Item</span></div>'
+                  for i in range(400))
+    lyrics = ''.join(
+        '<div data-lyrics-container="true" class="Lyrics__Container-sc-1ynbvzw-1">'
+        f'[Verse {b + 1}]<br/>'
+        + '<br/>'.join(f'<a href="/a{b}-{n}"><span>Line {n} of block {b}</span></a>' for n in range(lines))
+        + '</div>' for b in range(blocks))
+    footer = ''.join(f'<div class="footer"><p>Comment {i} &amp; more</p></div>' for i in range(300))
+    return head + nav + lyrics + footer + '</body></html>'
+
+
+def bs4_extract(html):
+    """The extraction used before utils.lyrics_page."""
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(html, 'html.parser')
+    lyrics_div = soup.find("div", class_="lyrics")
+    if lyrics_div:
+        return lyrics_div.get_text()
+    lyrics_div = soup.find("div", class_="Lyrics__Container-sc-1ynbvzw-6")
+    if lyrics_div:
+        return lyrics_div.get_text()
+    lyrics_divs = soup.find_all("div", attrs={"data-lyrics-container": "true"})
+    if lyrics_divs:
+        return "\n".join(div.get_text() for div in lyrics_divs)
+    return None
+
+
+def measure(extract, pages, repeats):
+    """Average milliseconds per page."""
+    started = time.perf_counter()
+    for _ in range(repeats):
+        for html in pages:
+            extract(html)
+    return (time.perf_counter() - started) * 1000 / (repeats * len(pages))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--pages', default=FIXTURE_PAGES,
+                        help="directory of saved Genius pages (*.html)")
+    parser.add_argument('--synthetic', action='store_true',
+                        help="also time a large synthetic page")
+    parser.add_argument('--repeats', type=int, default=20)
+    args = parser.parse_args()
+
+    pages = []
+    for path in sorted(glob.glob(os.path.join(args.pages, '*.html'))):
+        with open(path, 'r', encoding='utf-8') as f:
+            pages.append(f.read())
+    if args.synthetic:
+        pages.append(synthetic_page())
+    if not pages:
+        print("No pages found")
+        return
+
+    # The format the fetcher would remember: whatever the first page used
+    preferred = extract_lyrics(pages[0])[0] or NEWEST_FORMAT
+    results = [
+        ('single pass, all formats', lambda html: extract_lyrics(html, LYRICS_FORMATS)),
+        (f'single pass, {preferred} only', lambda html: extract_lyrics(html, [preferred])),
+    ]
+    try:
+        import bs4  # noqa: F401  Only needed for the baseline
+        results.insert(0, ('BeautifulSoup html.parser', bs4_extract))
+    except ImportError:
+        print("beautifulsoup4 not installed; skipping the baseline")
+
+    size_kb = sum(len(html) for html in pages) / len(pages) / 1024
+    print(f"{len(pages)} page(s), {size_kb:.0f} KB on average")
+    print(f"{'extractor':>30} {'ms per page':>12}")
+    for name, extract in results:
+        print(f"{name:>30} {measure(extract, pages, args.repeats):>12.3f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+"""Record a live listening session into a replay fixture.
+
+Runs the headless sync engine against real Spotify and Genius for a while
+and saves every current_playback() and Genius response it saw. Lyrics are
+fetched into a throwaway cache so every track is recorded cold. Replay the
+fixture with benchmarks.replay_benchmark.
+
+Run from the repository root, with Spotify playing:
+    python -m benchmarks.record_session --seconds 600 --out session.json
+"""
+import argparse
+import tempfile
+import time
+
+from benchmarks.session import SessionRecorder
+from controllers.sync_engine import SyncEngine
+from lyrics_fetcher import GeniusLyricsFetcher
+from main import load_config, initialize_spotify
+from ui.terminal_renderer import TerminalRenderer
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--seconds', type=float, default=300, help="how long to record")
+    parser.add_argument('--out', default='session.json', help="fixture file to write")
+    args = parser.parse_args()
+
+    config = load_config()
+    if not config:
+        return
+    spotify_controller = initialize_spotify(config, None)
+    if not spotify_controller or not spotify_controller.is_authenticated():
+        print("Failed to initialize Spotify controller!")
+        return
+
+    recorder = SessionRecorder()
+    recorder.record_spotify(spotify_controller)
+    engine = None
+    with tempfile.TemporaryDirectory() as cache_dir:
+        try:
+            fetcher = GeniusLyricsFetcher(config['genius_access_token'], cache_dir=cache_dir)
+            recorder.record_http(fetcher)
+            engine = SyncEngine(TerminalRenderer())
+            engine.set_spotify_controller(spotify_controller)
+            engine.set_lyrics_fetcher(fetcher)
+            engine.start()
+            print(f"Recording for {args.seconds:.0f} s (Ctrl+C to stop early)...")
+            time.sleep(args.seconds)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            if engine:
+                engine.stop()
+            spotify_controller.cleanup()
+
+    playback_count, http_count = recorder.save(args.out)
+    print(f"Saved {playback_count} playback and {http_count} HTTP responses to {args.out}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,156 @@
+"""Replay a recorded session through the full pipeline and report metrics.
+
+The real SpotifyController poller, playback clock, sync engine and
+GeniusLyricsFetcher run against the recorded responses, at real speed or
+accelerated. Reports, as JSON:
+    lyrics_latency_ms   track change to lyrics (or a message) shown
+    highlight_lag_ms    true position minus the line's start when it is highlighted
+    requests_per_minute Spotify and Genius requests per session minute
+    frame_ms            time spent per sync engine frame (the work a UI frame adds)
+
+Times are in session time: real time multiplied by --speed.
+
+Run from the repository root:
+    python -m benchmarks.replay_benchmark --fixture session.json --speed 4
+"""
+import argparse
+import json
+import tempfile
+import threading
+import time
+
+from benchmarks.session import load_fixture, ReplayClock, ReplaySpotify, ReplaySpotifyController
+from controllers.sync_engine import SyncEngine, LyricsRenderer
+from lyrics_fetcher import GeniusLyricsFetcher
+from tests.support import ReplayHttpClient
+
+
+def summarize(values):
+    """Count, mean, p50, p95 and max of a list of numbers."""
+    if not values:
+        return {'count': 0}
+    values = sorted(values)
+    return {
+        'count': len(values),
+        'mean': round(sum(values) / len(values), 3),
+        'p50': round(values[len(values) // 2], 3),
+        'p95': round(values[min(len(values) - 1, int(len(values) * 0.95))], 3),
+        'max': round(values[-1], 3),
+    }
+
+
+class TimedSyncEngine(SyncEngine):
+    """SyncEngine that times each frame."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.frame_times = []
+
+    def tick(self):
+        started = time.perf_counter()
+        try:
+            super().tick()
+        finally:
+            self.frame_times.append((time.perf_counter() - started) * 1000)
+
+
+class MetricsRenderer(LyricsRenderer):
+    """Renderer that measures lyrics latency and highlight lag instead of drawing."""
+
+    def __init__(self, replay_spotify, speed):
+        self.replay_spotify = replay_spotify
+        self.speed = speed
+        self.engine = None
+        self.lock = threading.Lock()
+        self.track_started = None
+        self.lyrics_latency = []
+        self.highlight_lag = []
+
+    def show_track(self, track):
+        with self.lock:
+            self.track_started = time.monotonic()
+
+    def lyrics_ready(self):
+        with self.lock:
+            if self.track_started is not None:
+                self.lyrics_latency.append((time.monotonic() - self.track_started) * 1000 * self.speed)
+                self.track_started = None
+
+    def show_lyrics(self, lines):
+        self.lyrics_ready()
+
+    def show_message(self, message):
+        if message != "Loading lyrics...":
+            self.lyrics_ready()
+
+    def show_line(self, index):
+        track_id, true_ms = self.replay_spotify.true_position()
+        engine = self.engine
+        if true_ms is None or track_id != engine.current_track_id:
+            return
+        with engine.lock:
+            line_ms = engine.timing_index.line_start(index, engine.duration_ms())
+        self.highlight_lag.append(true_ms - line_ms)
+
+
+def fixture_duration(fixture):
+    times = [entry['t'] for entry in fixture['playback'] + fixture['http']]
+    return max(times) if times else 0.0
+
+
+def run(fixture, speed, duration=None):
+    """Replay a fixture and return the metrics."""
+    duration = duration or fixture_duration(fixture)
+    clock = ReplayClock(speed)
+    replay_spotify = ReplaySpotify(fixture['playback'], clock)
+    http = ReplayHttpClient(fixture['http'], speed)
+    renderer = MetricsRenderer(replay_spotify, speed)
+    engine = TimedSyncEngine(renderer)
+    renderer.engine = engine
+
+    controller = ReplaySpotifyController(replay_spotify, clock)
+    with tempfile.TemporaryDirectory() as cache_dir:
+        try:
+            engine.set_spotify_controller(controller)
+            engine.set_lyrics_fetcher(GeniusLyricsFetcher('replay', http_client=http,
+                                                          cache_dir=cache_dir))
+            engine.start()
+            time.sleep(duration / speed)
+        finally:
+            engine.stop()
+            controller.cleanup()
+
+    minutes = max(clock(), 1e-9) / 60
+    return {
+        'speed': speed,
+        'session_seconds': round(clock(), 1),
+        'tracks': engine.stats['tracks'],
+        'lyrics_latency_ms': summarize(renderer.lyrics_latency),
+        'highlight_lag_ms': summarize(renderer.highlight_lag),
+        'requests_per_minute': {
+            'spotify': round(replay_spotify.calls / minutes, 2),
+            'genius': round(http.requests / minutes, 2),
+        },
+        'unmatched_http_requests': http.unmatched,
+        'frame_ms': summarize(engine.frame_times),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--fixture', required=True, help="fixture written by benchmarks.record_session")
+    parser.add_argument('--speed', type=float, default=1.0, help="replay speed (1 = real time)")
+    parser.add_argument('--duration', type=float, help="session seconds to replay (default: all)")
+    parser.add_argument('--out', help="also write the JSON report to this file")
+    args = parser.parse_args()
+
+    report = run(load_fixture(args.fixture), args.speed, args.duration)
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as f:
+            f.write(output + '\n')
+
+
+if __name__ == '__main__':
+    main()
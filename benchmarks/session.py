@@ -0,0 +1,176 @@
+"""Record real Spotify and Genius responses, and replay them into the app.
+
+A fixture is a JSON file with two lists, each entry stamped with seconds
+since recording started:
+    playback: {"t", "response"}  - current_playback() results
+    http:     {"t", "url", "params", "status", "body", "elapsed"} - Genius GETs
+"""
+import copy
+import json
+import threading
+import time
+from bisect import bisect_right
+
+from controllers.spotify_controller import SpotifyController
+from utils.playback_clock import PlaybackClock
+
+
+class SessionRecorder:
+    """Collect responses from a live session into a fixture."""
+
+    def __init__(self):
+        self.started = time.monotonic()
+        self.lock = threading.Lock()
+        self.playback = []
+        self.http = []
+
+    def elapsed(self):
+        return time.monotonic() - self.started
+
+    def record_spotify(self, controller):
+        """Record every current_playback() the controller makes from now on."""
+        controller.sp = RecordingSpotify(controller.sp, self)
+
+    def record_http(self, fetcher):
+        """Record every HTTP GET a lyrics fetcher makes from now on."""
+        fetcher.http = RecordingHttpClient(fetcher.http, self)
+
+    def add(self, kind, entry):
+        with self.lock:
+            getattr(self, kind).append(entry)
+
+    def save(self, path):
+        with self.lock:
+            data = {'playback': list(self.playback), 'http': list(self.http)}
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+        return len(data['playback']), len(data['http'])
+
+
+class RecordingSpotify:
+    """spotipy client proxy that records current_playback() results."""
+
+    def __init__(self, sp, recorder):
+        self.sp = sp
+        self.recorder = recorder
+
+    def current_playback(self, *args, **kwargs):
+        t = self.recorder.elapsed()
+        response = self.sp.current_playback(*args, **kwargs)
+        self.recorder.add('playback', {'t': t, 'response': response})
+        return response
+
+    def __getattr__(self, name):
+        return getattr(self.sp, name)
+
+
+class RecordingHttpClient:
+    """HttpClient proxy that records GET responses."""
+
+    def __init__(self, http, recorder):
+        self.http = http
+        self.recorder = recorder
+
+    def get(self, url, params=None, **kwargs):
+        t = self.recorder.elapsed()
+        started = time.monotonic()
+        response = self.http.get(url, params=params, **kwargs)
+        self.recorder.add('http', {
+            't': t,
+            'url': url,
+            'params': params,
+            'status': response.status_code,
+            'body': response.text,
+            'elapsed': time.monotonic() - started,
+        })
+        return response
+
+    def __getattr__(self, name):
+        return getattr(self.http, name)
+
+
+def load_fixture(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+class ReplayClock:
+    """Seconds since replay start, running ``speed`` times faster than real time."""
+
+    def __init__(self, speed=1.0):
+        self.speed = speed
+        self.started = time.monotonic()
+
+    def __call__(self):
+        return (time.monotonic() - self.started) * self.speed
+
+
+class ReplaySpotify:
+    """Stand-in spotipy client answering from recorded playback.
+
+    Each call returns the latest recorded response, with the position
+    advanced by the time since it was recorded, as Spotify would report it.
+    """
+
+    def __init__(self, entries, clock):
+        self.entries = sorted(entries, key=lambda entry: entry['t'])
+        self.times = [entry['t'] for entry in self.entries]
+        self.clock = clock
+        self.calls = 0
+
+    def playback_at(self, t):
+        i = bisect_right(self.times, t) - 1
+        if i < 0:
+            return None
+        entry = self.entries[i]
+        response = copy.deepcopy(entry['response'])
+        if response and response.get('is_playing') and response.get('item'):
+            progress = response.get('progress_ms') or 0
+            progress += int((t - entry['t']) * 1000)
+            duration = response['item'].get('duration_ms') or progress
+            response['progress_ms'] = min(progress, duration)
+        return response
+
+    def true_position(self):
+        """(track_id, progress_ms) Spotify would report right now."""
+        playback = self.playback_at(self.clock())
+        if not playback or not playback.get('item'):
+            return None, None
+        return playback['item'].get('id'), playback.get('progress_ms') or 0
+
+    def current_playback(self):
+        self.calls += 1
+        return self.playback_at(self.clock())
+
+    def queue(self):
+        return {'queue': []}
+
+    def start_playback(self, *args, **kwargs):
+        pass
+
+    pause_playback = next_track = previous_track = start_playback
+
+
+class ReplaySpotifyController(SpotifyController):
+    """SpotifyController running its real poller against recorded playback."""
+
+    def __init__(self, replay_spotify, clock):
+        self.replay_spotify = replay_spotify
+        self.replay_clock = clock
+        super().__init__('replay', 'replay', 'http://localhost:8888/callback')
+
+    def initialize_spotify(self):
+        # No OAuth: answer from the fixture on the replay's time base
+        self.playback_clock = PlaybackClock(clock=self.replay_clock)
+        self.sp = self.replay_spotify
+        self.token_info = {'replay': True}
+
+    def poll_loop(self):
+        """Same schedule as the live poller, in replay time."""
+        while not self.poll_stopped.is_set():
+            ok = self.update_progress()
+            wait = self.playback_clock.seconds_until_sync()
+            if not ok:
+                wait = max(wait, self.playback_clock.min_sync_interval)
+            self.poll_wakeup.wait(wait / self.replay_clock.speed)
+            self.poll_wakeup.clear()
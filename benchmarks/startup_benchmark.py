@@ -0,0 +1,82 @@
+"""Startup benchmark: import time and time to first paint in a fresh process.
+
+Each run starts a new interpreter that imports main and the lyrics window,
+creates the window and paints it once, the way main() does before it
+connects to Spotify. Reports, as JSON:
+    process_ms      interpreter start to first paint, measured by the parent
+    import_ms       importing main and ui.lyrics_window
+    first_paint_ms  creating the window and painting it
+    heavy_modules   heavy dependencies already loaded at first paint (ideally none)
+
+Run from the repository root (first paint needs a display):
+    python -m benchmarks.startup_benchmark --runs 10
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ['PIL', 'bs4', 'requests', 'spotipy']
+
+CHILD = """
+import json, sys, time
+started = time.perf_counter()
+import main
+from ui.lyrics_window import LyricsWindow
+imported = time.perf_counter()
+result = {'import_ms': (imported - started) * 1000}
+try:
+    import tkinter as tk
+    root = tk.Tk()
+    LyricsWindow(root)
+    root.update()
+    result['first_paint_ms'] = (time.perf_counter() - imported) * 1000
+except tk.TclError as e:
+    result['error'] = str(e)
+result['heavy_modules'] = [m for m in %r if m in sys.modules]
+print(json.dumps(result))
+sys.stdout.flush()
+""" % HEAVY_MODULES
+
+
+def run_once():
+    started = time.perf_counter()
+    child = subprocess.run([sys.executable, '-c', CHILD], cwd=ROOT,
+                           capture_output=True, text=True)
+    elapsed = (time.perf_counter() - started) * 1000
+    lines = child.stdout.strip().splitlines()
+    if not lines:
+        raise RuntimeError(child.stderr.strip() or "startup run produced no output")
+    result = json.loads(lines[-1])
+    result['process_ms'] = elapsed
+    return result
+
+
+def median(values):
+    values = sorted(values)
+    return round(values[len(values) // 2], 1) if values else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    results = [run_once() for _ in range(args.runs)]
+    report = {
+        'runs': args.runs,
+        'process_ms': median([r['process_ms'] for r in results]),
+        'import_ms': median([r['import_ms'] for r in results]),
+        'first_paint_ms': median([r['first_paint_ms'] for r in results if 'first_paint_ms' in r]),
+        'heavy_modules': results[-1]['heavy_modules'],
+    }
+    if 'error' in results[-1]:
+        report['error'] = results[-1]['error']
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
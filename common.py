@@ -1,39 +1,228 @@
+import atexit
 import subprocess
-import re
+import threading
+import queue
+import time
+from collections import deque
 
 class LyricstifyFetcher:
-    def __init__(self, lyricstify_path):
+    """Long-lived Lyricstify ``pipe`` process whose output is streamed as events.
+
+    The child process is started once and supervised: if it exits it is
+    restarted with exponential backoff, unless it cannot be launched at all
+    or keeps exiting without output. Each stdout line becomes an event;
+    lines marked with a leading ``*`` are the line currently being sung.
+    Recorded lines belong to the track set with ``set_track`` and are
+    dropped when it changes.
+    """
+
+    def __init__(self, lyricstify_path, command=None, restart_delay=1.0,
+                 max_restart_delay=30.0, buffer_size=500, max_silent_exits=5):
         self.lyricstify_path = lyricstify_path
-    
-    def get_current_lyrics(self):
+        # Use the full path to cli.js with node
+        self.command = command or ["node", f"{lyricstify_path}/dist/cli.js", "pipe"]
+        self.restart_delay = restart_delay
+        self.max_restart_delay = max_restart_delay
+        self.max_silent_exits = max_silent_exits
+
+        self.lock = threading.Lock()
+        self.process = None
+        self.supervisor = None
+        self.stopped = threading.Event()
+        self.first_line = threading.Event()
+        self.subscribers = []
+        self.recent = deque(maxlen=buffer_size)
+        self.current_line = None
+        self.track_id = None
+        self.truncated = False
+        self.restarts = 0
+        self.failed = None  # Why the supervisor gave up, if it did
+        self.exit_hook = False
+
+    @staticmethod
+    def parse_line(line):
+        """Turn a raw output line into an event dict, or None for blank lines."""
+        clean_line = line.strip()
+        if not clean_line:  # Skip empty lines
+            return None
+        # Simple heuristic to detect current line
+        if clean_line.startswith('*'):
+            return {"type": "current_line", "text": clean_line.replace('*', '', 1).strip()}
+        return {"type": "line", "text": clean_line}
+
+    def start(self):
+        """Start the supervised child process if it is not running."""
+        with self.lock:
+            if self.failed or (self.supervisor and self.supervisor.is_alive()):
+                return
+            if not self.exit_hook:
+                atexit.register(self.stop)  # Never leave the child behind
+                self.exit_hook = True
+            self.stopped.clear()
+            self.supervisor = threading.Thread(target=self._supervise, daemon=True)
+            self.supervisor.start()
+
+    def stop(self):
+        """Stop the child process and its supervisor."""
+        self.stopped.set()
+        with self.lock:
+            process = self.process
+        if process and process.poll() is None:
+            process.terminate()
+            try:
+                process.wait(timeout=2)
+            except subprocess.TimeoutExpired:
+                process.kill()
+        self._publish(None)  # Wake up any waiting consumers
+
+    def _supervise(self):
+        """Run the child process, restarting it whenever it exits."""
+        delay = self.restart_delay
+        silent_exits = 0
+        while not self.stopped.is_set():
+            started = time.monotonic()
+            try:
+                process = subprocess.Popen(
+                    self.command,
+                    stdout=subprocess.PIPE,
+                    text=True,
+                    bufsize=1,  # Line buffered so events arrive as they are printed
+                    cwd=self.lyricstify_path  # Set working directory
+                )
+            except OSError as e:
+                # Missing node, script or directory: restarting cannot help
+                self._give_up(f"cannot start Lyricstify: {e}")
+                break
+            with self.lock:
+                self.process = process
+            if self.stopped.is_set():  # stop() ran before the process was visible
+                process.terminate()
+
+            printed = False
+            try:
+                for line in process.stdout:
+                    event = self.parse_line(line)
+                    if event:
+                        printed = True
+                        self._record(event)
+                        self._publish(event)
+                process.wait()
+            except Exception as e:
+                print(f"Error running Lyricstify: {e}")
+
+            if self.stopped.is_set():
+                break
+            silent_exits = 0 if printed else silent_exits + 1
+            if silent_exits >= self.max_silent_exits:
+                self._give_up(f"Lyricstify exited {silent_exits} times without output "
+                              f"(last exit code {process.returncode})")
+                break
+
+            # Back off on crash loops, start over once it ran for a while
+            if time.monotonic() - started > self.max_restart_delay:
+                delay = self.restart_delay
+            print(f"Lyricstify exited, restarting in {delay:.1f}s")
+            self.restarts += 1
+            self.stopped.wait(delay)
+            delay = min(delay * 2, self.max_restart_delay)
+
+    def set_track(self, track_id):
+        """Start a fresh buffer when Spotify moves to another track."""
+        with self.lock:
+            if track_id == self.track_id:
+                return
+            self.track_id = track_id
+            self.recent.clear()
+            self.current_line = None
+            self.truncated = False
+            self.first_line.clear()
+
+    def _give_up(self, reason):
+        """Stop supervising for good and wake up anyone waiting for lines."""
+        print(f"{reason}; Lyricstify disabled")
+        self.failed = reason
+        self.first_line.set()
+        self._publish(None)
+
+    def _record(self, event):
+        """Keep recent lines and the current line for snapshots."""
+        with self.lock:
+            if len(self.recent) == self.recent.maxlen:
+                self.truncated = True  # The start of the track has been dropped
+            self.recent.append(event)
+            if event["type"] == "current_line":
+                self.current_line = event["text"]
+        self.first_line.set()
+
+    def _publish(self, event):
+        """Hand an event to every active consumer."""
+        with self.lock:
+            subscribers = list(self.subscribers)
+        for subscriber in subscribers:
+            try:
+                subscriber.put_nowait(event)
+            except queue.Full:
+                # Slow consumer: drop its oldest event
+                try:
+                    subscriber.get_nowait()
+                    subscriber.put_nowait(event)
+                except (queue.Empty, queue.Full):
+                    pass
+
+    def events(self, timeout=None):
+        """Yield events as the child process prints them.
+
+        Stops when the fetcher is stopped or no event arrives within timeout.
+        """
+        self.start()
+        subscriber = queue.Queue(maxsize=1000)
+        with self.lock:
+            self.subscribers.append(subscriber)
         try:
-            # Use the full path to cli.js with node
-            process = subprocess.Popen(
-                ["node", f"{self.lyricstify_path}/dist/cli.js", "pipe"],
-                stdout=subprocess.PIPE,
-                text=True,
-                cwd=self.lyricstify_path  # Set working directory
-            )
-            
-            lyrics = []
-            
-            if process.stdout is None:
+            while not self.stopped.is_set():
+                try:
+                    event = subscriber.get(timeout=timeout)
+                except queue.Empty:
+                    return
+                if event is None:
+                    return
+                yield event
+        finally:
+            with self.lock:
+                self.subscribers.remove(subscriber)
+
+    def iter_lines(self, timeout=None):
+        """Yield lyric line texts as they are printed."""
+        for event in self.events(timeout):
+            yield event["text"]
+
+    def get_current_lyrics(self, wait=2.0):
+        """Return the recently printed lines, marking the current one."""
+        try:
+            self.start()
+            if self.failed:
                 return []
-            
-            for line in process.stdout:
-                clean_line = line.strip()
-                if clean_line:  # Skip empty lines
-                    # Simple heuristic to detect current line
-                    if clean_line.startswith('*'):
-                        current_line = clean_line.replace('*', '', 1).strip()
-                        lyrics.append({"text": current_line, "current": True})
-                    else:
-                        lyrics.append({"text": clean_line, "current": False})
-            
-            return lyrics
-            
+            self.first_line.wait(wait)
+            with self.lock:
+                return [{"text": event["text"], "current": event["type"] == "current_line"}
+                        for event in self.recent]
         except Exception as e:
             print(f"Error getting lyrics from Lyricstify: {e}")
             import traceback
             traceback.print_exc()
             return []
+
+    def get_track_lyrics(self, track_id, min_lines=10, wait=2.0):
+        """Return the lines printed for a track, or None if they cannot be the whole song.
+
+        Lines are only returned while ``track_id`` is the buffered track, the
+        buffer still holds its first line and it has at least ``min_lines``.
+        """
+        self.set_track(track_id)
+        lines = self.get_current_lyrics(wait)
+        with self.lock:
+            if self.track_id != track_id or self.truncated:
+                return None
+        if len(lines) < min_lines:
+            return None
+        return lines
@@ -0,0 +1,65 @@
+import threading
+
+# Event types published by the playback poller
+TRACK_CHANGED = 'track_changed'
+PROGRESS = 'progress'
+PAUSED = 'paused'
+RESUMED = 'resumed'
+SEEKED = 'seeked'
+
+EVENT_TYPES = (TRACK_CHANGED, PROGRESS, PAUSED, RESUMED, SEEKED)
+
+
+class PlaybackEvent:
+    """A playback change observed by a single Spotify poll."""
+
+    def __init__(self, type, track=None, progress_ms=0, duration_ms=0, is_playing=False):
+        self.type = type
+        self.track = track
+        self.progress_ms = progress_ms
+        self.duration_ms = duration_ms
+        self.is_playing = is_playing
+
+    def __repr__(self):
+        track_id = self.track.get('id') if self.track else None
+        return (f"PlaybackEvent({self.type!r}, track={track_id!r}, "
+                f"progress_ms={self.progress_ms}, is_playing={self.is_playing})")
+
+
+class PlaybackEventBus:
+    """Fan out playback events to subscribers by event type."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.subscribers = {event_type: [] for event_type in EVENT_TYPES}
+
+    def subscribe(self, event_type, callback):
+        """Register a callback(event) for an event type."""
+        if event_type not in self.subscribers:
+            raise ValueError(f"Unknown playback event type: {event_type}")
+        with self.lock:
+            if callback not in self.subscribers[event_type]:
+                self.subscribers[event_type].append(callback)
+        return callback
+
+    def unsubscribe(self, event_type, callback):
+        """Remove a previously registered callback."""
+        with self.lock:
+            if callback in self.subscribers.get(event_type, []):
+                self.subscribers[event_type].remove(callback)
+
+    def publish(self, event):
+        """Deliver an event to every subscriber of its type."""
+        with self.lock:
+            callbacks = list(self.subscribers.get(event.type, []))
+        for callback in callbacks:
+            try:
+                callback(event)
+            except Exception as e:
+                print(f"Error in {event.type} subscriber: {e}")
+
+    def clear(self):
+        """Drop all subscriptions."""
+        with self.lock:
+            for callbacks in self.subscribers.values():
+                callbacks.clear()
@@ -1,19 +1,38 @@
-import spotipy
-from spotipy.oauth2 import SpotifyOAuth
 import time
 import os
+import threading
+
+from controllers.playback_events import (
+    PlaybackEvent, PlaybackEventBus, TRACK_CHANGED, PROGRESS
+)
+from utils.playback_clock import PlaybackClock
+
+# What the lyrics window needs; a cached token is only reused if it covers the requested scope
+DEFAULT_SCOPE = "user-read-playback-state user-modify-playback-state user-read-currently-playing"
+# Reading the user's private and collaborative playlists (warm_cache.py --playlist)
+PLAYLIST_SCOPE = DEFAULT_SCOPE + " playlist-read-private playlist-read-collaborative"
 
 class SpotifyController:
-    def __init__(self, client_id, client_secret, redirect_uri, root=None):
+    def __init__(self, client_id, client_secret, redirect_uri, root=None, connect_in_background=False,
+                 scope=DEFAULT_SCOPE):
         self.client_id = client_id
         self.client_secret = client_secret
         self.redirect_uri = redirect_uri
+        self.scope = scope
         self.root = root
         self.sp = None
         self.current_playback = None
         self.token_info = None
-        self.progress_callbacks = []
-        self.update_progress_id = None
+        self.progress_callbacks = {}
+        self.context_tracks = None  # (context URI, its tracks) for the playing album or playlist
+        
+        # Single poller: one current_playback() per tick feeds the clock and the event bus
+        self.playback_clock = PlaybackClock()
+        self.events = PlaybackEventBus()
+        self.poll_thread = None
+        self.poll_wakeup = threading.Event()
+        self.poll_stopped = threading.Event()
+        self.closed = False
         
         # Create cache directory if it doesn't exist
         cache_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.spotify_cache')
@@ -23,22 +42,32 @@ class SpotifyController:
         # Set cache path
         self.cache_path = os.path.join(cache_dir, '.spotify_cache')
         
-        # Initialize Spotify client
+        if connect_in_background:
+            # OAuth and the connection test block; keep them off the UI thread
+            self.connect_thread = threading.Thread(target=self.connect, daemon=True)
+            self.connect_thread.start()
+        else:
+            self.connect()
+    
+    def connect(self):
+        """Authenticate, test the connection and start the playback poller."""
         self.initialize_spotify()
-        
-        if root:
+        if not self.closed:
             self.start_progress_updates()
     
     def initialize_spotify(self):
         """Initialize the Spotify client with proper authentication."""
         try:
+            # Imported here so startup does not wait for spotipy and requests
+            import spotipy
+            from spotipy.oauth2 import SpotifyOAuth
+            
             print("Initializing Spotify client...")
-            scope = "user-read-playback-state user-modify-playback-state user-read-currently-playing"
             auth_manager = SpotifyOAuth(
                 client_id=self.client_id,
                 client_secret=self.client_secret,
                 redirect_uri=self.redirect_uri,
-                scope=scope,
+                scope=self.scope,
                 cache_path=self.cache_path,
                 open_browser=False  # Don't open browser automatically
             )
@@ -117,11 +146,15 @@ class SpotifyController:
             print(f"Error checking authentication: {e}")
             return False
     
+    def is_polling(self):
+        """Check if the background poller is running."""
+        return self.poll_thread is not None and self.poll_thread.is_alive()
+    
     def get_current_track(self):
         """Get the currently playing track."""
         try:
             if self.is_authenticated() and self.sp is not None:
-                playback = self.sp.current_playback()
+                playback = self.get_playback_state()
                 if playback and playback.get('item'):
                     self.current_playback = playback
                     return playback['item']
@@ -134,19 +167,115 @@ class SpotifyController:
         return None
     
     def get_playback_state(self):
-        """Get the current playback state."""
+        """Get the current playback state.
+        
+        While the poller is running this returns its latest response instead
+        of issuing another request.
+        """
         try:
+            if self.is_polling():
+                return self.current_playback
             if self.is_authenticated() and self.sp is not None:
                 return self.sp.current_playback()
         except Exception as e:
             print(f"Error getting playback state: {e}")
         return None
     
+    def get_queue(self):
+        """Get the user's playback queue (currently playing and upcoming)."""
+        try:
+            if self.is_authenticated() and self.sp is not None:
+                return self.sp.queue()
+        except Exception as e:
+            print(f"Error getting queue: {e}")
+        return None
+    
+    def get_context_tracks(self, limit):
+        """Get the tracks after the current one in the playing album or playlist.
+        
+        The context's track list is fetched once and reused until a
+        different album or playlist starts playing.
+        """
+        try:
+            playback = self.get_playback_state()
+            if not playback or not playback.get('item') or self.sp is None:
+                return []
+            current = playback['item']
+            context = playback.get('context') or {}
+            if context.get('type') not in ('album', 'playlist'):
+                return []
+            if not self.context_tracks or self.context_tracks[0] != context['uri']:
+                self.context_tracks = (context['uri'], self.fetch_context_tracks(context, current))
+            tracks = self.context_tracks[1]
+            ids = [track.get('id') for track in tracks]
+            if current.get('id') not in ids:
+                return []
+            start = ids.index(current.get('id')) + 1
+            return tracks[start:start + limit]
+        except Exception as e:
+            print(f"Error getting context tracks: {e}")
+            return []
+    
+    def fetch_context_tracks(self, context, current):
+        """Fetch an album's or playlist's tracks; an empty list if they cannot be read."""
+        try:
+            if context['type'] == 'album':
+                tracks = self.sp.album_tracks(context['uri'])['items']
+                # Album track listings carry no album object; reuse the current one for art
+                for track in tracks:
+                    track.setdefault('album', current.get('album', {}))
+                return tracks
+            items = self.sp.playlist_items(context['uri'])['items']
+            return [item['track'] for item in items if item.get('track')]
+        except Exception as e:
+            # Remembered like a result, so an unreadable playlist is not asked for every track
+            print(f"Error getting tracks of {context['uri']}: {e}")
+            return []
+    
+    def get_playlist_tracks(self, playlist_id):
+        """Get every track in a playlist, following pagination.
+        
+        Returns None, after printing why, if the playlist cannot be read.
+        """
+        try:
+            if not self.is_authenticated() or self.sp is None:
+                print("Cannot read playlist: not logged in to Spotify")
+                return None
+            tracks = []
+            page = self.sp.playlist_items(playlist_id, additional_types=('track',))
+            while page:
+                tracks.extend(item['track'] for item in page['items']
+                              if item.get('track') and item['track'].get('type', 'track') == 'track')
+                page = self.sp.next(page) if page.get('next') else None
+            return tracks
+        except Exception as e:
+            status = getattr(e, 'http_status', None)
+            if status in (401, 403):
+                print(f"Spotify refused access to playlist {playlist_id} ({status}). "
+                      f"Private playlists can only be read by their owner or a collaborator; "
+                      f"make sure you logged in with that account and allowed playlist access "
+                      f"when asked.")
+            elif status == 404:
+                print(f"Playlist {playlist_id} was not found, or is private to another account")
+            else:
+                print(f"Error getting playlist tracks: {e}")
+            return None
+    
+    def get_upcoming_tracks(self, limit=3):
+        """Get the next tracks from the queue, falling back to the playing context."""
+        queue = self.get_queue()
+        tracks = [item for item in (queue or {}).get('queue', [])
+                  if item and item.get('type', 'track') == 'track']
+        if not tracks:
+            tracks = self.get_context_tracks(limit)
+        return tracks[:limit]
+    
     def start_playback(self):
         """Start or resume playback."""
         try:
             if self.is_authenticated() and self.sp is not None:
                 self.sp.start_playback()
+                self.request_sync()
         except Exception as e:
             print(f"Error starting playback: {e}")
     
@@ -155,6 +284,7 @@ class SpotifyController:
         try:
             if self.is_authenticated() and self.sp is not None:
                 self.sp.pause_playback()
+                self.request_sync()
         except Exception as e:
             print(f"Error pausing playback: {e}")
     
@@ -163,6 +293,7 @@ class SpotifyController:
         try:
             if self.is_authenticated() and self.sp is not None:
                 self.sp.next_track()
+                self.request_sync()
         except Exception as e:
             print(f"Error skipping to next track: {e}")
     
@@ -171,54 +302,90 @@ class SpotifyController:
         try:
             if self.is_authenticated() and self.sp is not None:
                 self.sp.previous_track()
+                self.request_sync()
         except Exception as e:
             print(f"Error skipping to previous track: {e}")
     
+    def request_sync(self):
+        """Ask the poller to re-sync with Spotify right away."""
+        self.playback_clock.request_sync()
+        self.poll_wakeup.set()
+    
+    def subscribe(self, event_type, callback):
+        """Subscribe a callback(event) to a playback event type."""
+        return self.events.subscribe(event_type, callback)
+    
+    def unsubscribe(self, event_type, callback):
+        """Remove a playback event subscription."""
+        self.events.unsubscribe(event_type, callback)
+    
     def bind_progress_callback(self, callback):
         """Bind a callback function to receive playback progress updates."""
         if callback not in self.progress_callbacks:
-            self.progress_callbacks.append(callback)
+            adapter = lambda event: callback(event.progress_ms, event.duration_ms)
+            self.progress_callbacks[callback] = adapter
+            self.events.subscribe(PROGRESS, adapter)
     
     def unbind_progress_callback(self, callback):
         """Unbind a progress callback function."""
-        if callback in self.progress_callbacks:
-            self.progress_callbacks.remove(callback)
+        adapter = self.progress_callbacks.pop(callback, None)
+        if adapter:
+            self.events.unsubscribe(PROGRESS, adapter)
     
     def start_progress_updates(self):
-        """Start periodic progress updates."""
-        self.update_progress()
+        """Start the background playback poller."""
+        if self.is_polling():
+            return
+        self.poll_stopped.clear()
+        self.poll_thread = threading.Thread(target=self.poll_loop, daemon=True)
+        self.poll_thread.start()
+    
+    def poll_loop(self):
+        """Poll Spotify on the playback clock's adaptive schedule."""
+        while not self.poll_stopped.is_set():
+            ok = self.update_progress()
+            wait = self.playback_clock.seconds_until_sync()
+            if not ok:
+                wait = max(wait, self.playback_clock.min_sync_interval)
+            self.poll_wakeup.wait(wait)
+            self.poll_wakeup.clear()
     
     def update_progress(self):
-        """Update playback progress and notify callbacks."""
+        """Fetch playback once, sync the clock and publish events."""
         try:
-            if self.is_authenticated() and self.sp is not None:
-                playback = self.sp.current_playback()
-                if playback and playback.get('is_playing'):
-                    progress_ms = playback.get('progress_ms', 0)
-                    duration_ms = playback.get('item', {}).get('duration_ms', 0)
-                    
-                    # Notify all callbacks
-                    for callback in self.progress_callbacks:
-                        try:
-                            callback(progress_ms, duration_ms)
-                        except Exception as e:
-                            print(f"Error in progress callback: {e}")
+            if not self.is_authenticated() or self.sp is None:
+                return False
+            playback = self.sp.current_playback()
+            self.current_playback = playback
+            changes = self.playback_clock.sync(playback)
+            
+            track, progress_ms, duration_ms, is_playing = self.playback_clock.snapshot()
+            
+            # Track change first so subscribers see the new track before progress
+            changes.sort(key=lambda change: change != TRACK_CHANGED)
+            if track is not None:
+                changes.append(PROGRESS)
+            for event_type in changes:
+                self.events.publish(PlaybackEvent(event_type, track, progress_ms,
+                                                  duration_ms, is_playing))
+            return True
         except Exception as e:
             print(f"Error updating progress: {e}")
-        finally:
-            # Schedule next update if root exists
-            if self.root:
-                self.update_progress_id = self.root.after(1000, self.update_progress)
+            return False
     
     def stop_progress_updates(self):
-        """Stop progress updates."""
-        if self.update_progress_id and self.root:
-            self.root.after_cancel(self.update_progress_id)
-            self.update_progress_id = None
+        """Stop the background playback poller."""
+        self.poll_stopped.set()
+        self.poll_wakeup.set()
+        if self.is_polling() and self.poll_thread is not threading.current_thread():
+            self.poll_thread.join(timeout=2)
+        self.poll_thread = None
     
     def cleanup(self):
         """Clean up resources."""
+        self.closed = True
         self.stop_progress_updates()
         self.progress_callbacks.clear()
+        self.events.clear()
         self.sp = None
         self.token_info = None 
\ No newline at end of file
@@ -0,0 +1,425 @@
+import threading
+import time
+
+from controllers.playback_events import PlaybackEvent, TRACK_CHANGED, PAUSED, RESUMED
+from utils.fetch_pipeline import FetchPipeline
+from utils.lyrics_timing import TimingIndex, SyncCorrection
+from utils.prefetcher import Prefetcher, SpotifyQueueSource
+
+# Section markers that are never shown as lyric lines
+SECTION_MARKERS = ['[verse', '[chorus', '[bridge', '[intro', '[outro']
+
+
+class LyricsRenderer:
+    """What the sync engine drives: a window, a terminal, or nothing at all.
+
+    Every method is called from an engine or fetch thread, so a GUI
+    renderer must hand the work to its own main loop.
+    """
+
+    # Set to True to receive album art through show_album_art
+    wants_album_art = False
+
+    def show_track(self, track):
+        """A new track started playing."""
+
+    def show_album_art(self, image):
+        """Resized album art for the current track is ready."""
+
+    def show_lyrics(self, lines):
+        """New lyric lines (a list of strings) for the current track."""
+
+    def show_message(self, message):
+        """Show a status message instead of lyrics."""
+
+    def show_line(self, index):
+        """The line at index is now being sung."""
+
+    def show_progress(self, progress_ms, duration_ms):
+        """Playback position for this frame."""
+
+    def show_play_state(self, is_playing):
+        """Playback was paused or resumed."""
+
+
+def lyric_lines(lyrics):
+    """Split fetched lyrics into displayable line texts and their start times."""
+    if isinstance(lyrics, str):
+        lyrics = lyrics.split('\n')
+    texts = []
+    start_times = []  # Start time of each line, None when unknown
+    for line in lyrics or []:
+        start_time = None
+        if isinstance(line, dict):
+            text = (line.get('text') or '').strip()
+            start_time = line.get('start_time')
+        elif isinstance(line, str):
+            text = line.strip()
+        else:
+            continue
+        if text and not any(marker in text.lower() for marker in SECTION_MARKERS):
+            texts.append(text)
+            start_times.append(start_time)
+    return texts, start_times
+
+
+class SyncEngine:
+    """Playback clock, lyrics loading and current-line tracking, without any UI.
+
+    Subscribes to the Spotify controller's playback events, fetches lyrics
+    (and album art when the renderer wants it) for each new track, and
+    runs a frame loop that reads the local playback clock and reports
+    progress and line changes to a LyricsRenderer. User timing corrections
+    are applied here and saved once the user stops adjusting.
+    """
+
+    def __init__(self, renderer, art_cache=None, frame_interval=1 / 30, correction_save_delay=1.0):
+        self.renderer = renderer
+        self.art_cache = art_cache
+        self.frame_interval = frame_interval
+        self.correction_save_delay = correction_save_delay
+
+        self.spotify_controller = None
+        self.lyrics_fetcher = None
+        self.playback_clock = None
+        self.fetch_pipeline = FetchPipeline()
+        self.prefetcher = None  # Created once both controller and fetcher are set
+
+        self.lock = threading.RLock()
+        self.current_track = None
+        self.current_track_id = None
+        self.is_playing = False
+        self.lines = []
+        self.timing_index = TimingIndex([])
+        self.current_line_index = 0
+        self.last_progress_ms = None
+
+        # User timing corrections for the current track
+        self.sync_correction = None
+        self.pending_correction = None  # (track, correction) waiting to be saved
+        self.correction_due = None
+
+        self.thread = None
+        self.stopped = threading.Event()
+        self.stats = {'frames': 0, 'line_changes': 0, 'tracks': 0}
+
+    def start(self):
+        """Start the frame loop."""
+        if self.thread and self.thread.is_alive():
+            return
+        self.stopped.clear()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """Stop the frame loop and background work, saving pending corrections."""
+        self.stopped.set()
+        self.flush_sync_correction()
+        self.fetch_pipeline.shutdown()
+        if self.prefetcher:
+            self.prefetcher.shutdown()
+
+    def set_spotify_controller(self, controller):
+        """Follow a Spotify controller's playback events and clock."""
+        self.spotify_controller = controller
+        if not controller:
+            return
+        self.playback_clock = controller.playback_clock
+        controller.subscribe(TRACK_CHANGED, self.on_track_changed)
+        controller.subscribe(PAUSED, self.on_play_state_changed)
+        controller.subscribe(RESUMED, self.on_play_state_changed)
+
+        # Pick up a track the poller already saw before we subscribed
+        track, progress_ms, duration_ms, is_playing = self.playback_clock.snapshot()
+        if track:
+            self.on_track_changed(PlaybackEvent(TRACK_CHANGED, track, progress_ms,
+                                                duration_ms, is_playing))
+            self.on_play_state_changed(PlaybackEvent(RESUMED if is_playing else PAUSED,
+                                                     track, progress_ms, duration_ms, is_playing))
+        self.setup_prefetcher()
+
+    def set_lyrics_fetcher(self, fetcher):
+        """Set the lyrics fetcher (a GeniusLyricsFetcher or LyricsResolver)."""
+        self.lyrics_fetcher = fetcher
+        self.setup_prefetcher()
+        # Load lyrics for a track that started before the fetcher was set
+        if fetcher and self.current_track:
+            self.update_lyrics()
+
+    def setup_prefetcher(self):
+        """Create the queue prefetcher once Spotify and lyrics are both available."""
+        if self.prefetcher or not self.spotify_controller or not self.lyrics_fetcher:
+            return
+        self.prefetcher = Prefetcher(SpotifyQueueSource(self.spotify_controller),
+                                     self.lyrics_fetcher, self.art_cache)
+        if self.current_track:
+            self.prefetcher.prefetch()
+
+    def on_track_changed(self, event):
+        """Handle a track change published by the playback poller."""
+        current_track = event.track
+        if current_track.get('id') == self.current_track_id:
+            return
+        self.flush_sync_correction()
+        with self.lock:
+            self.current_track_id = current_track.get('id')
+            self.current_track = current_track
+            self.sync_correction = None
+            self.set_lines([])
+        self.stats['tracks'] += 1
+        self.renderer.show_track(current_track)
+        self.renderer.show_message("Loading lyrics...")
+
+        # Start art and lyrics together; results for an older track are dropped
+        jobs = {}
+        if self.art_cache and self.renderer.wants_album_art:
+            jobs['album_art'] = lambda: self.art_cache.load(current_track)
+        if self.lyrics_fetcher:
+            jobs.update(self.lyrics_jobs(current_track))
+        self.fetch_pipeline.submit(self.current_track_id, jobs, self.on_fetch_result)
+
+        # Warm the caches for what plays next
+        if self.prefetcher:
+            self.prefetcher.prefetch()
+
+    def on_play_state_changed(self, event):
+        """Handle pause/resume events published by the playback poller."""
+        self.is_playing = event.is_playing
+        self.renderer.show_play_state(event.is_playing)
+
+    def update_lyrics(self, current_track=None):
+        """Fetch lyrics for the current track in the background."""
+        if not self.lyrics_fetcher:
+            print("Lyrics fetcher not initialized")
+            return
+        current_track = current_track or self.current_track
+        if not current_track:
+            print("No current track information")
+            self.renderer.show_message("No track playing...")
+            return
+        self.fetch_pipeline.submit(current_track.get('id'), self.lyrics_jobs(current_track),
+                                   self.on_fetch_result)
+
+    def retry_lyrics(self):
+        """Fetch the current track's lyrics again, even if Genius had none last time."""
+        current_track = self.current_track
+        if not current_track or not self.lyrics_fetcher:
+            return
+        if hasattr(self.lyrics_fetcher, 'clear_lyrics_miss'):
+            try:
+                self.lyrics_fetcher.clear_lyrics_miss(current_track['artists'][0]['name'],
+                                                      current_track['name'])
+            except (KeyError, TypeError, IndexError):
+                pass
+        self.renderer.show_message("Loading lyrics...")
+        self.update_lyrics(current_track)
+
+    def update_current_song(self, artist, title):
+        """Fetch and show lyrics for an artist/title outside of Spotify playback."""
+        if not self.lyrics_fetcher:
+            self.renderer.show_message("Lyrics fetcher not initialized")
+            return
+        fetch = lambda: self.lyrics_fetcher.fetch_lyrics(artist, title) or "No lyrics found for this song."
+        self.fetch_pipeline.submit((artist, title), {'lyrics': fetch}, self.on_fetch_result)
+
+    def lyrics_jobs(self, current_track):
+        """Fetch jobs for a track's lyrics and saved timing corrections."""
+        return {
+            'lyrics': lambda: self.load_lyrics(current_track),
+            'sync_correction': lambda: self.load_sync_correction(current_track),
+        }
+
+    def load_lyrics(self, current_track):
+        """Fetch lyrics for a track (runs on a fetch worker).
+
+        Returns the lyrics, or a message to display instead.
+        """
+        try:
+            try:
+                artist = current_track['artists'][0]['name']
+                title = current_track['name']
+                print(f"\nUpdating lyrics for: {artist} - {title}")
+            except (KeyError, TypeError, IndexError) as e:
+                print(f"Error extracting track info: {e}")
+                return "Error getting track information"
+
+            print("Fetching lyrics...")
+            lyrics = self.lyrics_fetcher.fetch_lyrics(artist, title, current_track.get('id'),
+                                                      current_track.get('duration_ms'))
+            if not lyrics:
+                print("No lyrics found")
+                return "No lyrics found for this song."
+
+            print("Lyrics found, displaying...")
+            return lyrics
+
+        except Exception as e:
+            print(f"Error in load_lyrics: {e}")
+            import traceback
+            traceback.print_exc()
+            return "Error updating lyrics"
+
+    def load_sync_correction(self, current_track):
+        """Load saved timing corrections for a track (runs on a fetch worker)."""
+        if not hasattr(self.lyrics_fetcher, 'get_sync_correction'):
+            return None
+        try:
+            artist = current_track['artists'][0]['name']
+            title = current_track['name']
+        except (KeyError, TypeError, IndexError):
+            return None
+        return self.lyrics_fetcher.get_sync_correction(artist, title, current_track.get('id'))
+
+    def on_fetch_result(self, key, name, result):
+        """Apply a finished fetch if it still belongs to the current track."""
+        if not self.fetch_pipeline.is_current(key):
+            return
+        if name == 'album_art':
+            if result is not None:
+                self.renderer.show_album_art(result)
+        elif name == 'lyrics':
+            if isinstance(result, str):
+                with self.lock:
+                    self.set_lines([])
+                self.renderer.show_message(result)
+                return
+            texts, start_times = lyric_lines(result)
+            with self.lock:
+                self.set_lines(texts, start_times)
+            self.renderer.show_lyrics(texts)
+        elif name == 'sync_correction' and result is not None:
+            with self.lock:
+                # Keep adjustments the user made before the saved ones arrived
+                session = self.sync_correction
+                if session is not None:
+                    result.merge(session)
+                    if self.pending_correction and self.pending_correction[1] is session:
+                        self.pending_correction = (self.pending_correction[0], result)
+                self.sync_correction = result
+                self.timing_index.corrections = result
+
+    def set_lines(self, texts, start_times=None):
+        """Replace the current lines and rebuild the timing index (lock held)."""
+        self.lines = texts
+        self.timing_index = TimingIndex(start_times or [None] * len(texts), self.sync_correction)
+        self.current_line_index = 0
+
+    def playback_position(self):
+        """Current playback position from the local clock."""
+        if self.playback_clock:
+            return self.playback_clock.position_ms()
+        return self.last_progress_ms or 0
+
+    def duration_ms(self):
+        return (self.current_track or {}).get('duration_ms') or 0
+
+    def run(self):
+        """Frame loop: report progress and line changes from the local clock.
+
+        No network calls happen here; track and play state changes arrive
+        as events from the Spotify controller's poller.
+        """
+        while not self.stopped.is_set():
+            try:
+                self.tick()
+            except Exception as e:
+                print(f"Error in sync loop: {e}")
+            self.stopped.wait(self.frame_interval)
+
+    def tick(self):
+        """Advance one frame."""
+        if self.correction_due and time.monotonic() >= self.correction_due:
+            self.flush_sync_correction()
+        if not self.playback_clock:
+            return
+        track, progress_ms, duration_ms, is_playing = self.playback_clock.snapshot()
+        if not track or (not is_playing and progress_ms == self.last_progress_ms):
+            return
+        self.last_progress_ms = progress_ms
+        self.stats['frames'] += 1
+        self.renderer.show_progress(progress_ms, duration_ms)
+        self.update_line(progress_ms, duration_ms)
+
+    def update_line(self, progress_ms, duration_ms):
+        """Report the current line if it changed."""
+        with self.lock:
+            if not self.lines:
+                return
+            # Binary search over line start times; linear estimate without timing
+            current_line = self.timing_index.line_at(progress_ms, duration_ms)
+            if current_line < 0 or current_line == self.current_line_index:
+                return
+            self.current_line_index = current_line
+        self.stats['line_changes'] += 1
+        self.renderer.show_line(current_line)
+
+    def current_correction(self):
+        """Return the current track's corrections, creating them on first use."""
+        if self.sync_correction is None:
+            self.sync_correction = SyncCorrection()
+            self.timing_index.corrections = self.sync_correction
+        return self.sync_correction
+
+    def nudge_lyrics(self, delta_ms):
+        """Shift the current song's lyrics later (positive) or earlier."""
+        with self.lock:
+            if not self.lines or not self.current_track:
+                return
+            correction = self.current_correction()
+            correction.nudge(delta_ms)
+        print(f"Lyrics offset: {correction.offset_ms:+d} ms")
+        self.after_correction()
+
+    def mark_line_now(self):
+        """Mark the line being sung right now as starting at this moment.
+
+        The line is whichever of the current line and the next one should
+        start closest to now, so a tap fixes a highlight that is either
+        ahead of or behind the singer.
+        """
+        with self.lock:
+            if not self.lines or not self.current_track:
+                return
+            correction = self.current_correction()
+            progress_ms = self.playback_position()
+            duration_ms = self.duration_ms()
+            now = correction.to_lyrics_time(progress_ms)
+            candidates = [i for i in (self.current_line_index, self.current_line_index + 1)
+                          if 0 <= i < len(self.lines)]
+            line = min(candidates, key=lambda i: abs(
+                self.timing_index.line_start(i, duration_ms) - now))
+            correction.add_anchor(progress_ms, self.timing_index.line_start(line, duration_ms))
+        print(f"Marked line {line + 1} at {progress_ms} ms")
+        self.after_correction()
+
+    def after_correction(self):
+        """Re-sync the current line and save corrections once the user pauses."""
+        self.update_line(self.playback_position(), self.duration_ms())
+        with self.lock:
+            self.pending_correction = (self.current_track, self.sync_correction)
+            self.correction_due = time.monotonic() + self.correction_save_delay
+
+    def flush_sync_correction(self):
+        """Persist pending timing corrections."""
+        with self.lock:
+            pending, self.pending_correction = self.pending_correction, None
+            self.correction_due = None
+        if not pending or not hasattr(self.lyrics_fetcher, 'save_sync_correction'):
+            return
+        track, correction = pending
+        try:
+            artist = track['artists'][0]['name']
+            title = track['name']
+        except (KeyError, TypeError, IndexError):
+            return
+        self.lyrics_fetcher.save_sync_correction(artist, title, correction, track.get('id'))
+
+    def get_stats(self):
+        """Return engine counters and those of its fetch components."""
+        return {
+            'engine': dict(self.stats),
+            'fetch_pipeline': self.fetch_pipeline.get_stats(),
+            'prefetcher': self.prefetcher.get_stats() if self.prefetcher else None,
+            'lyrics_providers': (self.lyrics_fetcher.get_stats()
+                                 if hasattr(self.lyrics_fetcher, 'get_stats') else None),
+        }
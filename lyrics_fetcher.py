@@ -1,83 +1,225 @@
 import requests
-from bs4 import BeautifulSoup
 import re
 import time
 import json
 import os
+from urllib.parse import urlparse
 from config import GENIUS_ACCESS_TOKEN
+from utils.lyrics_cache import LyricsCache, normalize_key
+from utils.http_client import get_http_client
+from utils.lyrics_page import extract_lyrics, has_no_lyrics_notice, LYRICS_FORMATS
+from utils.text_match import rank_hits
+from utils.single_flight import SingleFlight
+from utils.lyrics_timing import is_lrc, parse_lrc, has_timing, estimate_timings, SyncCorrection
+
+SECTION_MARKER = re.compile(r'\[([^\]\n]*)\]')
+
+# Why Genius had no lyrics for a song, and how long to wait before asking again
+MISS_NO_HITS = 'no_hits'        # Search found nothing
+MISS_NO_LYRICS = 'no_lyrics'    # Page says there are no lyrics (instrumentals, unreleased)
+MISS_PARSE = 'parse_failed'     # No lyrics found in the page: likely a markup change, retry soon
+MISS_NETWORK = 'network'        # Transient: backs off exponentially
+MISS_ERROR = 'error'            # Unexpected response: backs off exponentially
+MISS_TTLS = {MISS_NO_HITS: 7 * 24 * 3600, MISS_NO_LYRICS: 3 * 24 * 3600, MISS_PARSE: 3600}
+MISS_BACKOFF_BASE = 60
+MISS_BACKOFF_MAX = 6 * 3600
+# Per-line timing fields that belong to one recording and are not borrowed by another
+RECORDING_TIMING_KEYS = ('start_time', 'duration', 'words', 'estimated')
 
 class GeniusLyricsFetcher:
-    def __init__(self, api_token):
+    def __init__(self, api_token, http_client=None, cache_dir="lyrics_cache"):
         self.api_token = api_token
+        self.http = http_client or get_http_client()
         self.base_url = "https://api.genius.com"
         self.headers = {"Authorization": f"Bearer {api_token}"}
-        self.cache_dir = "lyrics_cache"
+        self.cache_dir = cache_dir
+        self.page_formats = {}  # Domain -> lyrics container format that last worked there
+        self.flights = SingleFlight()  # Concurrent fetches of one track share a single lookup
         
         # Create cache directory if it doesn't exist
         if not os.path.exists(self.cache_dir):
             os.makedirs(self.cache_dir)
+        
+        # Single-file indexed cache; older per-song JSON files are imported once
+        self.cache = LyricsCache(os.path.join(self.cache_dir, "lyrics.sqlite3"))
+        self.cache.migrate_json_dir(self.cache_dir)
     
     def parse_lyrics_with_timing(self, lyrics_text):
-        """Parse lyrics text and create estimated timings."""
+        """Parse lyrics text into lines with their song structure.
+        
+        Section markers ([Verse 1], [Chorus], ...) and blank lines are not
+        emitted as lines; they are recorded on the following line as
+        'sections_before' and 'stanza_break' for the timing estimator.
+        """
+        # Time-synced (LRC) text carries real per-line timestamps
+        if is_lrc(lyrics_text):
+            return parse_lrc(lyrics_text)
+        
+        # Put section markers on their own lines
+        lyrics_text = SECTION_MARKER.sub(lambda m: f"\n{m.group(0)}\n", lyrics_text)
         lines = lyrics_text.split('\n')
-        non_empty_lines = [l for l in lines if l.strip()]
-        total_lines = len(non_empty_lines)
         
-        # Create timing estimates (distribute evenly across estimated song duration)
         timings = []
         current_line = 0
+        section = None
+        sections_before = []
+        stanza_break = False
         
         for line in lines:
-            if line.strip():
-                # Store line with timing information
-                timing = {
-                    'text': line.strip(),
-                    'start_time': None,  # Will be set during playback
-                    'duration': None,    # Will be set during playback
-                    'line_number': current_line
-                }
-                timings.append(timing)
-                current_line += 1
+            text = line.strip()
+            if not text:
+                stanza_break = bool(timings)
+                continue
+            
+            marker = SECTION_MARKER.fullmatch(text)
+            if marker:
+                section = marker.group(1).strip()
+                sections_before.append(section)
+                continue
+            
+            # Store line with timing information
+            timing = {
+                'text': text,
+                'start_time': None,  # Set by estimate_timings once the duration is known
+                'duration': None,
+                'line_number': current_line,
+                'section': section
+            }
+            if sections_before:
+                timing['sections_before'] = sections_before
+            if stanza_break:
+                timing['stanza_break'] = True
+            timings.append(timing)
+            current_line += 1
+            sections_before = []
+            stanza_break = False
         
         return timings
     
-    def fetch_lyrics(self, artist, title):
-        """Fetch lyrics with timing information."""
+    def add_estimated_timing(self, artist, title, lyrics, track_id=None, duration_ms=None,
+                             save=True):
+        """Estimate line timings for plain lyrics once and store them in the cache."""
+        if not duration_ms or not lyrics or has_timing(lyrics):
+            return lyrics
+        print(f"Estimating line timings for: {artist} - {title}")
+        lyrics = estimate_timings(lyrics, duration_ms)
+        if save:
+            self.save_lyrics_to_cache(artist, title, lyrics, track_id)
+        return lyrics
+    
+    def fetch_lyrics(self, artist, title, track_id=None, duration_ms=None):
+        """Fetch lyrics with timing information.
+        
+        Lookups try the Spotify track ID first, then artist/title, then
+        cached lyrics of another version of the same song, and only then
+        go to Genius. When the track duration is given, plain lyrics get
+        estimated line timings that are cached with them. Concurrent calls
+        for the same track share one lookup.
+        """
+        key = track_id or normalize_key(artist, title)
+        return self.flights.do(key, self._fetch_lyrics, artist, title, track_id, duration_ms)
+    
+    def _fetch_lyrics(self, artist, title, track_id, duration_ms):
         # Try to get from cache first
-        cached_lyrics = self.get_lyrics_from_cache(artist, title)
+        cached_lyrics = self.get_lyrics_from_cache(artist, title, track_id)
         if cached_lyrics:
-            return cached_lyrics
+            return self.add_estimated_timing(artist, title, cached_lyrics, track_id, duration_ms)
+        
+        # Reuse lyrics cached for a remaster, live cut or feat. variant
+        similar = self.find_similar_in_cache(artist, title, track_id)
+        if similar:
+            return self.retime_similar(similar, duration_ms, artist, title, track_id)
         
         # If not in cache, fetch from Genius
         lyrics = self.fetch_lyrics_from_genius(artist, title)
         if lyrics:
+            lyrics = self.add_estimated_timing(artist, title, lyrics, duration_ms=duration_ms,
+                                               save=False)
             # Save to cache
-            self.save_lyrics_to_cache(artist, title, lyrics)
+            self.save_lyrics_to_cache(artist, title, lyrics, track_id)
+        return lyrics
+    
+    def retime_similar(self, lyrics, duration_ms, artist=None, title=None, track_id=None):
+        """Re-time lyrics borrowed from another version of the song.
+        
+        Only the text and song structure are borrowed: another cut's
+        timings, real or estimated, never fit this one, so they are
+        re-estimated from this track's duration (or left out until it is
+        known). The result is cached as this version's own entry.
+        """
+        if not lyrics:
+            return lyrics
+        lyrics = [{key: value for key, value in line.items() if key not in RECORDING_TIMING_KEYS}
+                  for line in lyrics]
+        for line in lyrics:
+            line['start_time'] = line['duration'] = None
+        if duration_ms:
+            lyrics = estimate_timings(lyrics, duration_ms)
+        if title:
+            self.save_lyrics_to_cache(artist, title, lyrics, track_id)
         return lyrics
     
     def fetch_lyrics_from_genius(self, artist, title):
-        """Fetch lyrics from Genius API with timing information."""
+        """Fetch lyrics from Genius API with timing information.
+        
+        Songs Genius has no lyrics for are remembered, so they are not
+        searched again until their retry time (see clear_lyrics_miss).
+        """
+        miss = self.cache.get_negative(artist, title)
+        if miss and miss['retry_at'] > time.time():
+            wait = miss['retry_at'] - time.time()
+            print(f"Skipping Genius for {artist} - {title}: {miss['reason']}, retry in {wait:.0f}s")
+            return None
+        
+        lyrics, reason = self.scrape_genius(artist, title)
+        if lyrics:
+            if miss:
+                self.cache.delete_negative(artist, title)
+        else:
+            self.record_lyrics_miss(artist, title, reason, miss)
+        return lyrics
+    
+    def record_lyrics_miss(self, artist, title, reason, previous=None):
+        """Remember a failed lookup; transient failures back off exponentially."""
+        if reason in MISS_TTLS:
+            failures = 1
+            delay = MISS_TTLS[reason]
+        else:
+            failures = (previous['failures'] + 1
+                        if previous and previous['reason'] not in MISS_TTLS else 1)
+            delay = min(MISS_BACKOFF_MAX, MISS_BACKOFF_BASE * 2 ** (failures - 1))
+        self.cache.put_negative(artist, title, reason, failures, time.time() + delay)
+    
+    def clear_lyrics_miss(self, artist, title):
+        """Forget a remembered miss, and its search, so the next lookup asks Genius again."""
+        self.cache.delete_negative(artist, title)
+        self.cache.delete_search(*self.search_terms(artist, title))
+    
+    @staticmethod
+    def search_terms(artist, title):
+        """Strip featuring credits and bracketed parts for the Genius search."""
+        artist = re.sub(r'feat\.|ft\.|\(.*?\)|\[.*?\]', '', artist).strip()
+        title = re.sub(r'\(.*?\)|\[.*?\]', '', title).strip()
+        return artist, title
+    
+    def scrape_genius(self, artist, title):
+        """Search Genius and scrape the best hit's page.
+        
+        Returns (lyrics, None) or (None, reason), with reason one of
+        MISS_NO_HITS, MISS_NO_LYRICS, MISS_PARSE, MISS_NETWORK or MISS_ERROR.
+        """
         try:
             print(f"\nFetching lyrics for: {artist} - {title}")
             
             # Clean up artist and title
-            artist = re.sub(r'feat\.|ft\.|\(.*?\)|\[.*?\]', '', artist).strip()
-            title = re.sub(r'\(.*?\)|\[.*?\]', '', title).strip()
+            artist, title = self.search_terms(artist, title)
             print(f"Cleaned up search terms: {artist} - {title}")
             
-            # Search for the song
-            search_url = f"{self.base_url}/search"
-            params = {"q": f"{artist} {title}"}
-            print(f"Searching Genius API: {search_url}")
-            response = requests.get(search_url, headers=self.headers, params=params)
-            response.raise_for_status()
-            
-            # Get the first hit
-            data = response.json()
-            hits = data["response"]["hits"]
+            # Search for the song and take the best match
+            hits = self.search_genius(artist, title)
             if not hits:
                 print("No results found on Genius")
-                return None
+                return None, MISS_NO_HITS
             
             # Get the lyrics URL
             result = hits[0]["result"]
@@ -86,45 +228,25 @@ class GeniusLyricsFetcher:
             
             # Scrape the lyrics
             print("Fetching lyrics page...")
-            page = requests.get(lyrics_url)
-            soup = BeautifulSoup(page.content, 'html.parser')
-            
-            # Try different possible lyrics container classes
-            lyrics_text = None
-            
-            # Try the old lyrics div first
-            lyrics_div = soup.find("div", class_="lyrics")
-            if lyrics_div:
-                print("Found lyrics in old format")
-                lyrics_text = lyrics_div.get_text()
-            
-            # Try the new Lyrics Container
-            if not lyrics_text:
-                lyrics_div = soup.find("div", class_="Lyrics__Container-sc-1ynbvzw-6")
-                if lyrics_div:
-                    print("Found lyrics in new format")
-                    lyrics_text = lyrics_div.get_text()
-            
-            # Try the newest data-lyrics-container format
-            if not lyrics_text:
-                lyrics_divs = soup.find_all("div", attrs={"data-lyrics-container": "true"})
-                if lyrics_divs:
-                    print("Found lyrics in newest format")
-                    lyrics_text = "\n".join(div.get_text() for div in lyrics_divs)
+            page = self.http.get(lyrics_url)
+            page.raise_for_status()
+            lyrics_text = self.extract_page_lyrics(lyrics_url, page.text)
             
             if not lyrics_text:
+                if has_no_lyrics_notice(page.text):
+                    print("Genius has no lyrics for this song")
+                    return None, MISS_NO_LYRICS
                 print("Could not find lyrics in the page")
-                return None
+                return None, MISS_PARSE
             
             # Clean up lyrics text
             print("Cleaning up lyrics text...")
-            lyrics_text = re.sub(r'\[.*?\]', '', lyrics_text)  # Remove [Verse], [Chorus], etc.
             lyrics_text = re.sub(r'\n{3,}', '\n\n', lyrics_text)  # Normalize line breaks
             lyrics_text = lyrics_text.strip()
             
             if not lyrics_text:
                 print("No lyrics text after cleanup")
-                return None
+                return None, MISS_NO_LYRICS
             
             # Parse lyrics with timing information
             print("Parsing lyrics with timing information...")
@@ -132,40 +254,103 @@ class GeniusLyricsFetcher:
             
             if lyrics_with_timing:
                 print(f"Successfully parsed {len(lyrics_with_timing)} lines")
-                return lyrics_with_timing
+                return lyrics_with_timing, None
             else:
                 print("No lines parsed from lyrics text")
-                return None
+                return None, MISS_NO_LYRICS
             
         except requests.exceptions.RequestException as e:
             print(f"Network error fetching lyrics: {e}")
-            return None
+            return None, MISS_NETWORK
         except json.JSONDecodeError as e:
             print(f"Error parsing Genius API response: {e}")
-            return None
+            return None, MISS_ERROR
         except Exception as e:
             print(f"Error fetching lyrics from Genius: {e}")
             import traceback
             traceback.print_exc()
-            return None
+            return None, MISS_ERROR
     
-    def get_lyrics_from_cache(self, artist, title):
+    def search_genius(self, artist, title):
+        """Return Genius search hits for a song, best match first.
+        
+        Results are cached per song regardless of version, so one search
+        serves the remaster and live cuts too; ranking is redone for each
+        lookup's own artist and title.
+        """
+        hits = self.cache.get_search(artist, title)
+        if hits is None:
+            search_url = f"{self.base_url}/search"
+            params = {"q": f"{artist} {title}"}
+            print(f"Searching Genius API: {search_url}")
+            response = self.http.get(search_url, headers=self.headers, params=params)
+            response.raise_for_status()
+            # Keep only what ranking and scraping need
+            hits = [{'result': {
+                        'title': hit['result'].get('title'),
+                        'url': hit['result']['url'],
+                        'primary_artist': {'name': (hit['result'].get('primary_artist') or {}).get('name')},
+                    }}
+                    for hit in response.json()["response"]["hits"]
+                    if hit.get('type', 'song') == 'song' and hit.get('result', {}).get('url')]
+            self.cache.put_search(artist, title, hits)
+        else:
+            print("Using cached Genius search results")
+        return rank_hits(hits, artist, title)
+    
+    def extract_page_lyrics(self, url, html):
+        """Extract lyrics text from a Genius page, trying the domain's last working format first."""
+        domain = urlparse(url).netloc
+        preferred = self.page_formats.get(domain)
+        lyrics_format, lyrics_text = extract_lyrics(html, [preferred]) if preferred else (None, None)
+        if not lyrics_text:
+            # Layout changed or first page from this domain: look for every format
+            lyrics_format, lyrics_text = extract_lyrics(html, LYRICS_FORMATS)
+        if lyrics_text:
+            print(f"Found lyrics in {lyrics_format} format")
+            self.page_formats[domain] = lyrics_format
+        return lyrics_text
+    
+    def get_lyrics_from_cache(self, artist, title, track_id=None):
         """Get lyrics from cache with timing information."""
-        cache_file = os.path.join(self.cache_dir, f"{artist}_{title}.json")
         try:
-            if os.path.exists(cache_file):
-                with open(cache_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            return None
+            return self.cache.get(artist, title, track_id)
         except Exception as e:
             print(f"Error reading from cache: {e}")
             return None
     
-    def save_lyrics_to_cache(self, artist, title, lyrics):
+    def find_similar_in_cache(self, artist, title, track_id=None):
+        """Get cached lyrics for an alternate version of the song."""
+        try:
+            match = self.cache.find_similar(artist, title)
+            if not match:
+                return None
+            key, lyrics = match
+            print(f"Using cached lyrics of another version for: {artist} - {title}")
+            return lyrics
+        except Exception as e:
+            print(f"Error searching cache: {e}")
+            return None
+    
+    def save_lyrics_to_cache(self, artist, title, lyrics, track_id=None):
         """Save lyrics to cache with timing information."""
-        cache_file = os.path.join(self.cache_dir, f"{artist}_{title}.json")
         try:
-            with open(cache_file, 'w', encoding='utf-8') as f:
-                json.dump(lyrics, f, ensure_ascii=False, indent=2)
+            self.cache.put(artist, title, lyrics, track_id)
         except Exception as e:
             print(f"Error saving to cache: {e}")
+    
+    def get_sync_correction(self, artist, title, track_id=None):
+        """Get the user's saved timing corrections for a track."""
+        try:
+            data = self.cache.get_correction(artist, title, track_id)
+            return SyncCorrection.from_dict(data) if data else None
+        except Exception as e:
+            print(f"Error reading timing corrections: {e}")
+            return None
+    
+    def save_sync_correction(self, artist, title, correction, track_id=None):
+        """Save the user's timing corrections for a track."""
+        try:
+            self.cache.put_correction(artist, title, correction.as_dict(), track_id)
+        except Exception as e:
+            print(f"Error saving timing corrections: {e}")
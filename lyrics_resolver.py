@@ -0,0 +1,334 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from utils.lyrics_timing import has_timing, parse_lrc
+from utils.lyrics_cache import normalize_key
+from utils.single_flight import SingleFlight
+from utils.text_match import normalize_title, primary_artist
+
+
+class LyricsProvider:
+    """A source of lyrics that the resolver can query."""
+
+    name = 'provider'
+    # Plain-text answers from a lower plain_rank are preferred
+    plain_rank = 0
+    # Whether answers may be stored in the lyrics cache
+    cacheable = True
+
+    def fetch(self, artist, title, track_id=None):
+        """Return a list of line dicts, or None if this source has nothing."""
+        raise NotImplementedError
+
+    def close(self):
+        """Release anything the provider keeps running."""
+
+
+class GeniusProvider(LyricsProvider):
+    """Plain-text lyrics scraped from Genius."""
+
+    name = 'genius'
+
+    def __init__(self, genius_fetcher):
+        self.genius_fetcher = genius_fetcher
+
+    def fetch(self, artist, title, track_id=None):
+        return self.genius_fetcher.fetch_lyrics_from_genius(artist, title)
+
+
+class LyricstifyProvider(LyricsProvider):
+    """Lyrics from the Lyricstify CLI, which only knows the playing track.
+
+    Its output is the lines printed so far, so it may be incomplete: it is
+    ranked below Genius and never cached.
+    """
+
+    name = 'lyricstify'
+    plain_rank = 1
+    cacheable = False
+
+    def __init__(self, lyricstify_fetcher, is_current_track, min_lines=10):
+        self.lyricstify_fetcher = lyricstify_fetcher
+        self.is_current_track = is_current_track
+        self.min_lines = min_lines
+
+    def fetch(self, artist, title, track_id=None):
+        # Lyricstify follows Spotify itself, so it cannot answer for queued tracks
+        if not track_id or not self.is_current_track(track_id):
+            return None
+        lines = self.lyricstify_fetcher.get_track_lyrics(track_id, self.min_lines)
+        if not lines:
+            return None
+        lyrics = [{'text': line['text'], 'start_time': None, 'duration': None, 'line_number': i}
+                  for i, line in enumerate(lines) if line.get('text')]
+        return lyrics or None
+
+    def close(self):
+        self.lyricstify_fetcher.stop()
+
+
+class LrcFileProvider(LyricsProvider):
+    """Time-synced lyrics from local ``.lrc`` files.
+
+    Files are matched on version-stripped title, optionally prefixed by the
+    artist: ``Artist - Title.lrc`` or ``Title.lrc``.
+    """
+
+    name = 'lrc'
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.lock = threading.Lock()
+        self.index = {}
+        self.index_mtime = None
+
+    def refresh_index(self):
+        """Rebuild the filename index when the directory changes."""
+        try:
+            mtime = os.path.getmtime(self.directory)
+        except OSError:
+            self.index = {}
+            return
+        if mtime == self.index_mtime:
+            return
+        index = {}
+        for name in os.listdir(self.directory):
+            stem, ext = os.path.splitext(name)
+            if ext.lower() != '.lrc':
+                continue
+            path = os.path.join(self.directory, name)
+            if ' - ' in stem:
+                artist, title = stem.split(' - ', 1)
+                index[(primary_artist(artist), normalize_title(title))] = path
+            index.setdefault(('', normalize_title(stem)), path)
+        self.index = index
+        self.index_mtime = mtime
+
+    def fetch(self, artist, title, track_id=None):
+        with self.lock:
+            self.refresh_index()
+            base_title = normalize_title(title)
+            path = (self.index.get((primary_artist(artist), base_title))
+                    or self.index.get(('', base_title)))
+        if not path:
+            return None
+        with open(path, 'r', encoding='utf-8-sig') as f:
+            return parse_lrc(f.read()) or None
+
+
+class ProviderStats:
+    """Running latency and hit-rate figures for one provider."""
+
+    def __init__(self, alpha=0.3):
+        self.alpha = alpha
+        self.attempts = 0
+        self.hits = 0
+        self.synced_hits = 0
+        self.errors = 0
+        self.latency = None
+
+    def record(self, elapsed, lyrics, error=False):
+        """Fold one finished query into the averages."""
+        self.attempts += 1
+        if error:
+            self.errors += 1
+        elif lyrics:
+            self.hits += 1
+            if has_timing(lyrics):
+                self.synced_hits += 1
+        if self.latency is None:
+            self.latency = elapsed
+        else:
+            self.latency = self.alpha * elapsed + (1 - self.alpha) * self.latency
+
+    def expected_cost(self):
+        """Expected seconds to a useful answer; lower is queried first."""
+        hit_rate = (self.hits + 1) / (self.attempts + 2)  # Start every provider at 50%
+        latency = self.latency if self.latency is not None else 1.0
+        return latency / max(hit_rate, 0.05)
+
+    def as_dict(self):
+        return {
+            'attempts': self.attempts,
+            'hits': self.hits,
+            'synced_hits': self.synced_hits,
+            'errors': self.errors,
+            'avg_latency': self.latency,
+        }
+
+
+class LyricsResolver:
+    """Query several lyrics providers and pick the best answer.
+
+    Providers are started cheapest first, by observed latency and hit
+    rate; each costlier one starts once the running ones have all answered
+    or after ``hedge_delay`` seconds, and all of them share a deadline. The
+    first time-synced result wins immediately; a plain-text result is held
+    for a short grace period in case a synced one arrives, and is not
+    settled on while a provider with a better ``plain_rank`` is still to
+    answer. Results go through the Genius fetcher's cache, including those
+    from cacheable providers that answer after the lookup settled without
+    a cacheable result, so this class can be used anywhere a fetcher is
+    expected.
+    """
+
+    def __init__(self, genius_fetcher, providers, deadline=8.0, plain_grace=1.0, hedge_delay=0.5):
+        self.genius_fetcher = genius_fetcher
+        self.providers = list(providers)
+        self.deadline = deadline
+        self.plain_grace = plain_grace
+        self.hedge_delay = hedge_delay
+        self.executor = ThreadPoolExecutor(max_workers=max(2, len(self.providers) * 2),
+                                           thread_name_prefix="lyrics-provider")
+        self.lock = threading.Lock()
+        self.provider_stats = {provider.name: ProviderStats() for provider in self.providers}
+        self.flights = SingleFlight()
+
+    def ordered_providers(self):
+        """Return providers, cheapest expected answer first."""
+        with self.lock:
+            return sorted(self.providers,
+                          key=lambda provider: self.provider_stats[provider.name].expected_cost())
+
+    def provider_named(self, name):
+        return next(provider for provider in self.providers if provider.name == name)
+
+    def _run_provider(self, provider, artist, title, track_id):
+        """Query one provider and record how it did."""
+        started = time.monotonic()
+        try:
+            lyrics = provider.fetch(artist, title, track_id)
+        except Exception as e:
+            print(f"Error fetching lyrics from {provider.name}: {e}")
+            with self.lock:
+                self.provider_stats[provider.name].record(time.monotonic() - started, None, True)
+            return None
+        with self.lock:
+            self.provider_stats[provider.name].record(time.monotonic() - started, lyrics)
+        return lyrics
+
+    def resolve(self, artist, title, track_id=None):
+        """Query the providers and return (provider_name, lyrics) or (None, None)."""
+        waiting = self.ordered_providers()  # Not started yet, cheapest first
+        rank = {provider.name: i for i, provider in enumerate(waiting)}
+        futures = {}
+        answered = set()
+
+        deadline = time.monotonic() + self.deadline
+        next_start = time.monotonic()
+        best = None  # ((plain_rank, rank), provider, lyrics) of the best plain-text answer so far
+        best_at = None
+        winner = None
+        pending = set()
+        while (pending or waiting) and winner is None:
+            now = time.monotonic()
+            if waiting and (not pending or now >= next_start):
+                provider = waiting.pop(0)
+                future = self.executor.submit(self._run_provider, provider, artist, title, track_id)
+                futures[future] = provider
+                pending.add(future)
+                next_start = now + self.hedge_delay
+                continue
+            timeout = deadline - now
+            if best is not None and all(provider.plain_rank >= best[0][0] for provider in
+                                        [futures[future] for future in pending] + waiting):
+                timeout = min(timeout, best_at + self.plain_grace - now)
+            if timeout <= 0:
+                break
+            if waiting:
+                timeout = min(timeout, next_start - now)
+            done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            for future in done:
+                answered.add(future)
+                provider = futures[future]
+                lyrics = future.result()
+                if not lyrics:
+                    continue
+                if has_timing(lyrics):
+                    winner = (provider, lyrics)
+                    break
+                order = (provider.plain_rank, rank[provider.name])
+                if best is None or order[0] < best[0][0]:
+                    best_at = time.monotonic()  # Grace restarts for a better kind of answer
+                if best is None or order < best[0]:
+                    best = (order, provider, lyrics)
+
+        if winner is None and best is not None:
+            winner = best[1], best[2]
+        if winner is None or not winner[0].cacheable:
+            # Nothing will be cached: keep a cacheable answer that comes too late
+            for future, provider in futures.items():
+                if future not in answered and provider.cacheable:
+                    future.add_done_callback(
+                        lambda f, provider=provider: self._cache_late_result(
+                            provider, artist, title, track_id, f))
+        if winner is None:
+            return None, None
+        return winner[0].name, winner[1]
+
+    def _cache_late_result(self, provider, artist, title, track_id, future):
+        """Cache lyrics a provider found after the lookup settled without it."""
+        if future.cancelled() or not future.result():
+            return
+        fetcher = self.genius_fetcher
+        try:
+            if fetcher.get_lyrics_from_cache(artist, title, track_id):
+                return
+            print(f"Caching late lyrics from {provider.name} for: {artist} - {title}")
+            fetcher.save_lyrics_to_cache(artist, title, future.result(), track_id)
+        except Exception as e:
+            print(f"Error caching late lyrics from {provider.name}: {e}")
+
+    def fetch_lyrics(self, artist, title, track_id=None, duration_ms=None):
+        """Fetch lyrics from the cache or the fastest good provider.
+        
+        Concurrent calls for the same track share one lookup.
+        """
+        key = track_id or normalize_key(artist, title)
+        return self.flights.do(key, self._fetch_lyrics, artist, title, track_id, duration_ms)
+
+    def _fetch_lyrics(self, artist, title, track_id, duration_ms):
+        fetcher = self.genius_fetcher
+        cached = fetcher.get_lyrics_from_cache(artist, title, track_id)
+        if cached:
+            return fetcher.add_estimated_timing(artist, title, cached, track_id, duration_ms)
+        similar = fetcher.find_similar_in_cache(artist, title, track_id)
+        if similar:
+            return fetcher.retime_similar(similar, duration_ms, artist, title, track_id)
+
+        name, lyrics = self.resolve(artist, title, track_id)
+        if lyrics:
+            print(f"Using lyrics from {name} for: {artist} - {title}")
+            lyrics = fetcher.add_estimated_timing(artist, title, lyrics, duration_ms=duration_ms,
+                                                  save=False)
+            if self.provider_named(name).cacheable:
+                fetcher.save_lyrics_to_cache(artist, title, lyrics, track_id)
+        return lyrics
+
+    def clear_lyrics_miss(self, artist, title):
+        """Let the next lookup ask Genius again for a song it had no lyrics for."""
+        self.genius_fetcher.clear_lyrics_miss(artist, title)
+
+    def get_sync_correction(self, artist, title, track_id=None):
+        """Get the user's saved timing corrections for a track."""
+        return self.genius_fetcher.get_sync_correction(artist, title, track_id)
+
+    def save_sync_correction(self, artist, title, correction, track_id=None):
+        """Save the user's timing corrections for a track."""
+        self.genius_fetcher.save_sync_correction(artist, title, correction, track_id)
+
+    def shutdown(self):
+        """Stop the providers and the worker pool."""
+        for provider in self.providers:
+            try:
+                provider.close()
+            except Exception as e:
+                print(f"Error closing {provider.name}: {e}")
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def get_stats(self):
+        """Return per-provider latency and hit-rate figures."""
+        with self.lock:
+            return {name: stats.as_dict() for name, stats in self.provider_stats.items()}
@@ -1,18 +1,23 @@
-import tkinter as tk
+import argparse
 import json
 import os
 import sys
+import time
 import traceback
 
 # Add the current directory to the path to ensure modules can be found
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from ui.lyrics_window import LyricsWindow
-from controllers.spotify_controller import SpotifyController
-from lyrics_fetcher import GeniusLyricsFetcher
+# spotipy, requests and PIL are imported on first use so the window paints first
+from lyrics_resolver import LyricsResolver, GeniusProvider, LrcFileProvider, LyricstifyProvider
+from common import LyricstifyFetcher
+from controllers.playback_events import TRACK_CHANGED
 
-def load_config():
-    """Load configuration from config.json file."""
+SPOTIFY_CONFIG_KEYS = ['spotify_client_id', 'spotify_client_secret', 'spotify_redirect_uri']
+REQUIRED_CONFIG_KEYS = SPOTIFY_CONFIG_KEYS + ['genius_access_token']
+
+def load_config(required_keys=REQUIRED_CONFIG_KEYS):
+    """Load configuration from config.json file, checking that required_keys are set."""
     try:
         config_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'config.json')
         print(f"Loading config from: {config_path}")
@@ -24,13 +29,6 @@ def load_config():
         with open(config_path, 'r') as f:
             config = json.load(f)
             
-        required_keys = [
-            'spotify_client_id',
-            'spotify_client_secret',
-            'spotify_redirect_uri',
-            'genius_access_token'
-        ]
-        
         missing_keys = [key for key in required_keys if not config.get(key)]
         if missing_keys:
             print(f"Missing required configuration keys: {', '.join(missing_keys)}")
@@ -50,15 +48,21 @@ def load_config():
         traceback.print_exc()
         return None
 
-def initialize_spotify(config, root):
-    """Initialize Spotify controller with error handling."""
+def initialize_spotify(config, root, connect_in_background=False, scope=None):
+    """Initialize Spotify controller with error handling.
+    
+    scope defaults to what the lyrics window needs.
+    """
     try:
         print("Initializing Spotify controller...")
+        from controllers.spotify_controller import SpotifyController, DEFAULT_SCOPE
         spotify_controller = SpotifyController(
             client_id=config['spotify_client_id'],
             client_secret=config['spotify_client_secret'],
             redirect_uri=config['spotify_redirect_uri'],
-            root=root
+            root=root,
+            connect_in_background=connect_in_background,
+            scope=scope or DEFAULT_SCOPE
         )
         print("Spotify controller initialized!")
         return spotify_controller
@@ -67,11 +71,26 @@ def initialize_spotify(config, root):
         traceback.print_exc()
         return None
 
-def initialize_lyrics_fetcher(config):
+def initialize_lyrics_fetcher(config, spotify_controller=None):
     """Initialize lyrics fetcher with error handling."""
     try:
         print("Initializing lyrics fetcher...")
-        lyrics_fetcher = GeniusLyricsFetcher(config['genius_access_token'])
+        from lyrics_fetcher import GeniusLyricsFetcher
+        genius_fetcher = GeniusLyricsFetcher(config['genius_access_token'])
+        
+        # Race Genius, local .lrc files and (if configured) Lyricstify
+        lrc_directory = config.get('lrc_directory') or os.path.join(
+            os.path.dirname(os.path.abspath(__file__)), 'lyrics_lrc')
+        providers = [GeniusProvider(genius_fetcher), LrcFileProvider(lrc_directory)]
+        if config.get('lyricstify_path') and spotify_controller:
+            is_current_track = lambda track_id: spotify_controller.playback_clock.track_id == track_id
+            lyricstify_fetcher = LyricstifyFetcher(config['lyricstify_path'])
+            # Drop lines printed for the previous track as soon as Spotify moves on
+            spotify_controller.subscribe(
+                TRACK_CHANGED, lambda event: lyricstify_fetcher.set_track(event.track.get('id')))
+            providers.append(LyricstifyProvider(lyricstify_fetcher, is_current_track))
+        
+        lyrics_fetcher = LyricsResolver(genius_fetcher, providers)
         print("Lyrics fetcher initialized!")
         return lyrics_fetcher
     except Exception as e:
@@ -79,13 +98,58 @@ def initialize_lyrics_fetcher(config):
         traceback.print_exc()
         return None
 
+def run_headless(config):
+    """Run the sync engine without Tk, printing line changes to stdout."""
+    from controllers.sync_engine import SyncEngine
+    from ui.terminal_renderer import TerminalRenderer
+    
+    spotify_controller = initialize_spotify(config, None)
+    if not spotify_controller:
+        print("Failed to initialize Spotify controller!")
+        return
+    engine = None
+    lyrics_fetcher = None
+    try:
+        lyrics_fetcher = initialize_lyrics_fetcher(config, spotify_controller)
+        if not lyrics_fetcher:
+            print("Failed to initialize lyrics fetcher!")
+            return
+        
+        engine = SyncEngine(TerminalRenderer())
+        engine.set_spotify_controller(spotify_controller)
+        engine.set_lyrics_fetcher(lyrics_fetcher)
+        engine.start()
+        print("Running headless, waiting for Spotify playback (Ctrl+C to quit)...")
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if engine:
+            engine.stop()
+        if lyrics_fetcher:
+            lyrics_fetcher.shutdown()
+        spotify_controller.cleanup()
+
 def main():
+    parser = argparse.ArgumentParser(description="Floating synced lyrics for Spotify")
+    parser.add_argument('--headless', action='store_true',
+                        help="run without a window and print lyric lines to stdout")
+    args = parser.parse_args()
+    
     # Load configuration
     config = load_config()
     if not config:
         print("Failed to load configuration. Please ensure config.json exists and is properly formatted.")
         return
     
+    if args.headless:
+        run_headless(config)
+        return
+    
+    import tkinter as tk
+    from ui.lyrics_window import LyricsWindow
+    
     try:
         # Create main window
         root = tk.Tk()
@@ -93,16 +157,17 @@ def main():
         
         # Create and configure the lyrics window first
         print("Creating lyrics window...")
-        lyrics_window = LyricsWindow(root)
+        lyrics_window = LyricsWindow(root, lyrics_view=config.get('lyrics_view', 'text'))
+        root.update()  # Paint the window before connecting to anything
         
-        # Initialize Spotify controller
-        spotify_controller = initialize_spotify(config, root)
+        # Initialize Spotify controller; authentication runs in the background
+        spotify_controller = initialize_spotify(config, root, connect_in_background=True)
         if not spotify_controller:
             print("Failed to initialize Spotify controller!")
             return
         
         # Initialize lyrics fetcher
-        lyrics_fetcher = initialize_lyrics_fetcher(config)
+        lyrics_fetcher = initialize_lyrics_fetcher(config, spotify_controller)
         if not lyrics_fetcher:
             print("Failed to initialize lyrics fetcher!")
             return
@@ -123,6 +188,8 @@ def main():
         traceback.print_exc()
     finally:
         # Cleanup
+        if 'lyrics_fetcher' in locals() and lyrics_fetcher is not None:
+            lyrics_fetcher.shutdown()
         if 'spotify_controller' in locals() and spotify_controller is not None:
             spotify_controller.cleanup()
 
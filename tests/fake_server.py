@@ -0,0 +1,58 @@
+"""Local HTTP server for tests, answering from per-path handler functions."""
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+
+class FakeServer:
+    """Serve ``routes[path](query) -> (status, headers, body)`` on a free local port.
+
+    Every request is counted per path in ``hits``.
+    """
+
+    def __init__(self, routes):
+        self.routes = routes
+        self.hits = {}
+        self.lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                with server.lock:
+                    server.hits[url.path] = server.hits.get(url.path, 0) + 1
+                route = server.routes.get(url.path)
+                if route is None:
+                    status, headers, body = 404, {}, ''
+                else:
+                    status, headers, body = route(parse_qs(url.query))
+                data = body.encode('utf-8') if isinstance(body, str) else body
+                try:
+                    self.send_response(status)
+                    for name, value in headers.items():
+                        self.send_header(name, value)
+                    self.send_header('Content-Length', str(len(data)))
+                    self.end_headers()
+                    self.wfile.write(data)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass  # The client timed out and hung up
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.httpd.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def count(self, path):
+        with self.lock:
+            return self.hits.get(path, 0)
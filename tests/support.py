@@ -0,0 +1,59 @@
+"""Stand-in HTTP responses and clients shared by the tests and the benchmarks."""
+import json
+import threading
+import time
+
+import requests
+
+
+class ReplayResponse:
+    """Minimal requests.Response built from a recorded entry."""
+
+    def __init__(self, status_code, text):
+        self.status_code = status_code
+        self.text = text
+        self.content = text.encode('utf-8')
+        self.headers = {}
+
+    def json(self):
+        return json.loads(self.text)
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.exceptions.HTTPError(f"{self.status_code} replayed error", response=self)
+
+
+class ReplayHttpClient:
+    """Stand-in HttpClient answering GETs from recorded responses.
+
+    Responses keep their recorded latency, scaled by the replay speed.
+    Requests that were never recorded get a 404.
+    """
+
+    def __init__(self, entries, speed=1.0):
+        self.speed = speed
+        self.lock = threading.Lock()
+        self.responses = {}
+        for entry in entries:
+            self.responses.setdefault(self.key(entry['url'], entry.get('params')), []).append(entry)
+        self.requests = 0
+        self.unmatched = 0
+
+    @staticmethod
+    def key(url, params):
+        return url, json.dumps(params or {}, sort_keys=True)
+
+    def get(self, url, params=None, **kwargs):
+        with self.lock:
+            self.requests += 1
+            recorded = self.responses.get(self.key(url, params))
+            if not recorded:
+                self.unmatched += 1
+                return ReplayResponse(404, '')
+            # Replay repeated requests in order, then keep answering with the last one
+            entry = recorded.pop(0) if len(recorded) > 1 else recorded[0]
+        time.sleep(entry.get('elapsed', 0) / self.speed)
+        return ReplayResponse(entry['status'], entry['body'])
+
+    def get_stats(self):
+        return {'requests': self.requests, 'unmatched': self.unmatched}
@@ -0,0 +1,51 @@
+import os
+import tempfile
+import time
+import unittest
+
+from benchmarks.session import load_fixture
+from lyrics_fetcher import GeniusLyricsFetcher
+from tests.support import ReplayHttpClient
+
+FIXTURE = os.path.join(os.path.dirname(__file__), 'fixtures', 'genius_search.json')
+
+
+class GeniusSearchTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.http = ReplayHttpClient(load_fixture(FIXTURE)['http'], speed=100)
+        self.fetcher = GeniusLyricsFetcher('token', http_client=self.http,
+                                           cache_dir=self.directory.name)
+
+    def tearDown(self):
+        self.fetcher.cache.close()
+        self.directory.cleanup()
+
+    def test_ranking_demotes_covers_and_translations(self):
+        hits = self.fetcher.search_genius('Queen', 'Bohemian Rhapsody')
+        urls = [hit['result']['url'] for hit in hits]
+        self.assertEqual(urls[0], 'https://genius.com/Queen-bohemian-rhapsody-lyrics')
+        self.assertEqual(len(urls), 4)
+
+    def test_search_cache_shared_across_versions(self):
+        remaster = self.fetcher.search_genius('Pink Floyd', 'Wish You Were Here - Remastered 2011')
+        live = self.fetcher.search_genius('Pink Floyd', 'Wish You Were Here - Live')
+        self.assertEqual(self.http.requests, 1)
+        self.assertEqual(remaster, live)
+        self.assertEqual(live[0]['result']['url'],
+                         'https://genius.com/Pink-floyd-wish-you-were-here-lyrics')
+        self.assertEqual(self.fetcher.cache.stats['search_hits'], 1)
+
+    def test_search_cache_expires(self):
+        self.fetcher.cache.search_ttl = 60
+        self.fetcher.search_genius('Pink Floyd', 'Wish You Were Here - Remastered 2011')
+        self.fetcher.cache.conn.execute("UPDATE search_results SET created_at = ?",
+                                        (time.time() - 61,))
+        self.fetcher.search_genius('Pink Floyd', 'Wish You Were Here - Live')
+        self.assertEqual(self.http.requests, 2)
+        self.assertEqual(self.http.unmatched, 0)
+        self.assertEqual(self.fetcher.cache.stats['search_hits'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
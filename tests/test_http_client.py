@@ -0,0 +1,140 @@
+import time
+import unittest
+
+import requests
+
+from tests.fake_server import FakeServer
+from utils.http_client import HttpClient, CircuitBreaker, CircuitOpenError
+
+
+def sequence(*responses):
+    """Route answering with each response in turn, then repeating the last."""
+    remaining = list(responses)
+
+    def route(query):
+        return remaining.pop(0) if len(remaining) > 1 else remaining[0]
+    return route
+
+
+def slow(query):
+    time.sleep(1.0)
+    return 200, {}, 'late'
+
+
+class HttpClientTest(unittest.TestCase):
+    def client(self, **options):
+        options.setdefault('backoff_base', 0.01)
+        options.setdefault('backoff_max', 0.05)
+        return HttpClient(**options)
+
+    def test_retries_transient_statuses(self):
+        routes = {'/flaky': sequence((503, {}, ''), (502, {}, ''), (200, {}, 'ok'))}
+        with FakeServer(routes) as server:
+            client = self.client(max_retries=3)
+            response = client.get(server.url + '/flaky')
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.text, 'ok')
+            self.assertEqual(server.count('/flaky'), 3)
+            self.assertEqual(client.get_stats()['retries'], 2)
+
+    def test_gives_up_after_max_retries(self):
+        with FakeServer({'/down': sequence((500, {}, ''))}) as server:
+            client = self.client(max_retries=2)
+            self.assertEqual(client.get(server.url + '/down').status_code, 500)
+            self.assertEqual(server.count('/down'), 3)
+
+    def test_does_not_retry_client_errors(self):
+        with FakeServer({'/missing': sequence((404, {}, ''))}) as server:
+            self.assertEqual(self.client().get(server.url + '/missing').status_code, 404)
+            self.assertEqual(server.count('/missing'), 1)
+
+    def test_honors_retry_after(self):
+        routes = {'/limited': sequence((429, {'Retry-After': '1'}, ''), (200, {}, 'ok'))}
+        with FakeServer(routes) as server:
+            started = time.monotonic()
+            response = self.client().get(server.url + '/limited')
+            self.assertEqual(response.status_code, 200)
+            self.assertGreaterEqual(time.monotonic() - started, 0.9)
+
+    def test_retry_after_too_long_returns_response(self):
+        routes = {'/limited': sequence((429, {'Retry-After': '120'}, ''), (200, {}, 'ok'))}
+        with FakeServer(routes) as server:
+            response = self.client(max_retry_after=5).get(server.url + '/limited')
+            self.assertEqual(response.status_code, 429)
+            self.assertEqual(server.count('/limited'), 1)
+
+    def test_timeout_raises_after_retries(self):
+        with FakeServer({'/slow': slow}) as server:
+            client = self.client(timeout=(1.0, 0.2), max_retries=1)
+            with self.assertRaises(requests.exceptions.Timeout):
+                client.get(server.url + '/slow')
+            self.assertEqual(server.count('/slow'), 2)
+
+    def test_circuit_opens_and_recovers(self):
+        healthy = {'up': False}
+
+        def route(query):
+            return (200, {}, 'ok') if healthy['up'] else (503, {}, '')
+
+        with FakeServer({'/service': route}) as server:
+            client = self.client(max_retries=0, failure_threshold=2, reset_timeout=0.3)
+            url = server.url + '/service'
+            client.get(url)
+            client.get(url)
+            self.assertEqual(client.get_stats()['circuits'][server.url[7:]], CircuitBreaker.OPEN)
+
+            with self.assertRaises(CircuitOpenError):
+                client.get(url)
+            self.assertEqual(server.count('/service'), 2)
+
+            time.sleep(0.35)
+            healthy['up'] = True
+            self.assertEqual(client.get(url).status_code, 200)
+            self.assertEqual(client.get_stats()['circuits'][server.url[7:]], CircuitBreaker.CLOSED)
+
+
+class CircuitBreakerTest(unittest.TestCase):
+    def open_breaker(self):
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.2)
+        breaker.record_failure()
+        return breaker
+
+    def test_open_blocks_until_reset_timeout(self):
+        breaker = self.open_breaker()
+        self.assertFalse(breaker.allow())
+        time.sleep(0.25)
+        self.assertTrue(breaker.allow())
+
+    def test_half_open_allows_a_single_trial(self):
+        breaker = self.open_breaker()
+        time.sleep(0.25)
+        allowed = [breaker.allow() for _ in range(5)]
+        self.assertEqual(allowed, [True, False, False, False, False])
+        self.assertEqual(breaker.state, CircuitBreaker.HALF_OPEN)
+
+    def test_trial_success_closes(self):
+        breaker = self.open_breaker()
+        time.sleep(0.25)
+        breaker.allow()
+        breaker.record_success()
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+        self.assertTrue(all(breaker.allow() for _ in range(3)))
+
+    def test_trial_failure_reopens(self):
+        breaker = self.open_breaker()
+        time.sleep(0.25)
+        breaker.allow()
+        breaker.record_failure()
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+        self.assertFalse(breaker.allow())
+
+    def test_lost_trial_is_replaced_after_timeout(self):
+        breaker = self.open_breaker()
+        time.sleep(0.25)
+        self.assertTrue(breaker.allow())
+        time.sleep(0.25)
+        self.assertTrue(breaker.allow())
+
+
+if __name__ == '__main__':
+    unittest.main()
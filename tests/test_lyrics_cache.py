@@ -0,0 +1,38 @@
+import os
+import tempfile
+import unittest
+
+from utils.lyrics_cache import LyricsCache
+
+LYRICS = [{'text': 'first line', 'start_time': None, 'duration': None, 'line_number': 0}]
+
+
+class FindSimilarTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.cache = LyricsCache(os.path.join(self.directory.name, 'lyrics.sqlite3'))
+
+    def tearDown(self):
+        self.cache.close()
+        self.directory.cleanup()
+
+    def test_borrows_lyrics_across_versions(self):
+        self.cache.put('Band', 'Song', LYRICS)
+        for title in ('Song - Remastered 2011', 'Song - Live', 'Song (feat. Guest)'):
+            match = self.cache.find_similar('Band', title)
+            self.assertIsNotNone(match, title)
+            self.assertEqual(match[1], LYRICS)
+
+    def test_versioned_entry_serves_plain_title(self):
+        self.cache.put('Band', 'Song - Live', LYRICS)
+        self.assertIsNotNone(self.cache.find_similar('Band', 'Song'))
+
+    def test_plain_titles_do_not_collide(self):
+        # Two different "Intro" tracks by one artist, stored under different artist credits
+        self.cache.put('Band feat. Guest', 'Intro', LYRICS)
+        self.assertIsNone(self.cache.find_similar('Band', 'Intro'))
+        self.assertIsNone(self.cache.find_similar('Band', 'Intro!'))
+
+
+if __name__ == '__main__':
+    unittest.main()
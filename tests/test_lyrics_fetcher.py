@@ -0,0 +1,61 @@
+import tempfile
+import unittest
+
+from lyrics_fetcher import GeniusLyricsFetcher
+from utils.lyrics_timing import has_timing
+
+PLAIN = [{'text': f"Line {i}", 'start_time': None, 'duration': None, 'line_number': i}
+         for i in range(20)]
+
+
+def end_time(lyrics):
+    return lyrics[-1]['start_time'] + lyrics[-1]['duration']
+
+
+class RetimeSimilarTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.fetcher = GeniusLyricsFetcher('token', http_client=object(),
+                                           cache_dir=self.directory.name)
+        self.fetcher.fetch_lyrics_from_genius = self.fail_network
+        # The studio version was played first: lyrics estimated for 3:00
+        self.fetcher.add_estimated_timing('Band', 'Song', PLAIN, 'studio-id', 180000)
+
+    def tearDown(self):
+        self.fetcher.cache.close()
+        self.directory.cleanup()
+
+    def fail_network(self, artist, title):
+        self.fail(f"Unexpected Genius lookup for {artist} - {title}")
+
+    def test_other_version_keeps_its_own_timings(self):
+        studio = self.fetcher.fetch_lyrics('Band', 'Song', 'studio-id', 180000)
+        for _ in range(2):  # The second play is a plain cache hit
+            live = self.fetcher.fetch_lyrics('Band', 'Song - Live', 'live-id', 360000)
+            self.assertGreater(end_time(live), 300000)
+        self.assertEqual(self.fetcher.fetch_lyrics('Band', 'Song', 'studio-id', 180000), studio)
+        self.assertLess(end_time(studio), 180000)
+
+    def test_unknown_duration_borrows_text_only(self):
+        lyrics = self.fetcher.fetch_lyrics('Band', 'Song - Live', 'live-id')
+        self.assertEqual([line['text'] for line in lyrics], [line['text'] for line in PLAIN])
+        self.assertFalse(has_timing(lyrics))
+        self.assertFalse(has_timing(
+            self.fetcher.get_lyrics_from_cache('Band', 'Song - Live', 'live-id')))
+
+        live = self.fetcher.fetch_lyrics('Band', 'Song - Live', 'live-id', 360000)
+        self.assertGreater(end_time(live), 300000)
+
+    def test_real_timings_are_not_copied(self):
+        synced = [{'text': f"Line {i}", 'start_time': 10000 + i * 5000, 'duration': 5000,
+                   'line_number': i, 'words': [[10000 + i * 5000, f"Line {i}"]]}
+                  for i in range(20)]
+        self.fetcher.save_lyrics_to_cache('Band', 'Song', synced, 'studio-id')
+        live = self.fetcher.fetch_lyrics('Band', 'Song - Remastered', 'remaster-id', 360000)
+        self.assertTrue(all(line['estimated'] and 'words' not in line for line in live))
+        self.assertGreater(end_time(live), 300000)
+        self.assertEqual(self.fetcher.get_lyrics_from_cache('Band', 'Song', 'studio-id'), synced)
+
+
+if __name__ == '__main__':
+    unittest.main()
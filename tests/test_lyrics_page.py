@@ -0,0 +1,128 @@
+import os
+import unittest
+
+from utils import lyrics_page
+from utils.lyrics_page import (
+    extract_lyrics, LyricsPageParser, OLD_FORMAT, NEW_FORMAT, NEWEST_FORMAT, LYRICS_FORMATS
+)
+
+FIXTURE = os.path.join(os.path.dirname(__file__), 'fixtures', 'genius_page.html')
+
+EXPECTED = (
+    "[Verse 1]\n"
+    "Amazing grace! How sweet the sound\n"
+    "That saved a wretch like me\n"
+    "I once was lost, but now am found\n"
+    "Was blind, but now I see\n"
+    "\n"
+    "[Verse 2]\n"
+    "'Twas grace that taught my heart to fear\n"
+    "And grace my fears relieved\n"
+    "How precious did that grace appear\n"
+    "The hour I first believed\n"
+    "[Verse 3]\n"
+    "Through many dangers, toils and snares\n"
+    "I have already come\n"
+    "’Tis grace hath brought me safe thus far\n"
+    "And grace will lead me home"
+)
+
+LEGACY_PAGE = (
+    '<html><body><div class="song_body"><div class="lyrics">\n'
+    '<!--sse--><p>[Chorus]<br>\n<a href="/1/x" data-id="1">Row, row, row your boat</a><br>\n'
+    'Gently down the stream<br>\n<i>Merrily</i> &amp; merrily</p><!--/sse-->\n'
+    '</div><div class="lyrics">Second legacy block is ignored</div></div></body></html>'
+)
+
+
+def load_fixture():
+    with open(FIXTURE, 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+def feed_in_pieces(html, size, formats=LYRICS_FORMATS):
+    parser = LyricsPageParser(formats)
+    for start in range(0, len(html), size):
+        parser.feed(html[start:start + size])
+    parser.close()
+    return parser.result()
+
+
+class ExtractLyricsTest(unittest.TestCase):
+    def test_saved_page(self):
+        self.assertEqual(extract_lyrics(load_fixture()), (NEWEST_FORMAT, EXPECTED))
+
+    def test_header_and_widgets_are_excluded(self):
+        text = extract_lyrics(load_fixture())[1]
+        for noise in ("Contributors", "Translations", "Amazing Grace Lyrics", "John Newton",
+                      "You might also like", "Advertisement", "Scarborough", "Embed",
+                      "Annotation"):
+            self.assertNotIn(noise, text)
+
+    def test_legacy_layout(self):
+        fmt, text = extract_lyrics(LEGACY_PAGE)
+        self.assertEqual(fmt, OLD_FORMAT)
+        self.assertEqual(text.strip(), "[Chorus]\n\nRow, row, row your boat\n\n"
+                                       "Gently down the stream\n\nMerrily & merrily")
+
+    def test_new_layout_class(self):
+        html = ('<div class="Lyrics__Container-sc-1ynbvzw-6 x">One<br/>Two</div>'
+                '<div class="Lyrics__Container-sc-1ynbvzw-6 x">Ignored</div>')
+        self.assertEqual(extract_lyrics(html), (NEW_FORMAT, "One\nTwo"))
+
+    def test_nested_divs_stay_in_container(self):
+        html = ('<div data-lyrics-container="true">A<div><div>B</div></div><br>C</div>'
+                '<div>outside</div>')
+        self.assertEqual(extract_lyrics(html), (NEWEST_FORMAT, "AB\nC"))
+
+    def test_br_forms(self):
+        html = '<div data-lyrics-container="true">a<br>b<br/>c<br />d<BR>e</div>'
+        self.assertEqual(extract_lyrics(html)[1], "a\nb\nc\nd\ne")
+
+    def test_entities(self):
+        html = ('<div data-lyrics-container="true">Rock &amp; roll &#x27;til dawn&#8217;s '
+                '&quot;light&quot;&nbsp;&lt;3</div>')
+        self.assertEqual(extract_lyrics(html)[1],
+                         "Rock & roll 'til dawn’s \"light\" <3")
+
+    def test_excluded_block_with_void_tags(self):
+        html = ('<div data-lyrics-container="true">Keep<div data-exclude-from-selection="true">'
+                '<img src="x.png"><br><span>Drop<br/></span><input></div><br>Also keep</div>')
+        self.assertEqual(extract_lyrics(html)[1], "Keep\nAlso keep")
+
+    def test_formats_are_tried_in_order(self):
+        html = '<div class="lyrics">Old</div><div data-lyrics-container="true">Newest</div>'
+        self.assertEqual(extract_lyrics(html, [NEWEST_FORMAT, OLD_FORMAT]), (NEWEST_FORMAT, "Newest"))
+        self.assertEqual(extract_lyrics(html, [OLD_FORMAT]), (OLD_FORMAT, "Old"))
+
+    def test_no_lyrics(self):
+        self.assertEqual(extract_lyrics('<html><script>x = "<div class=\\"lyrics\\">";</script>'
+                                        '<div class="instrumental">No lyrics</div></html>'),
+                         (None, None))
+
+    def test_chunk_boundaries(self):
+        page = load_fixture()
+        for size in (1, 7, 64, 1000):
+            self.assertEqual(feed_in_pieces(page, size), (NEWEST_FORMAT, EXPECTED), size)
+        self.assertEqual(feed_in_pieces(LEGACY_PAGE, 3), extract_lyrics(LEGACY_PAGE))
+
+    def test_small_chunks_through_extract(self):
+        original = lyrics_page.CHUNK_SIZE
+        lyrics_page.CHUNK_SIZE = 5
+        try:
+            self.assertEqual(extract_lyrics(load_fixture()), (NEWEST_FORMAT, EXPECTED))
+            self.assertEqual(extract_lyrics(LEGACY_PAGE, [OLD_FORMAT])[0], OLD_FORMAT)
+        finally:
+            lyrics_page.CHUNK_SIZE = original
+
+    def test_single_container_format_stops_early(self):
+        parser = LyricsPageParser([OLD_FORMAT])
+        parser.feed('<div class="lyrics">Done</div>')
+        self.assertTrue(parser.finished)
+        parser = LyricsPageParser([NEWEST_FORMAT])
+        parser.feed('<div data-lyrics-container="true">More may follow</div>')
+        self.assertFalse(parser.finished)
+
+
+if __name__ == '__main__':
+    unittest.main()
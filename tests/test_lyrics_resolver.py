@@ -0,0 +1,173 @@
+import shutil
+import tempfile
+import time
+import unittest
+
+from common import LyricstifyFetcher
+from lyrics_fetcher import GeniusLyricsFetcher
+from lyrics_resolver import LyricsResolver, LyricsProvider, LyricstifyProvider
+
+GENIUS_LINES = [f"Genius line {i}" for i in range(12)]
+SYNCED = [{'text': 'Synced line', 'start_time': 1000, 'duration': 2000, 'line_number': 0}]
+PLAIN = [{'text': 'Plain line', 'start_time': None, 'duration': None, 'line_number': 0}]
+
+
+class SlowGenius(LyricsProvider):
+    """Genius stand-in that answers after a delay."""
+
+    name = 'genius'
+
+    def __init__(self, delay):
+        self.delay = delay
+
+    def fetch(self, artist, title, track_id=None):
+        time.sleep(self.delay)
+        return [{'text': text, 'start_time': None, 'duration': None, 'line_number': i}
+                for i, text in enumerate(GENIUS_LINES)]
+
+
+def feed(lyricstify, count, prefix):
+    """Record lines as if the Lyricstify child had printed them."""
+    for i in range(count):
+        lyricstify._record({'type': 'line', 'text': f"{prefix} {i}"})
+
+
+class TimedProvider(LyricsProvider):
+    """Provider that answers after a delay and records when it was asked."""
+
+    def __init__(self, name, lyrics, delay=0.0):
+        self.name = name
+        self.lyrics = lyrics
+        self.delay = delay
+        self.started = None
+
+    def fetch(self, artist, title, track_id=None):
+        self.started = time.monotonic()
+        time.sleep(self.delay)
+        return self.lyrics
+
+
+class ResolverSchedulingTest(unittest.TestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.genius_fetcher = GeniusLyricsFetcher('token', cache_dir=self.cache_dir)
+
+    def tearDown(self):
+        self.resolver.executor.shutdown(wait=True)
+        self.genius_fetcher.cache.close()
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+    def make_resolver(self, cheap, costly, **kwargs):
+        self.resolver = LyricsResolver(self.genius_fetcher, [costly, cheap], **kwargs)
+        # History: the costly provider is slow and often empty-handed
+        for _ in range(5):
+            self.resolver.provider_stats[costly.name].record(2.0, None)
+            self.resolver.provider_stats[cheap.name].record(0.05, SYNCED)
+        self.assertEqual(self.resolver.ordered_providers(), [cheap, costly])
+        return self.resolver
+
+    def test_costly_provider_not_asked_when_cheap_one_answers(self):
+        cheap, costly = TimedProvider('lrc', SYNCED), TimedProvider('genius', PLAIN)
+        resolver = self.make_resolver(cheap, costly, hedge_delay=1.0)
+        self.assertEqual(resolver.resolve('Artist', 'Song'), ('lrc', SYNCED))
+        self.assertIsNone(costly.started)
+
+    def test_miss_starts_next_provider_at_once(self):
+        cheap, costly = TimedProvider('lrc', None), TimedProvider('genius', PLAIN)
+        resolver = self.make_resolver(cheap, costly, hedge_delay=5.0, plain_grace=0.1)
+        started = time.monotonic()
+        self.assertEqual(resolver.resolve('Artist', 'Song'), ('genius', PLAIN))
+        self.assertLess(costly.started - started, 1.0)
+
+    def test_slow_provider_is_hedged_after_delay(self):
+        cheap = TimedProvider('lrc', SYNCED, delay=1.0)
+        costly = TimedProvider('genius', SYNCED)
+        resolver = self.make_resolver(cheap, costly, hedge_delay=0.2)
+        started = time.monotonic()
+        self.assertEqual(resolver.resolve('Artist', 'Song')[0], 'genius')
+        self.assertGreaterEqual(costly.started - started, 0.2)
+        self.assertLess(costly.started - started, 0.9)
+
+    def test_late_cacheable_answer_is_cached(self):
+        cheap = TimedProvider('lyricstify', None)
+        cheap.cacheable = False
+        costly = TimedProvider('genius', PLAIN, delay=0.6)
+        resolver = self.make_resolver(cheap, costly, deadline=0.2)
+        self.assertEqual(resolver.resolve('Artist', 'Song', 'track-1'), (None, None))
+        self.assertIsNone(self.genius_fetcher.get_lyrics_from_cache('Artist', 'Song', 'track-1'))
+
+        resolver.executor.shutdown(wait=True)
+        cached = self.genius_fetcher.get_lyrics_from_cache('Artist', 'Song', 'track-1')
+        self.assertEqual([line['text'] for line in cached], ['Plain line'])
+
+    def test_late_answer_does_not_replace_cached_winner(self):
+        cheap = TimedProvider('lrc', SYNCED, delay=0.3)
+        costly = TimedProvider('genius', PLAIN, delay=0.6)
+        resolver = self.make_resolver(cheap, costly, hedge_delay=0.0)
+        lyrics = resolver.fetch_lyrics('Artist', 'Song', 'track-1')
+        self.assertEqual(lyrics[0]['text'], 'Synced line')
+
+        resolver.executor.shutdown(wait=True)
+        cached = self.genius_fetcher.get_lyrics_from_cache('Artist', 'Song', 'track-1')
+        self.assertEqual(cached[0]['text'], 'Synced line')
+
+
+class LyricstifyResolverTest(unittest.TestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.genius_fetcher = GeniusLyricsFetcher('token', cache_dir=self.cache_dir)
+        self.lyricstify = LyricstifyFetcher('.', command=['true'])
+        self.lyricstify.start = lambda: None  # Lines are fed by the test
+        self.current = {'id': 'track-b'}
+        provider = LyricstifyProvider(self.lyricstify,
+                                      lambda track_id: track_id == self.current['id'])
+        self.resolver = LyricsResolver(self.genius_fetcher, [SlowGenius(1.5), provider],
+                                       deadline=5.0, plain_grace=1.0)
+
+    def tearDown(self):
+        self.resolver.executor.shutdown(wait=True)
+        self.genius_fetcher.cache.close()
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+    def test_stale_buffer_does_not_beat_slow_genius(self):
+        self.lyricstify.set_track('track-a')
+        feed(self.lyricstify, 40, "Old song")
+        self.lyricstify.set_track('track-b')  # Spotify moved on
+
+        lyrics = self.resolver.fetch_lyrics('Artist', 'Song B', 'track-b', 180000)
+        self.assertEqual([line['text'] for line in lyrics], GENIUS_LINES)
+        self.assertIsNotNone(self.genius_fetcher.get_lyrics_from_cache('Artist', 'Song B',
+                                                                      'track-b'))
+
+    def test_lyricstify_waits_for_better_ranked_genius(self):
+        self.lyricstify.set_track('track-b')
+        feed(self.lyricstify, 20, "Song B")
+        name, lyrics = self.resolver.resolve('Artist', 'Song B', 'track-b')
+        self.assertEqual(name, 'genius')
+
+    def test_lyricstify_answer_is_not_cached(self):
+        self.resolver.providers[0].delay = 0.0
+        self.resolver.providers[0].fetch = lambda *args: None  # Genius has nothing
+        self.lyricstify.set_track('track-b')
+        feed(self.lyricstify, 20, "Song B")
+
+        lyrics = self.resolver.fetch_lyrics('Artist', 'Song B', 'track-b', 180000)
+        self.assertEqual(lyrics[0]['text'], "Song B 0")
+        self.assertIsNone(self.genius_fetcher.get_lyrics_from_cache('Artist', 'Song B',
+                                                                   'track-b'))
+
+    def test_partial_buffer_is_rejected(self):
+        self.lyricstify.set_track('track-b')
+        feed(self.lyricstify, 3, "Song B")
+        self.assertIsNone(self.lyricstify.get_track_lyrics('track-b', min_lines=10, wait=0))
+
+    def test_overflowed_buffer_is_rejected(self):
+        lyricstify = LyricstifyFetcher('.', command=['true'], buffer_size=5)
+        lyricstify.start = lambda: None
+        lyricstify.set_track('track-b')
+        feed(lyricstify, 8, "Song B")
+        self.assertIsNone(lyricstify.get_track_lyrics('track-b', min_lines=1, wait=0))
+
+
+if __name__ == '__main__':
+    unittest.main()
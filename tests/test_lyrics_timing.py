@@ -0,0 +1,154 @@
+import unittest
+
+from utils.lyrics_timing import (
+    parse_lrc, estimate_timings, count_syllables, SyncCorrection, TimingIndex
+)
+
+
+def plain(*texts):
+    return [{'text': text, 'start_time': None, 'duration': None, 'line_number': i}
+            for i, text in enumerate(texts)]
+
+
+class ParseLrcTest(unittest.TestCase):
+    def test_plain_lines(self):
+        lyrics = parse_lrc("[ti:Song]\n[00:01.00]First\n[00:03.50]Second\n")
+        self.assertEqual([(line['start_time'], line['text']) for line in lyrics],
+                         [(1000, 'First'), (3500, 'Second')])
+        self.assertEqual(lyrics[0]['duration'], 2500)
+        self.assertIsNone(lyrics[1]['duration'])
+
+    def test_repeated_line_shifts_word_times(self):
+        lyrics = parse_lrc("[00:10.00][01:10.00]<00:10.00>Na <00:10.50>na <00:11.00>hey\n")
+        self.assertEqual([line['start_time'] for line in lyrics], [10000, 70000])
+        self.assertEqual(lyrics[0]['words'], [[10000, 'Na'], [10500, 'na'], [11000, 'hey']])
+        self.assertEqual(lyrics[1]['words'], [[70000, 'Na'], [70500, 'na'], [71000, 'hey']])
+
+    def test_leading_untimed_word_follows_each_stamp(self):
+        lyrics = parse_lrc("[00:05.00][00:20.00]Oh <00:05.40>yeah\n")
+        self.assertEqual(lyrics[1]['words'], [[20000, 'Oh'], [20400, 'yeah']])
+
+    def test_offset_applies_to_words(self):
+        lyrics = parse_lrc("[offset:+500]\n[00:02.00][00:12.00]<00:02.00>Hi <00:02.50>there\n")
+        self.assertEqual(lyrics[0]['start_time'], 1500)
+        self.assertEqual(lyrics[1]['words'], [[11500, 'Hi'], [12000, 'there']])
+
+
+class EstimateTimingsTest(unittest.TestCase):
+    def test_counts_syllables(self):
+        self.assertEqual(count_syllables("cat"), 1)
+        self.assertEqual(count_syllables("beautiful morning"), 5)
+        self.assertGreaterEqual(count_syllables("\u5927\u597d"), 2)
+
+    def test_lines_fill_the_song_in_order(self):
+        lyrics = estimate_timings(plain(*[f"line number {i}" for i in range(12)]), 200000)
+        starts = [line['start_time'] for line in lyrics]
+        self.assertEqual(starts, sorted(starts))
+        self.assertGreaterEqual(starts[0], 3000)  # Lead-in for the intro
+        end = lyrics[-1]['start_time'] + lyrics[-1]['duration']
+        self.assertLessEqual(end, 200000 - 3000)  # Tail for the outro
+        self.assertGreater(end, 170000)
+        self.assertTrue(all(line['estimated'] for line in lyrics))
+
+    def test_longer_lines_get_more_time(self):
+        lyrics = estimate_timings(plain("Oh", "Somebody once told me the world is gonna roll me"),
+                                  60000)
+        self.assertGreater(lyrics[1]['duration'], lyrics[0]['duration'] * 3)
+
+    def test_structure_adds_gaps(self):
+        lines = plain("One two", "One two", "One two", "One two")
+        lines[1]['stanza_break'] = True
+        lines[2]['sections_before'] = ['[Chorus]']
+        lines[3]['sections_before'] = ['[Guitar Solo]']
+        lyrics = estimate_timings(lines, 120000)
+        gaps = [lyrics[i]['start_time'] - lyrics[i - 1]['start_time'] - lyrics[i - 1]['duration']
+                for i in range(1, 4)]
+        self.assertLess(gaps[0], gaps[1])
+        self.assertLess(gaps[1], gaps[2])
+
+    def test_needs_a_duration(self):
+        lines = plain("One", "Two")
+        self.assertIs(estimate_timings(lines, None), lines)
+
+
+class SyncCorrectionTest(unittest.TestCase):
+    def test_nudge_shifts_lines_later(self):
+        correction = SyncCorrection()
+        correction.nudge(250)
+        correction.nudge(250)
+        self.assertEqual(correction.offset_ms, 500)
+        self.assertEqual(correction.to_lyrics_time(10000), 9500)
+
+    def test_single_anchor_shifts_everything(self):
+        correction = SyncCorrection()
+        correction.add_anchor(12000, 10000)
+        self.assertEqual(correction.to_lyrics_time(12000), 10000)
+        self.assertEqual(correction.to_lyrics_time(2000), 0)
+        self.assertEqual(correction.to_lyrics_time(50000), 48000)
+
+    def test_interpolates_between_anchors(self):
+        correction = SyncCorrection(anchors=[(10000, 10000), (30000, 20000)])
+        self.assertEqual(correction.to_lyrics_time(20000), 15000)
+        self.assertEqual(correction.to_lyrics_time(5000), 5000)
+        self.assertEqual(correction.to_lyrics_time(40000), 30000)
+
+    def test_anchor_respects_offset(self):
+        correction = SyncCorrection(offset_ms=1000)
+        correction.add_anchor(11000, 9000)
+        self.assertEqual(correction.anchors, [(10000, 9000)])
+        self.assertEqual(correction.to_lyrics_time(11000), 9000)
+
+    def test_conflicting_anchors_are_dropped(self):
+        correction = SyncCorrection(anchors=[(10000, 10000), (20000, 20000), (30000, 30000)])
+        # Lyric 25000 sung at 15000 would run the mapping backwards past (20000, 20000)
+        correction.add_anchor(15000, 25000)
+        self.assertEqual(correction.anchors, [(10000, 10000), (15000, 25000), (30000, 30000)])
+        lyric_times = [correction.to_lyrics_time(p) for p in range(0, 40000, 1000)]
+        self.assertEqual(lyric_times, sorted(lyric_times))
+
+    def test_dict_round_trip(self):
+        correction = SyncCorrection(-300, [(5000, 4000)])
+        copy = SyncCorrection.from_dict(correction.as_dict())
+        self.assertEqual((copy.offset_ms, copy.anchors), (-300, [(5000, 4000)]))
+        self.assertTrue(SyncCorrection().is_empty())
+
+    def test_merge_keeps_later_adjustments(self):
+        saved = SyncCorrection(500, [(10000, 9000)])
+        session = SyncCorrection()
+        session.nudge(200)
+        session.add_anchor(40000, 30000)
+        saved.merge(session)
+        self.assertEqual(saved.offset_ms, 700)
+        # The session anchor still maps the position it was set at
+        self.assertEqual(saved.to_lyrics_time(40000), 30000)
+        # Saved anchors move with the extra nudge
+        self.assertEqual(saved.to_lyrics_time(10700), 9000)
+
+
+class TimingIndexTest(unittest.TestCase):
+    def test_synced_lookup(self):
+        index = TimingIndex([1000, 5000, 9000])
+        self.assertEqual([index.line_at(p) for p in (0, 1000, 4999, 5000, 20000)],
+                         [0, 0, 0, 1, 2])
+
+    def test_unsynced_lines_spread_over_track(self):
+        index = TimingIndex([None, None, None, None])
+        self.assertFalse(index.synced)
+        self.assertEqual(index.line_at(50000, 100000), 2)
+        self.assertEqual(index.line_start(1, 100000), 25000)
+        self.assertEqual(index.line_at(50000), 0)
+        self.assertEqual(TimingIndex([]).line_at(1000), -1)
+
+    def test_corrected_lookup(self):
+        correction = SyncCorrection()
+        index = TimingIndex([1000, 5000, 9000], correction)
+        self.assertEqual(index.line_at(5500), 1)
+        correction.nudge(1000)
+        self.assertEqual(index.line_at(5500), 0)
+        correction.add_anchor(9500, 9000)
+        self.assertEqual(index.line_at(9500), 2)
+        self.assertEqual(index.line_at(9400), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,118 @@
+import os
+import shutil
+import sys
+import tempfile
+import textwrap
+import time
+import unittest
+
+from common import LyricstifyFetcher
+from lyrics_resolver import LyricsResolver, LyricstifyProvider
+
+# Stands in for `node dist/cli.js pipe`: prints lines, then stays up or exits
+FAKE_PIPE = textwrap.dedent('''
+    import sys, time
+    mode = sys.argv[1]
+    for i in range(3):
+        print(("*" if i == 2 else "") + f"Line {i}", flush=True)
+    if mode == "stay":
+        time.sleep(60)
+''')
+
+
+def wait_until(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.02)
+    return condition()
+
+
+class LyricstifyFetcherTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.script = os.path.join(self.directory, 'fake_pipe.py')
+        with open(self.script, 'w') as f:
+            f.write(FAKE_PIPE)
+        self.fetchers = []
+
+    def tearDown(self):
+        for fetcher in self.fetchers:
+            fetcher.stop()
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def fetcher(self, command, **options):
+        options.setdefault('restart_delay', 0.05)
+        fetcher = LyricstifyFetcher(self.directory, command=command, **options)
+        self.fetchers.append(fetcher)
+        return fetcher
+
+    def test_streams_lines_and_current_line(self):
+        fetcher = self.fetcher([sys.executable, self.script, 'stay'])
+        texts = []
+        for event in fetcher.events(timeout=5):
+            texts.append(event['text'])
+            if len(texts) == 3:
+                break
+        self.assertEqual(texts, ['Line 0', 'Line 1', 'Line 2'])
+        self.assertEqual(fetcher.current_line, 'Line 2')
+
+    def test_stop_terminates_child(self):
+        fetcher = self.fetcher([sys.executable, self.script, 'stay'])
+        self.assertTrue(fetcher.get_current_lyrics(wait=5))
+        process = fetcher.process
+        fetcher.stop()
+        self.assertIsNotNone(process.poll())
+        fetcher.supervisor.join(timeout=5)
+        self.assertFalse(fetcher.supervisor.is_alive())
+
+    def test_restarts_child_that_exits(self):
+        fetcher = self.fetcher([sys.executable, self.script, 'exit'])
+        fetcher.start()
+        self.assertTrue(wait_until(lambda: fetcher.restarts >= 2))
+        self.assertIsNone(fetcher.failed)
+
+    def test_gives_up_on_missing_executable(self):
+        fetcher = self.fetcher([os.path.join(self.directory, 'no-such-node')])
+        fetcher.start()
+        fetcher.supervisor.join(timeout=5)
+        self.assertFalse(fetcher.supervisor.is_alive())
+        self.assertIsNotNone(fetcher.failed)
+        self.assertEqual(fetcher.restarts, 0)
+
+        started = time.monotonic()
+        self.assertEqual(fetcher.get_current_lyrics(wait=2), [])
+        self.assertLess(time.monotonic() - started, 0.5)
+        self.assertFalse(fetcher.supervisor.is_alive())  # start() did not try again
+
+    def test_gives_up_on_missing_directory(self):
+        fetcher = self.fetcher([sys.executable, self.script, 'stay'])
+        fetcher.lyricstify_path = os.path.join(self.directory, 'missing')
+        fetcher.start()
+        fetcher.supervisor.join(timeout=5)
+        self.assertIsNotNone(fetcher.failed)
+
+    def test_gives_up_on_repeated_silent_exits(self):
+        fetcher = self.fetcher([sys.executable, '-c', 'import sys; sys.exit(1)'],
+                               max_silent_exits=3)
+        fetcher.start()
+        fetcher.supervisor.join(timeout=10)
+        self.assertFalse(fetcher.supervisor.is_alive())
+        self.assertIn('without output', fetcher.failed)
+        self.assertEqual(fetcher.restarts, 2)
+
+    def test_resolver_shutdown_stops_child(self):
+        fetcher = self.fetcher([sys.executable, self.script, 'stay'])
+        fetcher.get_current_lyrics(wait=5)
+        process = fetcher.process
+        provider = LyricstifyProvider(fetcher, lambda track_id: True)
+        resolver = LyricsResolver(None, [provider])
+        resolver.shutdown()
+        self.assertIsNotNone(process.poll())
+        fetcher.supervisor.join(timeout=5)
+        self.assertFalse(fetcher.supervisor.is_alive())
+
+
+if __name__ == '__main__':
+    unittest.main()
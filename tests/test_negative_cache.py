@@ -0,0 +1,187 @@
+import json
+import tempfile
+import threading
+import time
+import unittest
+
+import requests
+
+from tests.support import ReplayResponse
+from controllers.sync_engine import SyncEngine, LyricsRenderer
+from lyrics_fetcher import (
+    GeniusLyricsFetcher, MISS_NO_HITS, MISS_NO_LYRICS, MISS_PARSE, MISS_NETWORK,
+    MISS_BACKOFF_BASE, MISS_BACKOFF_MAX, MISS_TTLS
+)
+
+PAGE_URL = 'https://genius.com/Band-song-lyrics'
+LYRICS_PAGE = '<div data-lyrics-container="true">First line<br>Second line</div>'
+INSTRUMENTAL_PAGE = ('<div class="LyricsPlaceholder__Message">'
+                     'This song is an instrumental</div>')
+CHANGED_MARKUP_PAGE = '<div class="SongLyrics__Body">First line<br>Second line</div>'
+
+
+class GeniusStandIn:
+    """Fake HttpClient with one Genius song, or none, or no network at all."""
+
+    def __init__(self, page=LYRICS_PAGE, hits=True, offline=False):
+        self.page = page
+        self.hits = hits
+        self.offline = offline
+        self.requests = 0
+
+    def get(self, url, params=None, **kwargs):
+        self.requests += 1
+        if self.offline:
+            raise requests.exceptions.ConnectionError("connection refused")
+        if url.endswith('/search'):
+            hits = [{'type': 'song', 'result': {'title': 'Song', 'url': PAGE_URL,
+                                                'primary_artist': {'name': 'Band'}}}]
+            return ReplayResponse(200, json.dumps({'response': {'hits': hits if self.hits else []}}))
+        return ReplayResponse(200, self.page)
+
+
+class NegativeCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.http = GeniusStandIn()
+        self.fetcher = GeniusLyricsFetcher('token', http_client=self.http,
+                                           cache_dir=self.directory.name)
+
+    def tearDown(self):
+        self.fetcher.cache.close()
+        self.directory.cleanup()
+
+    def fetch(self):
+        return self.fetcher.fetch_lyrics_from_genius('Band', 'Song')
+
+    def miss(self):
+        return self.fetcher.cache.get_negative('Band', 'Song')
+
+    def expire_miss(self):
+        miss = self.miss()
+        self.fetcher.cache.put_negative('Band', 'Song', miss['reason'], miss['failures'],
+                                        time.time() - 1)
+
+    def assertRetryIn(self, seconds):
+        self.assertAlmostEqual(self.miss()['retry_at'] - time.time(), seconds, delta=5)
+
+    def test_no_hits_is_remembered_for_a_week(self):
+        self.http.hits = False
+        self.assertIsNone(self.fetch())
+        self.assertEqual(self.miss()['reason'], MISS_NO_HITS)
+        self.assertRetryIn(7 * 24 * 3600)
+
+        # Replays make no requests until the entry expires
+        requests_made = self.http.requests
+        self.assertIsNone(self.fetch())
+        self.assertEqual(self.http.requests, requests_made)
+
+    def test_expired_miss_asks_again_and_success_clears_it(self):
+        self.http.offline = True
+        self.fetch()
+        self.expire_miss()
+        self.http.offline = False
+
+        lyrics = self.fetch()
+        self.assertEqual([line['text'] for line in lyrics], ['First line', 'Second line'])
+        self.assertIsNone(self.miss())
+
+    def test_instrumental_page(self):
+        self.http.page = INSTRUMENTAL_PAGE
+        self.assertIsNone(self.fetch())
+        self.assertEqual(self.miss()['reason'], MISS_NO_LYRICS)
+        self.assertRetryIn(3 * 24 * 3600)
+
+    def test_unparseable_page_is_retried_soon(self):
+        self.http.page = CHANGED_MARKUP_PAGE
+        self.assertIsNone(self.fetch())
+        self.assertEqual(self.miss()['reason'], MISS_PARSE)
+        self.assertRetryIn(3600)
+        self.assertLess(MISS_TTLS[MISS_PARSE], MISS_TTLS[MISS_NO_LYRICS])
+
+    def test_network_misses_back_off(self):
+        self.http.offline = True
+        delays = []
+        for _ in range(12):
+            self.assertIsNone(self.fetch())
+            miss = self.miss()
+            self.assertEqual(miss['reason'], MISS_NETWORK)
+            delays.append(round(miss['retry_at'] - time.time()))
+            self.expire_miss()
+        self.assertEqual(delays[:3], [MISS_BACKOFF_BASE, 2 * MISS_BACKOFF_BASE, 4 * MISS_BACKOFF_BASE])
+        self.assertEqual(delays[-1], MISS_BACKOFF_MAX)
+        self.assertEqual(self.miss()['failures'], 12)
+
+    def test_network_miss_before_retry_time_is_skipped(self):
+        self.http.offline = True
+        self.fetch()
+        requests_made = self.http.requests
+        self.fetch()
+        self.assertEqual(self.http.requests, requests_made)
+
+    def test_definite_miss_resets_backoff(self):
+        self.http.offline = True
+        self.fetch()
+        self.expire_miss()
+        self.http.offline = False
+        self.http.hits = False
+        self.fetch()
+        self.assertEqual(self.miss()['reason'], MISS_NO_HITS)
+        self.assertEqual(self.miss()['failures'], 1)
+
+    def test_clear_lyrics_miss(self):
+        self.http.hits = False
+        self.fetch()
+        self.assertIsNotNone(self.fetcher.cache.get_search('Band', 'Song'))
+
+        self.fetcher.clear_lyrics_miss('Band', 'Song')
+        self.assertIsNone(self.miss())
+        self.assertIsNone(self.fetcher.cache.get_search('Band', 'Song'))
+
+        self.http.hits = True
+        self.assertIsNotNone(self.fetch())
+
+
+class RecordingRenderer(LyricsRenderer):
+    def __init__(self):
+        self.lyrics = []
+        self.shown = threading.Event()
+
+    def show_lyrics(self, lines):
+        self.lyrics.append(lines)
+        self.shown.set()
+
+
+class RetryLyricsTest(unittest.TestCase):
+    """F5 in the lyrics window calls SyncEngine.retry_lyrics."""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.http = GeniusStandIn(hits=False)
+        self.fetcher = GeniusLyricsFetcher('token', http_client=self.http,
+                                           cache_dir=self.directory.name)
+        self.renderer = RecordingRenderer()
+        self.engine = SyncEngine(self.renderer)
+        self.engine.lyrics_fetcher = self.fetcher
+        self.engine.current_track = {'id': 'track-1', 'name': 'Song', 'duration_ms': 180000,
+                                     'artists': [{'name': 'Band'}]}
+        self.engine.current_track_id = 'track-1'
+
+    def tearDown(self):
+        self.engine.stop()
+        self.fetcher.cache.close()
+        self.directory.cleanup()
+
+    def test_retry_skips_the_remembered_miss(self):
+        self.assertIsNone(self.fetcher.fetch_lyrics('Band', 'Song', 'track-1', 180000))
+        self.assertIsNotNone(self.fetcher.cache.get_negative('Band', 'Song'))
+
+        self.http.hits = True
+        self.engine.retry_lyrics()
+        self.assertTrue(self.renderer.shown.wait(5))
+        self.assertEqual(self.renderer.lyrics, [['First line', 'Second line']])
+        self.assertIsNone(self.fetcher.cache.get_negative('Band', 'Song'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,136 @@
+import tempfile
+import threading
+import time
+import unittest
+
+import requests
+
+from tests.support import ReplayResponse
+from lyrics_fetcher import GeniusLyricsFetcher, MISS_NETWORK
+from utils.single_flight import SingleFlight
+
+THREADS = 8
+
+SEARCH = ('{"response": {"hits": [{"type": "song", "result": {"title": "Song", '
+          '"url": "https://genius.com/Band-song-lyrics", "primary_artist": {"name": "Band"}}}]}}')
+PAGE = ('<html><body><div data-lyrics-container="true">[Verse 1]<br>First line<br>'
+        'Second line<br>Third line</div></body></html>')
+
+
+class SlowHttpClient:
+    """Fake HttpClient that answers Genius search and page GETs after a delay."""
+
+    def __init__(self, delay=0.3, fail=False):
+        self.delay = delay
+        self.fail = fail
+        self.lock = threading.Lock()
+        self.searches = 0
+        self.pages = 0
+
+    def get(self, url, params=None, **kwargs):
+        with self.lock:
+            if url.endswith('/search'):
+                self.searches += 1
+            else:
+                self.pages += 1
+        time.sleep(self.delay)
+        if self.fail:
+            raise requests.exceptions.ConnectionError("connection refused")
+        return ReplayResponse(200, SEARCH if url.endswith('/search') else PAGE)
+
+
+def run_together(fn, count=THREADS):
+    """Call fn from count threads released at once; return results and errors."""
+    barrier = threading.Barrier(count)
+    results, errors = [], []
+
+    def worker():
+        barrier.wait()
+        try:
+            results.append(fn())
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=10)
+    return results, errors
+
+
+class SingleFlightTest(unittest.TestCase):
+    def test_concurrent_callers_share_one_call(self):
+        flights = SingleFlight()
+        calls = []
+
+        def slow():
+            calls.append(1)
+            time.sleep(0.2)
+            return 'result'
+
+        results, errors = run_together(lambda: flights.do('key', slow))
+        self.assertEqual(results, ['result'] * THREADS)
+        self.assertEqual(errors, [])
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(flights.get_stats(), {'calls': 1, 'shared': THREADS - 1, 'in_flight': 0})
+
+    def test_error_reaches_every_waiter(self):
+        flights = SingleFlight()
+
+        def broken():
+            time.sleep(0.2)
+            raise ValueError("boom")
+
+        results, errors = run_together(lambda: flights.do('key', broken))
+        self.assertEqual(results, [])
+        self.assertEqual(len(errors), THREADS)
+        self.assertTrue(all(isinstance(error, ValueError) for error in errors))
+        self.assertEqual(flights.get_stats()['calls'], 1)
+
+    def test_next_call_runs_again(self):
+        flights = SingleFlight()
+        self.assertEqual(flights.do('key', lambda: 1), 1)
+        self.assertEqual(flights.do('key', lambda: 2), 2)
+
+
+class ConcurrentFetchTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.fetcher.cache.close()
+        self.directory.cleanup()
+
+    def make_fetcher(self, http):
+        self.fetcher = GeniusLyricsFetcher('token', http_client=http,
+                                           cache_dir=self.directory.name)
+        return self.fetcher
+
+    def test_one_lookup_for_concurrent_fetches(self):
+        http = SlowHttpClient()
+        fetcher = self.make_fetcher(http)
+        results, errors = run_together(
+            lambda: fetcher.fetch_lyrics('Band', 'Song', 'track-1', 180000))
+        self.assertEqual(errors, [])
+        self.assertEqual(len(results), THREADS)
+        self.assertTrue(all(result == results[0] for result in results))
+        self.assertEqual([line['text'] for line in results[0]],
+                         ['First line', 'Second line', 'Third line'])
+        self.assertEqual(http.searches, 1)
+        self.assertEqual(http.pages, 1)
+        self.assertEqual(fetcher.cache.stats['writes'], 1)
+
+    def test_failure_reaches_every_waiter(self):
+        http = SlowHttpClient(fail=True)
+        fetcher = self.make_fetcher(http)
+        results, errors = run_together(lambda: fetcher.fetch_lyrics('Band', 'Song', 'track-1'))
+        self.assertEqual(errors, [])
+        self.assertEqual(results, [None] * THREADS)
+        self.assertEqual(http.searches, 1)
+        self.assertEqual(fetcher.cache.get_negative('Band', 'Song')['reason'], MISS_NETWORK)
+        self.assertEqual(fetcher.cache.stats['writes'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
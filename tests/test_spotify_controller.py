@@ -0,0 +1,74 @@
+import unittest
+
+from controllers.spotify_controller import SpotifyController
+
+ALBUM = 'spotify:album:album-1'
+PLAYLIST = 'spotify:playlist:playlist-1'
+
+
+def track(i):
+    return {'id': f'id-{i}', 'name': f'Song {i}', 'artists': [{'name': 'Band'}]}
+
+
+class CountingSpotify:
+    """spotipy stand-in counting context track listings."""
+
+    def __init__(self):
+        self.calls = []
+
+    def album_tracks(self, uri):
+        self.calls.append(uri)
+        return {'items': [track(i) for i in range(5)]}
+
+    def playlist_items(self, uri):
+        self.calls.append(uri)
+        if uri != PLAYLIST:
+            raise Exception("http status: 403")
+        return {'items': [{'track': track(i)} for i in range(5)]}
+
+
+class ContextTracksTest(unittest.TestCase):
+    def setUp(self):
+        self.controller = SpotifyController.__new__(SpotifyController)
+        self.controller.sp = CountingSpotify()
+        self.controller.context_tracks = None
+        self.play(ALBUM, 0)
+
+    def play(self, uri, index):
+        kind = uri.split(':')[1]
+        playback = {'item': dict(track(index), album={'name': 'Album'}),
+                    'context': {'type': kind, 'uri': uri}}
+        self.controller.get_playback_state = lambda: playback
+
+    def next_ids(self, limit=2):
+        return [t['id'] for t in self.controller.get_context_tracks(limit)]
+
+    def test_listing_is_reused_within_a_context(self):
+        self.assertEqual(self.next_ids(), ['id-1', 'id-2'])
+        self.play(ALBUM, 1)
+        self.assertEqual(self.next_ids(), ['id-2', 'id-3'])
+        self.play(ALBUM, 4)
+        self.assertEqual(self.next_ids(), [])
+        self.assertEqual(self.controller.sp.calls, [ALBUM])
+
+    def test_new_context_is_fetched(self):
+        self.next_ids()
+        self.play(PLAYLIST, 2)
+        self.assertEqual(self.next_ids(), ['id-3', 'id-4'])
+        self.play(ALBUM, 0)
+        self.next_ids()
+        self.assertEqual(self.controller.sp.calls, [ALBUM, PLAYLIST, ALBUM])
+
+    def test_album_tracks_get_the_album_for_art(self):
+        self.assertEqual(self.controller.get_context_tracks(1)[0]['album'], {'name': 'Album'})
+
+    def test_unreadable_playlist_is_not_asked_again(self):
+        self.play('spotify:playlist:private', 0)
+        self.assertEqual(self.next_ids(), [])
+        self.play('spotify:playlist:private', 1)
+        self.assertEqual(self.next_ids(), [])
+        self.assertEqual(self.controller.sp.calls, ['spotify:playlist:private'])
+
+
+if __name__ == '__main__':
+    unittest.main()
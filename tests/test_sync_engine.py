@@ -0,0 +1,66 @@
+import unittest
+
+from controllers.sync_engine import SyncEngine, LyricsRenderer
+from utils.lyrics_timing import SyncCorrection
+
+TRACK = {'id': 'track-1', 'name': 'Song', 'duration_ms': 180000, 'artists': [{'name': 'Band'}]}
+LYRICS = [{'text': 'First', 'start_time': 1000}, {'text': 'Second', 'start_time': 5000},
+          {'text': 'Third', 'start_time': 9000}]
+
+
+class SavingFetcher:
+    """Lyrics fetcher stand-in that records saved corrections."""
+
+    def __init__(self):
+        self.saved = []
+
+    def save_sync_correction(self, artist, title, correction, track_id=None):
+        self.saved.append((artist, title, correction.as_dict(), track_id))
+
+
+class SyncCorrectionLoadTest(unittest.TestCase):
+    def setUp(self):
+        self.fetcher = SavingFetcher()
+        self.engine = SyncEngine(LyricsRenderer(), correction_save_delay=60)
+        self.engine.lyrics_fetcher = self.fetcher
+        self.engine.current_track = TRACK
+        self.engine.current_track_id = TRACK['id']
+        self.engine.fetch_pipeline.current_key = TRACK['id']
+        self.engine.last_progress_ms = 5500
+        self.engine.on_fetch_result(TRACK['id'], 'lyrics', LYRICS)
+
+    def tearDown(self):
+        self.engine.fetch_pipeline.shutdown()
+
+    def test_saved_correction_applies(self):
+        self.engine.on_fetch_result(TRACK['id'], 'sync_correction', SyncCorrection(1000))
+        self.assertEqual(self.engine.timing_index.line_at(5500), 0)
+
+    def test_nudge_before_saved_correction_arrives_is_kept(self):
+        self.engine.nudge_lyrics(200)
+        self.engine.on_fetch_result(TRACK['id'], 'sync_correction', SyncCorrection(1000))
+        self.assertEqual(self.engine.sync_correction.offset_ms, 1200)
+        self.assertIs(self.engine.timing_index.corrections, self.engine.sync_correction)
+
+        # The pending save writes the merged corrections
+        self.engine.flush_sync_correction()
+        self.assertEqual(self.fetcher.saved,
+                         [('Band', 'Song', {'offset_ms': 1200, 'anchors': []}, 'track-1')])
+
+    def test_anchor_before_saved_correction_arrives_is_kept(self):
+        self.engine.mark_line_now()  # Line 2 (starts at 5000) is sung at 5500
+        self.engine.on_fetch_result(TRACK['id'], 'sync_correction', SyncCorrection(-2000))
+        correction = self.engine.sync_correction
+        self.assertEqual(correction.offset_ms, -2000)
+        self.assertEqual(correction.to_lyrics_time(5500), 5000)
+
+    def test_no_saved_correction_keeps_session(self):
+        self.engine.nudge_lyrics(300)
+        session = self.engine.sync_correction
+        self.engine.on_fetch_result(TRACK['id'], 'sync_correction', None)
+        self.assertIs(self.engine.sync_correction, session)
+        self.assertEqual(session.offset_ms, 300)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,233 @@
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+import warm_cache
+from controllers.spotify_controller import SpotifyController, DEFAULT_SCOPE
+from tests.fake_server import FakeServer
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+LYRICS_PAGE = '<div data-lyrics-container="true">One<br>Two<br>Three</div>'
+INSTRUMENTAL_PAGE = '<div class="instrumental">This song is an instrumental</div>'
+
+
+class StandInGenius(FakeServer):
+    """Genius API stand-in: one song per title, with a page for each."""
+
+    # Title -> page path, or None when search has no hits for it
+    SONGS = {
+        'First Song': '/first-song-lyrics',
+        'Second Song': '/second-song-lyrics',
+        'Instrumental': '/instrumental-lyrics',
+        'Missing Page': '/missing-page-lyrics',
+        'Unknown': None,
+    }
+
+    def __init__(self):
+        super().__init__({
+            '/search': self.search,
+            '/first-song-lyrics': lambda query: (200, {}, LYRICS_PAGE),
+            '/second-song-lyrics': lambda query: (200, {}, LYRICS_PAGE),
+            '/instrumental-lyrics': lambda query: (200, {}, INSTRUMENTAL_PAGE),
+        })
+
+    def search(self, query):
+        term = query['q'][0]
+        hits = []
+        for title, path in self.SONGS.items():
+            if term.endswith(' ' + title) and path:
+                hits.append({'type': 'song', 'result': {
+                    'title': title, 'url': self.url + path,
+                    'primary_artist': {'name': term[:-len(title) - 1]}}})
+        return 200, {'Content-Type': 'application/json'}, json.dumps({'response': {'hits': hits}})
+
+
+class WarmCacheCliTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.server = StandInGenius().__enter__()
+
+    def tearDown(self):
+        self.server.__exit__(None, None, None)
+        self.directory.cleanup()
+
+    def path(self, name):
+        return os.path.join(self.directory.name, name)
+
+    def write(self, name, text):
+        with open(self.path(name), 'w', encoding='utf-8') as f:
+            f.write(text)
+        return self.path(name)
+
+    def warm(self, *args):
+        """Run warm_cache.py and return its summary counts."""
+        command = [sys.executable, os.path.join(ROOT, 'warm_cache.py'), *args,
+                   '--genius-api', self.server.url, '--cache-dir', self.path('cache'),
+                   '--progress', self.path('progress.jsonl'), '--rate', '0', '--workers', '2']
+        result = subprocess.run(command, cwd=ROOT, capture_output=True, text=True, timeout=60)
+        self.assertEqual(result.returncode, 0, result.stdout + result.stderr)
+        summary = result.stdout.split('=== Summary ===', 1)[1]
+        return {name.strip(): int(value)
+                for name, value in re.findall(r'^([A-Za-z ()]+):\s+(\d+)$', summary, re.M)}
+
+    def test_csv(self):
+        csv_path = self.write('songs.csv', "artist,title,duration_ms\n"
+                                           "Band,First Song,180000\n"
+                                           "Band,Unknown,\n"
+                                           "Band,Instrumental,200000\n")
+        counts = self.warm('--csv', csv_path)
+        self.assertEqual(counts['Tracks'], 3)
+        self.assertEqual(counts['Fetched'], 1)
+        self.assertEqual(counts['No Genius hit'], 1)
+        self.assertEqual(counts['No lyrics'], 1)
+
+    def test_saved_tracks(self):
+        pages = {'items': [
+            {'track': {'id': 'id-1', 'name': 'First Song', 'duration_ms': 180000,
+                       'artists': [{'name': 'Band'}]}},
+            {'track': {'id': 'id-2', 'name': 'Second Song', 'duration_ms': 200000,
+                       'artists': [{'name': 'Band'}]}},
+        ]}
+        counts = self.warm('--saved-tracks', self.write('tracks.json', json.dumps(pages)))
+        self.assertEqual(counts['Fetched'], 2)
+        self.assertEqual(self.server.count('/search'), 2)
+
+    def test_account_export(self):
+        library = {'tracks': [{'artist': 'Band', 'track': 'First Song',
+                               'uri': 'spotify:track:id-1'}]}
+        counts = self.warm('--saved-tracks', self.write('YourLibrary.json', json.dumps(library)))
+        self.assertEqual(counts['Fetched'], 1)
+
+    def test_resume_skips_finished_tracks(self):
+        csv_path = self.write('songs.csv', "Band,First Song\n"
+                                           "Band,Unknown\n"
+                                           "Band,Missing Page\n")
+        first = self.warm('--csv', csv_path)
+        self.assertEqual(first['Fetched'], 1)
+        self.assertEqual(first['Failed (retry)'], 1)
+        searches = self.server.count('/search')
+
+        # Finished tracks and Genius misses are skipped; the failed page is retried
+        second = self.warm('--csv', csv_path)
+        self.assertEqual(second['Already done'], 2)
+        self.assertEqual(second['Failed (retry)'], 1)
+        self.assertEqual(self.server.count('/search'), searches)
+        self.assertEqual(self.server.count('/first-song-lyrics'), 1)
+
+        with open(self.path('progress.jsonl'), encoding='utf-8') as f:
+            statuses = [json.loads(line)['status'] for line in f]
+        self.assertEqual(len(statuses), 4)
+
+
+class SlowCachedFetcher:
+    """Fetcher stand-in whose cache lookups take a while and always hit."""
+
+    def get_lyrics_from_cache(self, artist, title, track_id=None):
+        time.sleep(0.2)
+        return [{'text': 'Line'}]
+
+
+class InterruptTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'progress.jsonl')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_tracks_running_at_interrupt_are_recorded(self):
+        entries = [{'artist': 'Band', 'title': f'Song {i}', 'track_id': f'id-{i}',
+                    'duration_ms': None} for i in range(6)]
+
+        def interrupt(*args, **kwargs):
+            raise KeyboardInterrupt
+
+        with mock.patch.object(warm_cache, 'wait', interrupt), mock.patch('sys.stdout'):
+            counts = warm_cache.warm(SlowCachedFetcher(), entries, warm_cache.Progress(self.path),
+                                     workers=2, rate=0)
+        # Two tracks were running; the two queued behind them were cancelled
+        self.assertEqual(counts['cached'], 2)
+        progress = warm_cache.Progress(self.path)
+        self.assertEqual([progress.is_done(entry) for entry in entries],
+                         [True, True, False, False, False, False])
+
+
+class ConfigTest(unittest.TestCase):
+    def run_main(self, *args):
+        with mock.patch.object(sys, 'argv', ['warm_cache.py', *args]), \
+                mock.patch.object(warm_cache, 'load_config', return_value=None) as load_config:
+            self.assertEqual(warm_cache.main(), 1)
+        return load_config.call_args.args[0]
+
+    def test_files_need_only_genius(self):
+        self.assertEqual(self.run_main('--csv', 'songs.csv'), ['genius_access_token'])
+        self.assertEqual(self.run_main('--saved-tracks', 'tracks.json'), ['genius_access_token'])
+
+    def test_playlist_needs_spotify(self):
+        self.assertIn('spotify_client_id', self.run_main('--playlist', 'playlist-id'))
+
+
+class SpotifyError(Exception):
+    """Stands in for spotipy's SpotifyException."""
+
+    def __init__(self, http_status):
+        super().__init__(f"http status: {http_status}")
+        self.http_status = http_status
+
+
+class FakeSpotify:
+    def __init__(self, error=None):
+        self.error = error
+
+    def playlist_items(self, playlist_id, additional_types=None):
+        if self.error:
+            raise self.error
+        return {'items': [{'track': {'id': 'id-1', 'name': 'First Song', 'type': 'track',
+                                     'artists': [{'name': 'Band'}]}}], 'next': None}
+
+
+class LoadPlaylistTest(unittest.TestCase):
+    def controller(self, sp):
+        controller = SpotifyController.__new__(SpotifyController)
+        controller.sp = sp
+        controller.token_info = {'access_token': 'token'}
+        controller.cache_path = '.spotify_cache'
+        controller.cleanup = lambda: None
+        return controller
+
+    def load(self, sp):
+        with mock.patch.object(warm_cache, 'initialize_spotify',
+                               return_value=self.controller(sp)) as initialize:
+            entries = warm_cache.load_playlist({}, 'playlist-id')
+        self.scope = initialize.call_args.kwargs['scope']
+        return entries
+
+    def test_reads_tracks(self):
+        self.assertEqual([entry['title'] for entry in self.load(FakeSpotify())], ['First Song'])
+
+    def test_only_playlist_loading_asks_for_playlist_scope(self):
+        self.load(FakeSpotify())
+        self.assertIn('playlist-read-private', self.scope.split())
+        self.assertNotIn('playlist-read-private', DEFAULT_SCOPE.split())
+        self.assertTrue(set(DEFAULT_SCOPE.split()) <= set(self.scope.split()))
+
+    def test_private_playlist_reports_refusal(self):
+        with mock.patch('sys.stdout') as stdout:
+            self.assertIsNone(self.load(FakeSpotify(SpotifyError(403))))
+        printed = ''.join(call.args[0] for call in stdout.write.call_args_list)
+        self.assertIn('refused access to playlist playlist-id', printed)
+
+    def test_missing_playlist_is_an_error_not_empty(self):
+        with mock.patch('sys.stdout'):
+            self.assertIsNone(self.load(FakeSpotify(SpotifyError(404))))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,112 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class UIDispatcher:
+    """Bounded, coalescing queue of widget updates drained on the Tk main loop.
+
+    Background threads post callables under a key; posting again under the
+    same key replaces the pending call, so only the latest value per frame
+    is applied. The main loop drains the queue with ``after`` and stops each
+    frame once the item cap or the time budget is reached.
+    """
+
+    def __init__(self, root, interval_ms=16, max_items_per_frame=32,
+                 frame_budget_ms=8.0, max_pending=256):
+        self.root = root
+        self.interval_ms = interval_ms
+        self.max_items_per_frame = max_items_per_frame
+        self.frame_budget_ms = frame_budget_ms
+        self.max_pending = max_pending
+        self.lock = threading.Lock()
+        self.pending = OrderedDict()
+        self.after_id = None
+        self.sequence = 0
+
+        # Counters for measuring main-thread work
+        self.stats = {
+            'posted': 0,
+            'applied': 0,
+            'coalesced': 0,
+            'dropped': 0,
+            'errors': 0,
+            'frames': 0,
+            'deferred_frames': 0,
+            'total_frame_ms': 0.0,
+            'max_frame_ms': 0.0,
+        }
+
+    def post(self, key, callback, *args):
+        """Queue callback(*args) for the main thread, replacing any pending call for key."""
+        with self.lock:
+            if key is None:
+                self.sequence += 1
+                key = ('call', self.sequence)
+            self.stats['posted'] += 1
+            if key in self.pending:
+                self.stats['coalesced'] += 1
+            elif len(self.pending) >= self.max_pending:
+                # Drop the oldest update rather than growing without bound
+                self.pending.popitem(last=False)
+                self.stats['dropped'] += 1
+            self.pending[key] = (callback, args)
+
+    def call(self, callback, *args):
+        """Queue a one-off callback that is never coalesced."""
+        self.post(None, callback, *args)
+
+    def start(self):
+        """Start draining the queue on the Tk main loop."""
+        if self.after_id is None:
+            self.after_id = self.root.after(self.interval_ms, self.drain)
+
+    def stop(self):
+        """Stop draining the queue."""
+        if self.after_id is not None:
+            try:
+                self.root.after_cancel(self.after_id)
+            except Exception:
+                pass
+            self.after_id = None
+
+    def drain(self):
+        """Apply queued updates within this frame's budget."""
+        started = time.perf_counter()
+        deadline = started + self.frame_budget_ms / 1000
+        applied = 0
+        try:
+            while applied < self.max_items_per_frame:
+                with self.lock:
+                    if not self.pending:
+                        break
+                    key, (callback, args) = self.pending.popitem(last=False)
+                try:
+                    callback(*args)
+                except Exception as e:
+                    self.stats['errors'] += 1
+                    print(f"Error applying UI update {key!r}: {e}")
+                applied += 1
+                if time.perf_counter() >= deadline:
+                    break
+
+            with self.lock:
+                if self.pending:
+                    self.stats['deferred_frames'] += 1
+            if applied:
+                elapsed_ms = (time.perf_counter() - started) * 1000
+                self.stats['applied'] += applied
+                self.stats['frames'] += 1
+                self.stats['total_frame_ms'] += elapsed_ms
+                self.stats['max_frame_ms'] = max(self.stats['max_frame_ms'], elapsed_ms)
+        finally:
+            self.after_id = self.root.after(self.interval_ms, self.drain)
+
+    def get_stats(self):
+        """Return a copy of the dispatcher counters."""
+        with self.lock:
+            stats = dict(self.stats)
+            stats['pending'] = len(self.pending)
+        frames = stats['frames']
+        stats['avg_frame_ms'] = stats['total_frame_ms'] / frames if frames else 0.0
+        return stats
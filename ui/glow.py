@@ -0,0 +1,107 @@
+import time
+
+
+def glow_colors(interpolate_color, start, end, steps=10):
+    """Precompute one pulse of the glow: start -> end -> start."""
+    ramp = [interpolate_color(start, end, (steps - i) / steps) for i in range(steps)]
+    return ramp + ramp[-2:0:-1]
+
+
+class GlowAnimator:
+    """Pulse the current lyric line by recoloring a single Text tag.
+
+    The tag is only moved when the highlighted line changes; each frame
+    just reconfigures its foreground from a precomputed color table, so
+    the widget's text and tag ranges are never touched while animating.
+    The animation stops while any pause reason is set (e.g. playback
+    paused or window hidden) and resumes when all are cleared.
+    """
+
+    def __init__(self, root, text, colors, tag="glow", interval_ms=50):
+        self.root = root
+        self.text = text
+        self.colors = list(colors)
+        self.tag = tag
+        self.interval_ms = interval_ms
+        self.step = 0
+        self.range = None
+        self.after_id = None
+        self.paused = set()
+        self.stats = {'frames': 0, 'busy_ms': 0.0, 'pauses': 0}
+
+        self.text.tag_configure(self.tag, foreground=self.colors[0])
+        self.text.tag_raise(self.tag)  # Glow color wins over the highlight color
+
+    def attach(self, start, end):
+        """Move the glow to a new line and restart the pulse."""
+        if self.range:
+            self.text.tag_remove(self.tag, *self.range)
+        self.range = (start, end)
+        self.text.tag_add(self.tag, start, end)
+        self.step = 0
+        self.text.tag_configure(self.tag, foreground=self.colors[0])
+        self._schedule()
+
+    def detach(self):
+        """Remove the glow from its line and stop animating."""
+        self._cancel()
+        if self.range:
+            self.text.tag_remove(self.tag, *self.range)
+        self.range = None
+
+    def reset(self):
+        """Forget the glowing line after the widget's text was replaced."""
+        self._cancel()
+        self.range = None
+
+    def pause(self, reason):
+        """Stop animating until resume(reason) is called."""
+        if not self.paused:
+            self.stats['pauses'] += 1
+        self.paused.add(reason)
+        self._cancel()
+
+    def resume(self, reason):
+        """Clear a pause reason and continue if no others remain."""
+        self.paused.discard(reason)
+        self._schedule()
+
+    def set_paused(self, reason, paused):
+        if paused:
+            self.pause(reason)
+        else:
+            self.resume(reason)
+
+    def is_running(self):
+        return self.after_id is not None
+
+    def _schedule(self):
+        if self.after_id is None and self.range and not self.paused:
+            self.after_id = self.root.after(self.interval_ms, self._tick)
+
+    def _cancel(self):
+        if self.after_id is not None:
+            self.root.after_cancel(self.after_id)
+            self.after_id = None
+
+    def _tick(self):
+        """Show the next color of the pulse."""
+        self.after_id = None
+        started = time.perf_counter()
+        try:
+            self.step = (self.step + 1) % len(self.colors)
+            self.text.tag_configure(self.tag, foreground=self.colors[self.step])
+        except Exception as e:
+            print(f"Error in glow animation: {e}")
+            return
+        self.stats['frames'] += 1
+        self.stats['busy_ms'] += (time.perf_counter() - started) * 1000
+        self._schedule()
+
+    def get_stats(self):
+        """Return frame counters and whether the animation is running."""
+        stats = dict(self.stats)
+        stats['running'] = self.is_running()
+        stats['paused_by'] = sorted(self.paused)
+        stats['avg_frame_ms'] = stats['busy_ms'] / stats['frames'] if stats['frames'] else 0.0
+        return stats
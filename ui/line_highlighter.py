@@ -0,0 +1,64 @@
+import tkinter.font as tkfont
+
+
+class LineHighlighter:
+    """Move a highlight tag between lines of a Text widget.
+
+    Only the previously highlighted line and the new one are touched, so
+    the cost of a line change does not grow with the length of the lyrics.
+    Tags listed in ``transient_tags`` (e.g. glow steps) are also cleared
+    from the previous line. Centering sets the view directly instead of
+    forcing a layout pass with ``update_idletasks``.
+    """
+
+    def __init__(self, text, tag="current_line", transient_tags=()):
+        self.text = text
+        self.tag = tag
+        self.transient_tags = tuple(transient_tags)
+        self.line = None
+        self.line_height = None
+        self.stats = {'highlights': 0}
+
+    @staticmethod
+    def line_range(line_num):
+        return f"{line_num}.0", f"{line_num}.end"
+
+    def reset(self):
+        """Forget the highlighted line after the widget's text was replaced."""
+        self.line = None
+
+    def clear(self):
+        """Remove the highlight from the current line."""
+        if self.line is None:
+            return
+        start, end = self.line_range(self.line)
+        self.text.tag_remove(self.tag, start, end)
+        for tag in self.transient_tags:
+            self.text.tag_remove(tag, start, end)
+        self.line = None
+
+    def highlight(self, line_num, center=True):
+        """Highlight line_num and return its (start, end) indices."""
+        start, end = self.line_range(line_num)
+        if line_num == self.line:
+            return start, end
+        self.clear()
+        self.text.tag_add(self.tag, start, end)
+        self.line = line_num
+        self.stats['highlights'] += 1
+        if center:
+            self.center(line_num)
+        return start, end
+
+    def visible_lines(self):
+        """Number of text lines that fit in the widget."""
+        if self.line_height is None:
+            font = tkfont.Font(font=self.text.cget('font'))
+            spacing = int(self.text.cget('spacing1')) + int(self.text.cget('spacing3'))
+            self.line_height = max(1, font.metrics('linespace') + spacing)
+        return max(1, self.text.winfo_height() // self.line_height)
+
+    def center(self, line_num):
+        """Scroll so line_num sits in the middle of the widget."""
+        top = max(1, line_num - self.visible_lines() // 2)
+        self.text.yview(f"{top}.0")
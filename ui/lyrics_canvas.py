@@ -0,0 +1,195 @@
+import tkinter as tk
+import tkinter.font as tkfont
+from array import array
+from bisect import bisect_right
+
+
+class LyricsCanvas:
+    """Virtualized lyric view drawn on a Canvas with pixel scrolling.
+
+    Line heights are measured once per song (and again on resize), so
+    finding the lines in view is a binary search over their offsets. Only
+    the visible lines plus a small margin exist as canvas items, so memory
+    and redraw cost do not depend on the length of the song. Scrolling to
+    a new line is eased over ``scroll_ms`` of playback time and advanced by
+    update_scroll() with the playback position.
+    """
+
+    def __init__(self, parent, font, highlight_font, fg, highlight_fg, bg,
+                 padx=20, pady=20, line_gap=30, margin_lines=3, scroll_ms=350):
+        self.canvas = tk.Canvas(parent, bg=bg, bd=0, highlightthickness=0)
+        self.font = tkfont.Font(font=font)
+        self.highlight_font = tkfont.Font(font=highlight_font)
+        self.fg = fg
+        self.highlight_fg = highlight_fg
+        self.padx = padx
+        self.pady = pady
+        self.line_gap = line_gap
+        self.margin_lines = margin_lines
+        self.scroll_ms = scroll_ms
+
+        self.lines = []
+        self.tops = array('d')  # Offset of each line from the top of the song
+        self.heights = array('d')
+        self.total_height = 0.0
+        self.width = 0
+        self.items = {}  # Line index -> canvas item, for lines near the view
+        self.current = -1
+
+        self.offset = 0.0  # Song offset shown at the top of the canvas
+        self.scroll_from = 0.0
+        self.scroll_to = 0.0
+        self.scroll_start_ms = None
+
+        self.stats = {'items_created': 0, 'items_deleted': 0, 'layouts': 0}
+
+        self.canvas.bind("<Configure>", self.on_resize)
+        self.canvas.bind("<MouseWheel>", self.on_wheel)
+
+    def pack(self, **options):
+        self.canvas.pack(**options)
+
+    def wrap_width(self):
+        return max(50, self.width - 2 * self.padx)
+
+    def measure(self, text):
+        """Height of a line wrapped to the canvas width (bold, the widest style)."""
+        width = self.wrap_width()
+        space = self.highlight_font.measure(' ')
+        rows, row_width = 1, 0
+        for word in text.split():
+            word_width = self.highlight_font.measure(word)
+            if row_width and row_width + space + word_width > width:
+                rows += 1
+                row_width = word_width
+            else:
+                row_width += (space if row_width else 0) + word_width
+        return rows * self.highlight_font.metrics('linespace') + self.line_gap
+
+    def layout(self):
+        """Measure every line and rebuild the offset table."""
+        self.tops = array('d')
+        self.heights = array('d')
+        top = float(self.pady)
+        for text in self.lines:
+            height = self.measure(text)
+            self.tops.append(top)
+            self.heights.append(height)
+            top += height
+        self.total_height = top + self.pady
+        self.stats['layouts'] += 1
+
+    def set_lines(self, lines):
+        """Show a new song's lines, scrolled to the top."""
+        self.lines = list(lines)
+        self.current = -1
+        self.offset = 0.0
+        self.scroll_start_ms = None
+        self.clear_items()
+        self.layout()
+        self.redraw()
+
+    def clear_items(self):
+        for item in self.items.values():
+            self.canvas.delete(item)
+        self.stats['items_deleted'] += len(self.items)
+        self.items = {}
+
+    def visible_range(self):
+        """Indices of the first and last line to keep as items."""
+        if not self.lines:
+            return 0, -1
+        view_height = self.canvas.winfo_height()
+        first = bisect_right(self.tops, self.offset) - 1 - self.margin_lines
+        last = bisect_right(self.tops, self.offset + view_height) - 1 + self.margin_lines
+        return max(0, first), min(len(self.lines) - 1, last)
+
+    def redraw(self):
+        """Create items for lines coming into view and drop those leaving it."""
+        first, last = self.visible_range()
+        for index in [i for i in self.items if i < first or i > last]:
+            self.canvas.delete(self.items.pop(index))
+            self.stats['items_deleted'] += 1
+        for index in range(first, last + 1):
+            if index in self.items:
+                continue
+            current = index == self.current
+            self.items[index] = self.canvas.create_text(
+                self.padx, self.tops[index] - self.offset,
+                anchor='nw', width=self.wrap_width(), text=self.lines[index], tags=('lyric',),
+                font=self.highlight_font if current else self.font,
+                fill=self.highlight_fg if current else self.fg)
+            self.stats['items_created'] += 1
+
+    def set_offset(self, offset):
+        """Scroll to a song offset by moving the existing items."""
+        delta = offset - self.offset
+        if not delta:
+            return
+        self.offset = offset
+        self.canvas.move('lyric', 0, -delta)
+        self.redraw()
+
+    def target_offset(self, index):
+        """Offset that centers a line in the canvas."""
+        center = self.tops[index] + self.heights[index] / 2
+        return center - self.canvas.winfo_height() / 2
+
+    def highlight(self, index, progress_ms=None, animate=True):
+        """Highlight a line and start scrolling it to the center."""
+        if not 0 <= index < len(self.lines) or index == self.current:
+            return
+        previous = self.items.get(self.current)
+        if previous:
+            self.canvas.itemconfigure(previous, font=self.font, fill=self.fg)
+        self.current = index
+        item = self.items.get(index)
+        if item:
+            self.canvas.itemconfigure(item, font=self.highlight_font, fill=self.highlight_fg)
+
+        target = self.target_offset(index)
+        if animate and progress_ms is not None:
+            self.scroll_from = self.offset
+            self.scroll_to = target
+            self.scroll_start_ms = progress_ms
+        else:
+            self.scroll_start_ms = None
+            self.set_offset(target)
+
+    def update_scroll(self, progress_ms):
+        """Advance the scroll animation to a playback position."""
+        if self.scroll_start_ms is None:
+            return
+        elapsed = progress_ms - self.scroll_start_ms
+        if elapsed < 0 or elapsed >= self.scroll_ms:
+            # Finished, or playback jumped backwards
+            self.scroll_start_ms = None
+            self.set_offset(self.scroll_to)
+            return
+        t = elapsed / self.scroll_ms
+        eased = 1 - (1 - t) ** 3  # Ease out
+        self.set_offset(self.scroll_from + (self.scroll_to - self.scroll_from) * eased)
+
+    def on_resize(self, event):
+        """Re-measure lines when the width changes."""
+        if event.width == self.width:
+            self.redraw()
+            return
+        self.width = event.width
+        self.clear_items()
+        self.layout()
+        if 0 <= self.current < len(self.lines):
+            self.offset = self.target_offset(self.current)
+        self.redraw()
+
+    def on_wheel(self, event):
+        """Let the user scroll until the next line change."""
+        self.scroll_start_ms = None
+        self.set_offset(self.offset - event.delta / 120 * 40)
+
+    def get_stats(self):
+        """Return item counters; 'items' stays bounded by the view size."""
+        stats = dict(self.stats)
+        stats['items'] = len(self.items)
+        stats['lines'] = len(self.lines)
+        return stats
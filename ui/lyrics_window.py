@@ -1,53 +1,36 @@
 import tkinter as tk
 from tkinter import scrolledtext, ttk
-from PIL import Image, ImageTk
-import requests
-from io import BytesIO
 import os
 import sys
 
 # Add parent directory to path to find modules in main directory
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from spotify_client import SpotifyClient
-from lyrics_fetcher import GeniusLyricsFetcher
 from ui.styles import (
     BACKGROUND_COLOR, TEXT_COLOR, HIGHLIGHT_COLOR, FONT_FAMILY, FONT_SIZE,
     BUTTON_STYLE, PROGRESS_BAR_STYLE, BUTTON_FONT_SIZE, TITLE_FONT_SIZE,
     SECONDARY_COLOR
 )
-from ui.icon import get_icon
+from ui.dispatch import UIDispatcher
+from ui.line_highlighter import LineHighlighter
+from ui.glow import GlowAnimator, glow_colors
+from ui.lyrics_canvas import LyricsCanvas
+from utils.art_cache import ArtCache
+from controllers.sync_engine import SyncEngine, LyricsRenderer
 import time
-import threading
-from config import GENIUS_ACCESS_TOKEN
 
-class LyricsWindow:
-    def __init__(self, root):
+class LyricsWindow(LyricsRenderer):
+    """Tk renderer for the sync engine: song info, album art, controls and lyrics."""
+    
+    wants_album_art = True
+    
+    def __init__(self, root, lyrics_view='text'):
         self.root = root
         self.root.title("Spotify Lyrics")
         self.root.configure(bg=BACKGROUND_COLOR)
         
-        # Set window icon
-        try:
-            # Get the icon image
-            icon_image = get_icon()
-            # Convert to PhotoImage for Tkinter
-            icon_photo = ImageTk.PhotoImage(icon_image)
-            # Set as window icon
-            self.root.iconphoto(True, icon_photo)
-            # Save icon for taskbar
-            icon_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.ico")
-            icon_image.save(icon_path, format="ICO")
-            # Set taskbar icon (Windows specific)
-            if os.name == 'nt':  # Windows
-                import ctypes
-                myappid = 'mycompany.spotifylyrics.1.0'
-                ctypes.windll.shell32.SetCurrentProcessExplicitAppUserModelID(myappid)
-                self.root.iconbitmap(icon_path)
-            # Keep a reference to prevent garbage collection
-            self.icon_photo = icon_photo
-        except Exception as e:
-            print(f"Error setting icon: {e}")
+        # The icon needs PIL; set it once the window has painted
+        self.root.after_idle(self.set_icon)
         
         # Set window properties
         self.root.overrideredirect(True)  # Remove window decorations
@@ -96,7 +79,7 @@ class LyricsWindow:
         # Add close button with updated style
         self.close_button = tk.Button(self.control_frame, text="×", **BUTTON_STYLE,
                                     font=(FONT_FAMILY, BUTTON_FONT_SIZE),
-                                    command=self.root.destroy)
+                                    command=self.on_close)
         self.close_button.pack(side='left', padx=2)
         
         # Create resize grip
@@ -184,7 +167,7 @@ class LyricsWindow:
         self.lyrics_lines = []
         self.line_positions = []  # Store the line positions for accurate highlighting
         self.current_line_index = 0
-        self.sync_update_id = None
+        self.nudge_step_ms = 250  # Timing correction per [ or ] keypress
         
         # Create lyrics display with highlighting support
         self.lyrics_text = scrolledtext.ScrolledText(
@@ -201,7 +184,21 @@ class LyricsWindow:
             spacing3=15,
             cursor=""  # Hide cursor
         )
-        self.lyrics_text.pack(fill=tk.BOTH, expand=True)
+        
+        # Optional canvas view: only visible lines exist, scrolling is eased per pixel
+        self.lyrics_canvas = None
+        if lyrics_view == 'canvas':
+            self.lyrics_canvas = LyricsCanvas(
+                self.lyrics_container,
+                font=(FONT_FAMILY, FONT_SIZE + 4),
+                highlight_font=(FONT_FAMILY, FONT_SIZE + 4, "bold"),
+                fg='#FFFFFF',
+                highlight_fg='#7CB7EB',
+                bg='#002649'
+            )
+            self.lyrics_canvas.pack(fill=tk.BOTH, expand=True)
+        else:
+            self.lyrics_text.pack(fill=tk.BOTH, expand=True)
         
         # Hide scrollbar but keep functionality
         scrollbar = self.lyrics_text.yview
@@ -216,20 +213,14 @@ class LyricsWindow:
             font=(FONT_FAMILY, FONT_SIZE + 4, "bold")  # Bold for current line
         )
         
-        # Configure additional tags for glow effect
-        for i in range(10):
-            alpha = (10 - i) / 10  # Create gradient effect
-            color = self.interpolate_color('#7CB7EB', '#FFFFFF', alpha)
-            self.lyrics_text.tag_configure(
-                f"glow_{i}",
-                foreground=color,
-                font=(FONT_FAMILY, FONT_SIZE + 4, "bold")
-            )
+        # Glow effect: one tag recolored from a precomputed gradient
+        self.glow = GlowAnimator(
+            self.root, self.lyrics_text,
+            glow_colors(self.interpolate_color, '#7CB7EB', '#FFFFFF'))
+        self.glow.pause('playback')  # Until Spotify reports playback
         
-        # Initialize glow effect variables
-        self.glow_step = 0
-        self.glow_direction = 1  # 1 for increasing, -1 for decreasing
-        self.glow_after_id = None
+        # Moves the highlight between lines without sweeping the whole text
+        self.highlighter = LineHighlighter(self.lyrics_text, "current_line")
         
         # Initialize controllers (will be set later)
         self.spotify_controller = None
@@ -249,11 +240,24 @@ class LyricsWindow:
         
         # Bind window state events
         self.root.bind("<Map>", self.on_map)
+        self.root.bind("<Unmap>", self.on_unmap)
         self.root.bind("<Configure>", self.on_configure)
         
+        # Without decorations the window manager may never give the window
+        # keyboard focus, so take it on click for the shortcuts below
+        self.root.bind("<ButtonPress-1>", lambda e: self.root.focus_force(), add="+")
+        
+        # Timing corrections: [ shows lines earlier, ] later, M marks a line as starting now.
+        # Not space, which would also press whichever button has focus.
+        self.root.bind("<bracketleft>", lambda e: self.engine.nudge_lyrics(-self.nudge_step_ms))
+        self.root.bind("<bracketright>", lambda e: self.engine.nudge_lyrics(self.nudge_step_ms))
+        self.root.bind("<KeyPress-m>", lambda e: self.engine.mark_line_now())
+        self.root.bind("<KeyPress-M>", lambda e: self.engine.mark_line_now())
+        
+        # F5 asks Genius again for a song it had no lyrics for
+        self.root.bind("<F5>", lambda e: self.engine.retry_lyrics())
+        
         # Initialize variables
-        self.current_track_id = None
-        self.current_lyrics = None
         self.current_album_art = None
         self.is_playing = False
         self.current_progress_ms = 0
@@ -268,8 +272,40 @@ class LyricsWindow:
         self.tray_window.withdraw()
         self.tray_window.title("Spotify Lyrics")
         
-        # Start the update loop
-        self.update_thread = None  # Will be started when spotify_controller is set
+        # Widget updates from background threads are applied on the main loop
+        self.dispatcher = UIDispatcher(self.root)
+        self.dispatcher.start()
+        self.widget_options = {}  # Last applied widget options, to skip redundant reconfigures
+        
+        # Playback sync, lyrics and art loading run in the engine, off the main loop
+        self.art_cache = ArtCache()
+        self.engine = SyncEngine(self, art_cache=self.art_cache)
+    
+    def set_icon(self):
+        """Set the window and taskbar icon."""
+        try:
+            from PIL import ImageTk
+            from ui.icon import get_icon
+            
+            # Get the icon image
+            icon_image = get_icon()
+            # Convert to PhotoImage for Tkinter
+            icon_photo = ImageTk.PhotoImage(icon_image)
+            # Set as window icon
+            self.root.iconphoto(True, icon_photo)
+            # Save icon for taskbar
+            icon_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.ico")
+            icon_image.save(icon_path, format="ICO")
+            # Set taskbar icon (Windows specific)
+            if os.name == 'nt':  # Windows
+                import ctypes
+                myappid = 'mycompany.spotifylyrics.1.0'
+                ctypes.windll.shell32.SetCurrentProcessExplicitAppUserModelID(myappid)
+                self.root.iconbitmap(icon_path)
+            # Keep a reference to prevent garbage collection
+            self.icon_photo = icon_photo
+        except Exception as e:
+            print(f"Error setting icon: {e}")
     
     def set_window_position(self):
         """Set the initial window position."""
@@ -287,6 +323,7 @@ class LyricsWindow:
             self.minimized = True
             # Hide main window
             self.root.withdraw()
+            self.glow.pause('hidden')
             # Show system tray window
             self.tray_window.deiconify()
             self.tray_window.protocol('WM_DELETE_WINDOW', self.restore_window)
@@ -307,6 +344,7 @@ class LyricsWindow:
             # Show main window
             self.root.deiconify()
             self.root.attributes("-topmost", True)
+            self.glow.resume('hidden')
             # Update state
             self.minimized = False
             self.was_visible = True
@@ -385,82 +423,83 @@ class LyricsWindow:
         else:
             self.spotify_controller.start_playback()
         self.is_playing = not self.is_playing
-        self.play_pause_button.config(text="⏸" if self.is_playing else "▶")
+        self.update_play_button()
+        
+    def update_play_button(self):
+        """Show the play/pause symbol matching the current state."""
+        self.configure_widget(self.play_pause_button, text="⏸" if self.is_playing else "▶")
+        # No glow animation while the song is paused
+        self.glow.set_paused('playback', not self.is_playing)
+        
+    def configure_widget(self, widget, **options):
+        """Configure a widget, skipping options whose value has not changed.
+        
+        Must be called on the Tk main thread.
+        """
+        changed = {}
+        for option, value in options.items():
+            key = (str(widget), option)
+            if self.widget_options.get(key) != value:
+                self.widget_options[key] = value
+                changed[option] = value
+        if changed:
+            widget.config(**changed)
+        return bool(changed)
         
     def update_progress(self, progress_ms, duration_ms):
         self.current_progress_ms = progress_ms
         self.total_duration_ms = duration_ms
         
-        # Update progress bar
+        # Update progress bar (0.1% steps are below what the bar can show)
         progress_percent = (progress_ms / duration_ms * 100) if duration_ms > 0 else 0
-        self.progress_var.set(progress_percent)
+        progress_percent = round(progress_percent, 1)
+        if self.widget_options.get('progress') != progress_percent:
+            self.widget_options['progress'] = progress_percent
+            self.progress_var.set(progress_percent)
         
         # Update time labels
         current_time = time.strftime('%M:%S', time.gmtime(progress_ms / 1000))
         total_time = time.strftime('%M:%S', time.gmtime(duration_ms / 1000))
-        self.current_time_label.config(text=current_time)
-        self.total_time_label.config(text=total_time)
-        
-    def update_album_art(self, track):
-        if 'album' in track and 'images' in track['album'] and track['album']['images']:
-            image_url = track['album']['images'][0]['url']
-            try:
-                response = requests.get(image_url)
-                img_data = Image.open(BytesIO(response.content))
-                img_data = img_data.resize((100, 100), Image.Resampling.LANCZOS)
-                img_photo = ImageTk.PhotoImage(img_data)
-                self.album_art_label.config(image=img_photo)
-                self.current_album_art = img_photo  # Keep a reference to prevent garbage collection
-            except Exception as e:
-                print(f"Error loading album art: {e}")
-                
-    def update_loop(self):
-        """Main update loop for the window."""
-        last_update_time = 0
-        update_interval = 0.1  # Update every 100ms for smooth progress
-        fetch_interval = 1.0   # Fetch new data every 1 second
-        
-        while True:
-            try:
-                current_time = time.time()
-                
-                if not self.spotify_controller:
-                    time.sleep(update_interval)
-                    continue
-                
-                # Get playback state more frequently for smooth progress
-                if current_time - last_update_time >= update_interval:
-                    playback_state = self.spotify_controller.get_playback_state()
-                    if playback_state:
-                        self.is_playing = playback_state['is_playing']
-                        self.play_pause_button.config(text="⏸" if self.is_playing else "▶")
-                        
-                        # Update progress and sync lyrics
-                        if self.is_playing:
-                            progress_ms = playback_state['progress_ms']
-                            if hasattr(self, 'current_track') and self.current_track:
-                                duration_ms = self.current_track['duration_ms']
-                                self.update_progress(progress_ms, duration_ms)
-                                self.update_lyrics_sync(progress_ms, duration_ms)
-                
-                # Check for track changes less frequently
-                if current_time - last_update_time >= fetch_interval:
-                    current_track = self.spotify_controller.get_current_track()
-                    if current_track:
-                        track_id = current_track.get('id')
-                        if track_id != self.current_track_id:
-                            self.current_track_id = track_id
-                            self.current_track = current_track  # Store current track
-                            self.update_song_info(current_track)
-                            self.update_album_art(current_track)
-                            self.update_lyrics()
-                    last_update_time = current_time
-                
-                time.sleep(update_interval)
-                
-            except Exception as e:
-                print(f"Error in update loop: {e}")
-                time.sleep(update_interval)
+        self.configure_widget(self.current_time_label, text=current_time)
+        self.configure_widget(self.total_time_label, text=total_time)
+        
+    def apply_progress(self, progress_ms, duration_ms):
+        """Apply the latest clock position to the progress bar and lyrics scroll."""
+        self.update_progress(progress_ms, duration_ms)
+        if self.lyrics_canvas:
+            self.lyrics_canvas.update_scroll(progress_ms)
+        
+    def set_album_art(self, img_data):
+        """Show a resized album art image (main thread only)."""
+        from PIL import ImageTk
+        img_photo = ImageTk.PhotoImage(img_data)
+        self.album_art_label.config(image=img_photo)
+        self.current_album_art = img_photo  # Keep a reference to prevent garbage collection
+    
+    # LyricsRenderer interface: called from engine threads, applied on the main loop
+    
+    def show_track(self, track):
+        self.dispatcher.post('song_info', self.update_song_info, track)
+    
+    def show_album_art(self, image):
+        self.dispatcher.post('album_art', self.set_album_art, image)
+    
+    def show_lyrics(self, lines):
+        self.dispatcher.post('lyrics', self.display_lyrics, lines)
+    
+    def show_message(self, message):
+        self.dispatcher.post('lyrics', self.display_lyrics, message)
+    
+    def show_line(self, index):
+        self.dispatcher.post('line', self.apply_line, index)
+    
+    def show_progress(self, progress_ms, duration_ms):
+        # Coalesced, so only the latest position per frame is applied
+        self.dispatcher.post('progress', self.apply_progress, progress_ms, duration_ms)
+    
+    def show_play_state(self, is_playing):
+        self.is_playing = is_playing
+        self.dispatcher.post('play_state', self.update_play_button)
 
     def update_song_info(self, track):
         """Update the song information display."""
@@ -470,170 +509,54 @@ class LyricsWindow:
                 
             # Update song title
             title = track.get('name', 'Unknown Title')
-            self.song_title_label.config(text=title)
+            self.configure_widget(self.song_title_label, text=title)
             
             # Update artist name
             artist = track.get('artists', [{'name': 'Unknown Artist'}])[0]['name']
-            self.artist_label.config(text=artist)
+            self.configure_widget(self.artist_label, text=artist)
             
         except Exception as e:
             print(f"Error updating song info: {e}")
-            self.song_title_label.config(text="Error")
-            self.artist_label.config(text="")
+            self.configure_widget(self.song_title_label, text="Error")
+            self.configure_widget(self.artist_label, text="")
     
-    def update_lyrics_sync(self, progress_ms, duration_ms):
-        """Update the highlighted lyrics based on playback progress."""
-        try:
-            if not self.lyrics_lines or not duration_ms:
-                return
-            
-            # Calculate the current position in the song
-            position = progress_ms / duration_ms
-            
-            # Simple linear mapping of position to lyrics lines
-            # This provides smoother highlighting without complex section detection
-            current_line = int(position * len(self.lyrics_lines))
-            current_line = max(0, min(current_line, len(self.lyrics_lines) - 1))
-            
-            # Update highlighting if needed
-            if current_line != self.current_line_index:
-                self.current_line_index = current_line
-                self.root.after_idle(self.highlight_current_line)
-                
-        except Exception as e:
-            print(f"Error in lyrics sync: {str(e)}")
+    def apply_line(self, index):
+        """Highlight the line the engine reports as current."""
+        if index == self.current_line_index or not 0 <= index < len(self.lyrics_lines):
+            return
+        self.current_line_index = index
+        self.highlight_current_line()
 
     def highlight_current_line(self):
         """Highlight the current line in the lyrics display with glow effect."""
         try:
             if not self.lyrics_lines or not hasattr(self, 'line_positions'):
                 return
-                
-            # Enable widget temporarily for updating
-            self.lyrics_text.config(state='normal')
             
-            # Remove all highlighting and glow tags
-            self.lyrics_text.tag_remove("current_line", "1.0", tk.END)
-            for i in range(10):
-                self.lyrics_text.tag_remove(f"glow_{i}", "1.0", tk.END)
+            if self.lyrics_canvas:
+                self.lyrics_canvas.highlight(self.current_line_index, self.current_progress_ms,
+                                             animate=self.is_playing)
+                return
             
             if 0 <= self.current_line_index < len(self.lyrics_lines):
-                # Get the actual line position
+                # Only the previous and the new line are retagged
                 line_num = self.line_positions[self.current_line_index]
-                line_start = f"{line_num}.0"
-                line_end = f"{line_num}.end"
-                
-                # Apply base highlighting
-                self.lyrics_text.tag_add("current_line", line_start, line_end)
-                
-                # Start glow effect
-                if not self.glow_after_id:
-                    self.glow_step = 0
-                    self.glow_direction = 1
-                    self.update_glow_effect(line_start, line_end)
+                if line_num == self.highlighter.line:
+                    return
+                line_start, line_end = self.highlighter.highlight(line_num)
                 
-                # Calculate visible lines in the text widget
-                visible_height = self.lyrics_text.winfo_height()
-                dline_info = self.lyrics_text.dlineinfo(line_start)
-                line_height = dline_info[3] if dline_info else 20
-                visible_lines = visible_height // line_height
-                
-                # Calculate the line to center
-                center_line = max(1, line_num - (visible_lines // 2))
-                
-                # Ensure the current line is centered
-                self.lyrics_text.see(f"{center_line}.0")
-                
-                # Fine-tune the centering
-                self.lyrics_text.update_idletasks()
-                self.root.after(10, lambda: self.lyrics_text.yview_scroll(-2, "units"))
-            
-            # Make read-only again
-            self.lyrics_text.config(state='disabled')
-            
-        except Exception as e:
-            print(f"Error in highlight_current_line: {e}")
-            self.lyrics_text.config(state='disabled')
-
-    def update_glow_effect(self, line_start, line_end):
-        """Update the glow effect animation."""
-        try:
-            # Cancel any existing glow update
-            if self.glow_after_id:
-                self.root.after_cancel(self.glow_after_id)
-                self.glow_after_id = None
-            
-            # Enable widget for updating
-            self.lyrics_text.config(state='normal')
-            
-            # Remove previous glow
-            for i in range(10):
-                self.lyrics_text.tag_remove(f"glow_{i}", line_start, line_end)
-            
-            # Apply current glow
-            self.lyrics_text.tag_add(f"glow_{self.glow_step}", line_start, line_end)
-            
-            # Update glow step
-            if self.glow_direction == 1:
-                self.glow_step += 1
-                if self.glow_step >= 9:
-                    self.glow_direction = -1
+                # Move the glow to the new line
+                self.glow.attach(line_start, line_end)
             else:
-                self.glow_step -= 1
-                if self.glow_step <= 0:
-                    self.glow_direction = 1
-            
-            # Make read-only
-            self.lyrics_text.config(state='disabled')
-            
-            # Schedule next update
-            self.glow_after_id = self.root.after(50, lambda: self.update_glow_effect(line_start, line_end))
+                self.highlighter.clear()
+                self.glow.detach()
             
         except Exception as e:
-            print(f"Error in update_glow_effect: {e}")
-            self.lyrics_text.config(state='disabled')
-
-    def update_lyrics(self):
-        """Update lyrics based on current track."""
-        try:
-            if not self.spotify_controller or not self.lyrics_fetcher:
-                print("Spotify controller or lyrics fetcher not initialized")
-                return
-
-            current_track = self.spotify_controller.get_current_track()
-            if not current_track:
-                print("No current track information")
-                self.display_lyrics("No track playing...")
-                return
-
-            # Extract track info
-            try:
-                artist = current_track['artists'][0]['name']
-                title = current_track['name']
-                print(f"\nUpdating lyrics for: {artist} - {title}")
-            except (KeyError, TypeError, IndexError) as e:
-                print(f"Error extracting track info: {e}")
-                self.display_lyrics("Error getting track information")
-                return
-
-            # Always fetch new lyrics when update_lyrics is called
-            print("Fetching lyrics...")
-            lyrics = self.lyrics_fetcher.fetch_lyrics(artist, title)
-            
-            if not lyrics:
-                print("No lyrics found")
-                self.display_lyrics("No lyrics found for this song.")
-                return
-
-            print(f"Lyrics found, displaying...")
-            self.current_song = (artist, title)
-            self.display_lyrics(lyrics)
+            print(f"Error in highlight_current_line: {e}")
 
-        except Exception as e:
-            print(f"Error in update_lyrics: {e}")
-            import traceback
-            traceback.print_exc()
-            self.display_lyrics("Error updating lyrics")
+    def update_lyrics(self, current_track=None):
+        """Fetch lyrics for the current track in the background and display them."""
+        self.engine.update_lyrics(current_track)
 
     def display_lyrics(self, lyrics):
         """Display lyrics in the text widget."""
@@ -643,6 +566,8 @@ class LyricsWindow:
             
             # Clear existing lyrics
             self.lyrics_text.delete(1.0, tk.END)
+            self.highlighter.reset()
+            self.glow.reset()
             
             # Reset lyrics lines and line positions
             self.lyrics_lines = []
@@ -664,35 +589,20 @@ class LyricsWindow:
             current_position = 1  # Track the current line position
             
             if isinstance(lyrics, str):
-                # Split string lyrics into sentences and clean them
-                sentences = [s.strip() for s in lyrics.split('\n') if s.strip()]
-                # Remove common formatting markers
-                sentences = [s for s in sentences if not any(marker in s.lower() 
-                    for marker in ['[verse', '[chorus', '[bridge', '[intro', '[outro'])]
-                
-                # Add each sentence with spacing and store its position
-                for sentence in sentences:
-                    if sentence:
-                        self.lyrics_lines.append(sentence)
-                        self.lyrics_text.insert(tk.END, sentence + '\n\n')
-                        self.line_positions.append(current_position)
-                        current_position += 2  # Account for the extra newline
-                    
-            elif isinstance(lyrics, list):
-                # Process list of lyrics
-                for line in lyrics:
-                    text = None
-                    if isinstance(line, dict) and 'text' in line:
-                        text = line['text'].strip()
-                    elif isinstance(line, str):
-                        text = line.strip()
-                    
-                    if text and not any(marker in text.lower() 
-                        for marker in ['[verse', '[chorus', '[bridge', '[intro', '[outro']):
-                        self.lyrics_lines.append(text)
-                        self.lyrics_text.insert(tk.END, text + '\n\n')
-                        self.line_positions.append(current_position)
-                        current_position += 2  # Account for the extra newline
+                # A status message rather than lyrics
+                lines = [s.strip() for s in lyrics.split('\n') if s.strip()]
+            else:
+                lines = list(lyrics or [])
+            
+            # Add each line with spacing and store its position
+            for line in lines:
+                self.lyrics_lines.append(line)
+                self.lyrics_text.insert(tk.END, line + '\n\n')
+                self.line_positions.append(current_position)
+                current_position += 2  # Account for the extra newline
+            
+            if self.lyrics_canvas:
+                self.lyrics_canvas.set_lines(self.lyrics_lines)
             
             # Configure highlighting style
             self.lyrics_text.tag_configure(
@@ -710,6 +620,10 @@ class LyricsWindow:
             # Scroll to top
             self.lyrics_text.see("1.0")
             
+            # Catch up with a line change that arrived before these lyrics
+            if not isinstance(lyrics, str) and self.engine.current_line_index > 0:
+                self.apply_line(self.engine.current_line_index)
+            
         except Exception as e:
             print(f"Error displaying lyrics: {e}")
             import traceback
@@ -729,12 +643,18 @@ class LyricsWindow:
     def on_map(self, event):
         """Handle window map event."""
         if str(event.widget) == str(self.root):
+            self.glow.resume('hidden')
             self.root.attributes("-topmost", True)
             if self.is_maximized:
                 self.maximize_window()
             else:
                 self.restore_from_maximize()
 
+    def on_unmap(self, event):
+        """Stop animating while the window is minimized or withdrawn."""
+        if str(event.widget) == str(self.root):
+            self.glow.pause('hidden')
+
     def update_current_song(self, song_info):
         """Update the current song information and fetch lyrics."""
         if not song_info:
@@ -745,50 +665,55 @@ class LyricsWindow:
         title = song_info.get('title', '')
         
         # Update song info display
-        self.update_song_info(song_info)
+        self.dispatcher.post('song_info', self.update_song_info, song_info)
         
         # Fetch and display lyrics
-        if self.lyrics_fetcher:
-            lyrics = self.lyrics_fetcher.fetch_lyrics(artist, title)
-            self.display_lyrics(lyrics)
-        else:
-            self.display_lyrics("Lyrics fetcher not initialized")
+        self.engine.update_current_song(artist, title)
 
     def clear_lyrics(self):
         """Clear the lyrics display and reset synchronization."""
-        # Cancel any existing glow effect
-        if self.glow_after_id:
-            self.root.after_cancel(self.glow_after_id)
-            self.glow_after_id = None
+        # Stop the glow effect
+        self.glow.reset()
             
         self.lyrics_text.config(state=tk.NORMAL)
         self.lyrics_text.delete("1.0", tk.END)
         self.lyrics_text.config(state=tk.DISABLED)
+        self.highlighter.reset()
+        if self.lyrics_canvas:
+            self.lyrics_canvas.set_lines([])
         self.lyrics_lines = []
         self.current_line_index = 0
-        if self.sync_update_id:
-            self.root.after_cancel(self.sync_update_id)
-            self.sync_update_id = None
 
     def on_close(self):
-        """Clean up when window is closed."""
-        if self.sync_update_id:
-            self.root.after_cancel(self.sync_update_id)
-        # ... existing code ...
+        """Stop background work and close the window."""
+        self.engine.stop()
+        if hasattr(self.lyrics_fetcher, 'shutdown'):
+            self.lyrics_fetcher.shutdown()
+        self.dispatcher.stop()
+        self.root.destroy()
 
     def set_spotify_controller(self, controller):
-        """Set the Spotify controller and bind callbacks."""
+        """Set the Spotify controller and start following its playback."""
         self.spotify_controller = controller
-        if self.spotify_controller:
-            self.spotify_controller.bind_progress_callback(self.update_lyrics_sync)
-            # Start the update loop now that we have the controller
-            if not self.update_thread:
-                self.update_thread = threading.Thread(target=self.update_loop, daemon=True)
-                self.update_thread.start()
+        self.engine.set_spotify_controller(controller)
+        if controller:
+            self.engine.start()
     
     def set_lyrics_fetcher(self, fetcher):
         """Set the lyrics fetcher."""
         self.lyrics_fetcher = fetcher
+        self.engine.set_lyrics_fetcher(fetcher)
+
+    def get_stats(self):
+        """Return performance counters for the window's components."""
+        stats = self.engine.get_stats()
+        stats.update({
+            'dispatcher': self.dispatcher.get_stats(),
+            'glow': self.glow.get_stats(),
+            'lyrics_canvas': self.lyrics_canvas.get_stats() if self.lyrics_canvas else None,
+            'art_cache': self.art_cache.get_stats(),
+        })
+        return stats
 
     def interpolate_color(self, color1, color2, factor):
         """Interpolate between two colors."""
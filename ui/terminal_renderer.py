@@ -0,0 +1,58 @@
+import sys
+import threading
+import time
+
+from controllers.sync_engine import LyricsRenderer
+
+
+class TerminalRenderer(LyricsRenderer):
+    """Print track changes and the current lyric line to a text stream.
+
+    Needs no display, so the sync engine can run headless (CI load tests,
+    profiling, servers). Each line change is printed with its playback
+    position; progress is printed only when ``show_progress_every_ms`` is set.
+    """
+
+    def __init__(self, stream=None, show_progress_every_ms=None):
+        self.stream = stream or sys.stdout
+        self.show_progress_every_ms = show_progress_every_ms
+        self.lock = threading.Lock()
+        self.lines = []
+        self.progress_ms = 0
+        self.last_progress_print = None
+
+    def write(self, text):
+        with self.lock:
+            self.stream.write(text + '\n')
+            self.stream.flush()
+
+    @staticmethod
+    def format_time(ms):
+        return time.strftime('%M:%S', time.gmtime((ms or 0) / 1000))
+
+    def show_track(self, track):
+        artist = (track.get('artists') or [{'name': 'Unknown Artist'}])[0]['name']
+        self.write(f"\n== {artist} - {track.get('name', 'Unknown Title')} ==")
+
+    def show_lyrics(self, lines):
+        self.lines = list(lines)
+        self.write(f"({len(self.lines)} lines)")
+
+    def show_message(self, message):
+        self.lines = []
+        self.write(f"({message})")
+
+    def show_line(self, index):
+        if 0 <= index < len(self.lines):
+            self.write(f"[{self.format_time(self.progress_ms)}] {self.lines[index]}")
+
+    def show_progress(self, progress_ms, duration_ms):
+        self.progress_ms = progress_ms
+        every = self.show_progress_every_ms
+        if every and (self.last_progress_print is None
+                      or abs(progress_ms - self.last_progress_print) >= every):
+            self.last_progress_print = progress_ms
+            self.write(f"  {self.format_time(progress_ms)} / {self.format_time(duration_ms)}")
+
+    def show_play_state(self, is_playing):
+        self.write("(playing)" if is_playing else "(paused)")
@@ -0,0 +1,171 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from io import BytesIO
+
+ART_SIZE = (100, 100)
+ART_CACHE_DIR = os.path.join("lyrics_cache", "art")
+
+
+class ArtCache:
+    """Two-tier cache of album art already resized for display.
+
+    Thumbnails are kept in an in-memory LRU keyed by album ID and written
+    to disk once resized, so a repeated album costs neither a download nor
+    a decode and resize, even after a restart. Downloads use the smallest
+    Spotify image variant that still covers the thumbnail size. PIL and the
+    HTTP client are loaded on first use, off the startup path.
+    """
+
+    def __init__(self, max_items=64, size=ART_SIZE, http_client=None,
+                 directory=ART_CACHE_DIR, max_disk_items=5000):
+        self.http = http_client
+        self.max_items = max_items
+        self.size = size
+        self.directory = directory
+        self.max_disk_items = max_disk_items
+        self.lock = threading.Lock()
+        self.images = OrderedDict()
+        self.stats = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0, 'errors': 0,
+                      'bytes_downloaded': 0}
+
+        if self.directory and not os.path.exists(self.directory):
+            os.makedirs(self.directory)
+        self.disk_items = len(os.listdir(self.directory)) if self.directory else 0
+
+    def image_url(self, track):
+        """Return the URL of the smallest album art variant at least as large as a thumbnail."""
+        images = (track or {}).get('album', {}).get('images') or []
+        if not images:
+            return None
+        needed = max(self.size)
+        large_enough = [image for image in images
+                        if min(image.get('width') or 0, image.get('height') or 0) >= needed]
+        if not large_enough:
+            return images[0]['url']  # Largest available; Spotify lists biggest first
+        return min(large_enough, key=lambda image: image['width'] * image['height'])['url']
+
+    @staticmethod
+    def art_key(track, url):
+        """Album ID when known, otherwise a hash of the image URL."""
+        album_id = (track or {}).get('album', {}).get('id')
+        return album_id or hashlib.sha1(url.encode('utf-8')).hexdigest()
+
+    def disk_path(self, key):
+        return os.path.join(self.directory, f"{key}_{self.size[0]}x{self.size[1]}.jpg")
+
+    def get(self, key):
+        """Return a cached image from memory, or None."""
+        with self.lock:
+            image = self.images.get(key)
+            if image is not None:
+                self.images.move_to_end(key)
+            return image
+
+    def put(self, key, image):
+        """Store an image in memory, evicting the least recently used one if full."""
+        with self.lock:
+            self.images[key] = image
+            self.images.move_to_end(key)
+            while len(self.images) > self.max_items:
+                self.images.popitem(last=False)
+
+    def read_disk(self, key):
+        """Return a thumbnail saved on disk, or None."""
+        if not self.directory:
+            return None
+        from PIL import Image
+        path = self.disk_path(key)
+        try:
+            with Image.open(path) as image:
+                image.load()
+            os.utime(path)  # Mark as recently used for pruning
+            return image
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"Error reading cached album art: {e}")
+            return None
+
+    def write_disk(self, key, image):
+        """Save a thumbnail atomically and prune the oldest if over the limit."""
+        if not self.directory:
+            return
+        path = self.disk_path(key)
+        temp_path = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            image.convert('RGB').save(temp_path, 'JPEG', quality=90)
+            existed = os.path.exists(path)
+            os.replace(temp_path, path)
+        except Exception as e:
+            print(f"Error saving album art: {e}")
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            return
+        if not existed:
+            self.disk_items += 1
+        if self.disk_items > self.max_disk_items:
+            self.prune_disk()
+
+    def prune_disk(self):
+        """Delete the least recently used tenth of the thumbnails on disk."""
+        paths = [os.path.join(self.directory, name) for name in os.listdir(self.directory)]
+        paths.sort(key=lambda path: os.path.getmtime(path))
+        for path in paths[:max(1, len(paths) - self.max_disk_items * 9 // 10)]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        self.disk_items = len(os.listdir(self.directory))
+
+    def load(self, track):
+        """Return resized album art for a track from memory, disk or the network."""
+        url = self.image_url(track)
+        if not url:
+            return None
+        key = self.art_key(track, url)
+
+        image = self.get(key)
+        if image is not None:
+            self.stats['memory_hits'] += 1
+            return image
+
+        image = self.read_disk(key)
+        if image is not None:
+            self.stats['disk_hits'] += 1
+            self.put(key, image)
+            return image
+
+        self.stats['misses'] += 1
+        from PIL import Image
+        from utils.http_client import get_http_client
+        try:
+            response = (self.http or get_http_client()).get(url)
+            response.raise_for_status()
+            self.stats['bytes_downloaded'] += len(response.content)
+            image = Image.open(BytesIO(response.content))
+            image.draft('RGB', self.size)  # Let JPEG decode at reduced scale
+            image = image.resize(self.size, Image.Resampling.LANCZOS)
+        except Exception as e:
+            self.stats['errors'] += 1
+            print(f"Error loading album art: {e}")
+            return None
+        self.put(key, image)
+        self.write_disk(key, image)
+        return image
+
+    def get_stats(self):
+        """Return hit counters for both tiers and the bytes downloaded."""
+        with self.lock:
+            stats = dict(self.stats)
+            stats['items'] = len(self.images)
+        stats['disk_items'] = self.disk_items
+        lookups = stats['memory_hits'] + stats['disk_hits'] + stats['misses']
+        if lookups:
+            stats['memory_hit_rate'] = stats['memory_hits'] / lookups
+            stats['disk_hit_rate'] = stats['disk_hits'] / lookups
+            stats['hit_rate'] = (stats['memory_hits'] + stats['disk_hits']) / lookups
+        else:
+            stats['memory_hit_rate'] = stats['disk_hit_rate'] = stats['hit_rate'] = 0.0
+        return stats
@@ -0,0 +1,92 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class FetchPipeline:
+    """Run the network fetches for a track concurrently on a worker pool.
+
+    Jobs are submitted under a key (normally the track ID). Submitting for a
+    new key cancels queued work for the previous one and marks anything
+    still running as stale, so its result is discarded instead of delivered.
+    Results are delivered as each job finishes, in any order.
+    """
+
+    def __init__(self, max_workers=4):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers,
+                                           thread_name_prefix="fetch")
+        self.lock = threading.Lock()
+        self.current_key = None
+        self.futures = []
+        self.stats = {'submitted': 0, 'delivered': 0, 'cancelled': 0, 'stale': 0, 'errors': 0}
+
+    def submit(self, key, jobs, on_result):
+        """Start jobs for key and call on_result(key, name, result) as each finishes.
+
+        jobs maps a job name to a zero-argument callable. on_result runs on
+        a worker thread and receives None as the result if the job failed.
+        """
+        submitted = []
+        with self.lock:
+            if key != self.current_key:
+                for future in self.futures:
+                    if future.cancel():
+                        self.stats['cancelled'] += 1
+                self.futures = []
+                self.current_key = key
+
+            for name, job in jobs.items():
+                future = self.executor.submit(job)
+                self.futures.append(future)
+                self.stats['submitted'] += 1
+                submitted.append((name, future))
+
+        # Outside the lock: a job that already finished calls back immediately
+        for name, future in submitted:
+            future.add_done_callback(
+                lambda f, name=name: self._deliver(key, name, f, on_result))
+
+    def is_current(self, key):
+        """Check whether results for key are still wanted."""
+        with self.lock:
+            return key == self.current_key
+
+    def _deliver(self, key, name, future, on_result):
+        """Hand a finished job's result to the callback unless it is stale."""
+        if future.cancelled():
+            return
+        with self.lock:
+            if future in self.futures:
+                self.futures.remove(future)
+            if key != self.current_key:
+                self.stats['stale'] += 1
+                return
+
+        error = future.exception()
+        if error is not None:
+            self.stats['errors'] += 1
+            print(f"Error in {name} fetch: {error}")
+            result = None
+        else:
+            result = future.result()
+
+        try:
+            on_result(key, name, result)
+            self.stats['delivered'] += 1
+        except Exception as e:
+            print(f"Error delivering {name} result: {e}")
+
+    def get_stats(self):
+        """Return a copy of the pipeline counters."""
+        with self.lock:
+            stats = dict(self.stats)
+            stats['in_flight'] = len(self.futures)
+        return stats
+
+    def shutdown(self):
+        """Cancel queued work and stop the worker pool."""
+        with self.lock:
+            self.current_key = None
+            for future in self.futures:
+                future.cancel()
+            self.futures = []
+        self.executor.shutdown(wait=False)
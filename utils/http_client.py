@@ -0,0 +1,192 @@
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+class CircuitOpenError(requests.exceptions.RequestException):
+    """Raised instead of sending a request to a host whose circuit is open."""
+
+
+class CircuitBreaker:
+    """Stop calling a host after repeated failures, then probe it again later."""
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold=5, reset_timeout=60.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.lock = threading.Lock()
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.trial_started = 0.0
+
+    def allow(self):
+        """Check whether a request may be sent now."""
+        with self.lock:
+            now = time.monotonic()
+            if self.state == self.HALF_OPEN:
+                # One trial request is in flight; give up on it if it never reported back
+                if now - self.trial_started < self.reset_timeout:
+                    return False
+            elif self.state == self.OPEN:
+                if now - self.opened_at < self.reset_timeout:
+                    return False
+            else:
+                return True
+            # Let a single trial request through
+            self.state = self.HALF_OPEN
+            self.trial_started = now
+            return True
+
+    def record_success(self):
+        """Close the circuit after a successful request."""
+        with self.lock:
+            self.state = self.CLOSED
+            self.failures = 0
+
+    def record_failure(self):
+        """Count a failure and open the circuit once the threshold is hit."""
+        with self.lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+
+class HttpClient:
+    """Shared HTTP layer with pooled keep-alive connections, timeouts and retries.
+
+    Transient failures (connection errors, timeouts, 429 and 5xx responses)
+    are retried with bounded exponential backoff, honoring Retry-After.
+    Each host has its own circuit breaker.
+    """
+
+    RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+    def __init__(self, timeout=(3.05, 10), max_retries=3, backoff_base=0.5, backoff_max=8.0,
+                 max_retry_after=30.0, pool_maxsize=10, failure_threshold=5, reset_timeout=60.0):
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.max_retry_after = max_retry_after
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+
+        # urllib3 keeps one connection pool per host behind this adapter
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=16, pool_maxsize=pool_maxsize, max_retries=0)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+        self.lock = threading.Lock()
+        self.breakers = {}
+        self.stats = {'requests': 0, 'retries': 0, 'failures': 0, 'short_circuited': 0}
+
+    def breaker_for(self, url):
+        """Return the circuit breaker for a URL's host."""
+        host = urlparse(url).netloc
+        with self.lock:
+            if host not in self.breakers:
+                self.breakers[host] = CircuitBreaker(self.failure_threshold, self.reset_timeout)
+            return self.breakers[host]
+
+    def backoff_delay(self, attempt):
+        """Exponential backoff with jitter for a retry attempt."""
+        delay = min(self.backoff_max, self.backoff_base * (2 ** attempt))
+        return delay * (0.5 + random.random() / 2)
+
+    def retry_after(self, response):
+        """Parse a Retry-After header into seconds, or None."""
+        value = response.headers.get('Retry-After')
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+
+    def get(self, url, **kwargs):
+        """Send a GET request."""
+        return self.request('GET', url, **kwargs)
+
+    def request(self, method, url, timeout=None, **kwargs):
+        """Send a request, retrying transient failures.
+
+        Returns the final response (callers still check its status) or
+        raises the last connection error. Raises CircuitOpenError while the
+        host's circuit is open.
+        """
+        breaker = self.breaker_for(url)
+        if not breaker.allow():
+            self.stats['short_circuited'] += 1
+            raise CircuitOpenError(f"Circuit open for {urlparse(url).netloc}")
+
+        response = None
+        error = None
+        for attempt in range(self.max_retries + 1):
+            self.stats['requests'] += 1
+            try:
+                response = self.session.request(method, url, timeout=timeout or self.timeout,
+                                                **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                error = e
+                response = None
+                delay = self.backoff_delay(attempt)
+            except Exception:
+                # Not retryable, but still settle a trial request
+                breaker.record_failure()
+                raise
+            else:
+                if response.status_code not in self.RETRY_STATUSES:
+                    breaker.record_success()
+                    return response
+                error = None
+                delay = self.retry_after(response)
+                if delay is None:
+                    delay = self.backoff_delay(attempt)
+                elif delay > self.max_retry_after:
+                    break
+
+            if attempt == self.max_retries:
+                break
+            self.stats['retries'] += 1
+            time.sleep(delay)
+
+        self.stats['failures'] += 1
+        breaker.record_failure()
+        if response is not None:
+            return response
+        raise error
+
+    def get_stats(self):
+        """Return request counters and the state of each host's circuit."""
+        stats = dict(self.stats)
+        with self.lock:
+            stats['circuits'] = {host: breaker.state for host, breaker in self.breakers.items()}
+        return stats
+
+
+_default_client = None
+_default_lock = threading.Lock()
+
+
+def get_http_client():
+    """Return the process-wide shared HttpClient."""
+    global _default_client
+    with _default_lock:
+        if _default_client is None:
+            _default_client = HttpClient()
+        return _default_client
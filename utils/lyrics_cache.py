@@ -0,0 +1,360 @@
+import glob
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from utils.text_match import normalize_text, normalize_title, primary_artist, similarity, has_version
+
+
+def normalize_key(artist, title):
+    """Build the cache key for an artist/title pair."""
+    return f"{normalize_text(artist)}\x1f{normalize_text(title)}"
+
+
+class LyricsCache:
+    """Single-file SQLite store for lyrics with LRU eviction.
+
+    Entries are keyed by normalized artist/title and indexed by Spotify
+    track ID, so lookups stay O(log n) however large the library grows.
+    A second index on primary artist and version-stripped title lets
+    alternate versions of a song (remasters, live cuts, feat. credits)
+    find each other's lyrics. Genius search results are kept on the same
+    version-independent key for ``search_ttl`` seconds, and songs Genius
+    has no lyrics for are remembered until a retry time.
+    Every write is its own transaction, and the least recently used entries
+    are evicted once the entry count or total size exceeds its limit.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS lyrics (
+            key TEXT PRIMARY KEY,
+            track_id TEXT,
+            artist TEXT NOT NULL,
+            title TEXT NOT NULL,
+            artist_key TEXT NOT NULL DEFAULT '',
+            base_title TEXT NOT NULL DEFAULT '',
+            data TEXT NOT NULL,
+            size INTEGER NOT NULL,
+            created_at REAL NOT NULL,
+            last_access REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS lyrics_track_id ON lyrics(track_id);
+        CREATE INDEX IF NOT EXISTS lyrics_last_access ON lyrics(last_access);
+        CREATE TABLE IF NOT EXISTS sync_corrections (
+            key TEXT PRIMARY KEY,
+            data TEXT NOT NULL,
+            updated_at REAL NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS search_results (
+            key TEXT PRIMARY KEY,
+            data TEXT NOT NULL,
+            created_at REAL NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS negative_results (
+            key TEXT PRIMARY KEY,
+            reason TEXT NOT NULL,
+            failures INTEGER NOT NULL,
+            retry_at REAL NOT NULL,
+            updated_at REAL NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS meta (
+            name TEXT PRIMARY KEY,
+            value TEXT
+        );
+    """
+
+    def __init__(self, path, max_entries=50000, max_bytes=256 * 1024 * 1024,
+                 search_ttl=7 * 24 * 3600):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.search_ttl = search_ttl
+        self.lock = threading.RLock()
+        self.stats = {'hits': 0, 'misses': 0, 'fuzzy_hits': 0, 'writes': 0, 'evictions': 0,
+                      'search_hits': 0, 'search_misses': 0, 'negative_hits': 0}
+
+        directory = os.path.dirname(os.path.abspath(path))
+        if not os.path.exists(directory):
+            os.makedirs(directory)
+
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(self.SCHEMA)
+        self.upgrade()
+        self.conn.execute(
+            "CREATE INDEX IF NOT EXISTS lyrics_base_title ON lyrics(artist_key, base_title)")
+
+        # Running totals so eviction checks don't scan the table
+        row = self.conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM lyrics").fetchone()
+        self.entry_count, self.total_bytes = row
+
+    def upgrade(self):
+        """Add the fuzzy-index columns to caches created before they existed."""
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(lyrics)")}
+        if 'artist_key' in columns and 'base_title' in columns:
+            return
+        self.conn.execute("BEGIN IMMEDIATE")
+        for column in ('artist_key', 'base_title'):
+            if column not in columns:
+                self.conn.execute(f"ALTER TABLE lyrics ADD COLUMN {column} TEXT NOT NULL DEFAULT ''")
+        rows = self.conn.execute("SELECT key, artist, title FROM lyrics").fetchall()
+        for key, artist, title in rows:
+            self.conn.execute("UPDATE lyrics SET artist_key = ?, base_title = ? WHERE key = ?",
+                              (primary_artist(artist), normalize_title(title), key))
+        self.conn.execute("COMMIT")
+
+    def get(self, artist, title, track_id=None):
+        """Return cached lyrics by track ID or artist/title, or None."""
+        with self.lock:
+            row = None
+            if track_id:
+                row = self.conn.execute(
+                    "SELECT key, data FROM lyrics WHERE track_id = ?", (track_id,)).fetchone()
+            if row is None:
+                row = self.conn.execute(
+                    "SELECT key, data FROM lyrics WHERE key = ?",
+                    (normalize_key(artist, title),)).fetchone()
+            if row is None:
+                self.stats['misses'] += 1
+                return None
+
+            self.stats['hits'] += 1
+            self.conn.execute("UPDATE lyrics SET last_access = ? WHERE key = ?",
+                              (time.time(), row[0]))
+            return json.loads(row[1])
+
+    def find_similar(self, artist, title, threshold=0.85):
+        """Find lyrics cached for another version of the same song.
+        
+        Only entries by the same primary artist are compared, using the
+        indexed version-stripped title first and fuzzy similarity second.
+        One of the two titles must carry a version decoration, so two
+        different songs that share a plain title ("Intro") never match.
+        Returns (key, lyrics) or None.
+        """
+        artist_key = primary_artist(artist)
+        base_title = normalize_title(title)
+        if not artist_key or not base_title:
+            return None
+        decorated = has_version(title)
+        with self.lock:
+            row = None
+            for key, candidate_title, data in self.conn.execute(
+                    "SELECT key, title, data FROM lyrics WHERE artist_key = ? AND base_title = ? "
+                    "ORDER BY last_access DESC", (artist_key, base_title)):
+                if decorated or has_version(candidate_title):
+                    row = (key, data)
+                    break
+            if row is None:
+                best_score = threshold
+                for key, candidate_title, candidate, data in self.conn.execute(
+                        "SELECT key, title, base_title, data FROM lyrics WHERE artist_key = ?",
+                        (artist_key,)):
+                    if not (decorated or has_version(candidate_title)):
+                        continue
+                    score = similarity(base_title, candidate)
+                    if score >= best_score:
+                        best_score = score
+                        row = (key, data)
+            if row is None:
+                return None
+
+            self.stats['fuzzy_hits'] += 1
+            self.conn.execute("UPDATE lyrics SET last_access = ? WHERE key = ?",
+                              (time.time(), row[0]))
+            return row[0], json.loads(row[1])
+
+    def put(self, artist, title, lyrics, track_id=None):
+        """Store lyrics atomically and evict old entries if over budget."""
+        key = normalize_key(artist, title)
+        data = json.dumps(lyrics, ensure_ascii=False, separators=(',', ':'))
+        size = len(data.encode('utf-8'))
+        now = time.time()
+        with self.lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                old = self.conn.execute("SELECT size, track_id FROM lyrics WHERE key = ?",
+                                        (key,)).fetchone()
+                if track_id is None and old:
+                    track_id = old[1]
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO lyrics "
+                    "(key, track_id, artist, title, artist_key, base_title, data, size, "
+                    "created_at, last_access) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (key, track_id, artist, title, primary_artist(artist), normalize_title(title),
+                     data, size, now, now))
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+
+            if old:
+                self.total_bytes += size - old[0]
+            else:
+                self.entry_count += 1
+                self.total_bytes += size
+            self.stats['writes'] += 1
+            self.evict()
+
+    def delete(self, artist, title):
+        """Remove an entry."""
+        key = normalize_key(artist, title)
+        with self.lock:
+            row = self.conn.execute("SELECT size FROM lyrics WHERE key = ?", (key,)).fetchone()
+            if row:
+                self.conn.execute("DELETE FROM lyrics WHERE key = ?", (key,))
+                self.entry_count -= 1
+                self.total_bytes -= row[0]
+
+    def evict(self, batch=64):
+        """Drop least recently used entries until within the size limits."""
+        with self.lock:
+            while self.entry_count > self.max_entries or self.total_bytes > self.max_bytes:
+                rows = self.conn.execute(
+                    "SELECT key, size FROM lyrics ORDER BY last_access LIMIT ?", (batch,)).fetchall()
+                if not rows:
+                    break
+                self.conn.execute("BEGIN IMMEDIATE")
+                for key, size in rows:
+                    self.conn.execute("DELETE FROM lyrics WHERE key = ?", (key,))
+                    self.entry_count -= 1
+                    self.total_bytes -= size
+                    self.stats['evictions'] += 1
+                    if self.entry_count <= self.max_entries and self.total_bytes <= self.max_bytes:
+                        break
+                self.conn.execute("COMMIT")
+
+    def get_correction(self, artist, title, track_id=None):
+        """Return saved timing corrections for a track as a dict, or None.
+
+        Corrections are kept per Spotify track ID, since another version
+        of the song is timed differently.
+        """
+        with self.lock:
+            row = self.conn.execute("SELECT data FROM sync_corrections WHERE key = ?",
+                                    (track_id or normalize_key(artist, title),)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put_correction(self, artist, title, correction, track_id=None):
+        """Save timing corrections for a track."""
+        data = json.dumps(correction, separators=(',', ':'))
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO sync_corrections (key, data, updated_at) VALUES (?, ?, ?)",
+                (track_id or normalize_key(artist, title), data, time.time()))
+
+    @staticmethod
+    def search_key(artist, title):
+        """Key shared by every version of a song (remasters, live cuts, feat. credits)."""
+        return f"{primary_artist(artist)}\x1f{normalize_title(title)}"
+
+    def get_search(self, artist, title):
+        """Return cached search hits for a song, or None if missing or expired."""
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT data FROM search_results WHERE key = ? AND created_at >= ?",
+                (self.search_key(artist, title), time.time() - self.search_ttl)).fetchone()
+            if row is None:
+                self.stats['search_misses'] += 1
+                return None
+            self.stats['search_hits'] += 1
+        return json.loads(row[0])
+
+    def put_search(self, artist, title, hits):
+        """Store search hits for a song and drop expired ones."""
+        data = json.dumps(hits, ensure_ascii=False, separators=(',', ':'))
+        now = time.time()
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO search_results (key, data, created_at) VALUES (?, ?, ?)",
+                (self.search_key(artist, title), data, now))
+            self.conn.execute("DELETE FROM search_results WHERE created_at < ?",
+                              (now - self.search_ttl,))
+
+    def delete_search(self, artist, title):
+        """Drop cached search hits for a song."""
+        with self.lock:
+            self.conn.execute("DELETE FROM search_results WHERE key = ?",
+                              (self.search_key(artist, title),))
+
+    def get_negative(self, artist, title):
+        """Return the recorded failure for a song as a dict, or None."""
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT reason, failures, retry_at FROM negative_results WHERE key = ?",
+                (normalize_key(artist, title),)).fetchone()
+            if row is None:
+                return None
+            if row[2] > time.time():
+                self.stats['negative_hits'] += 1
+        return {'reason': row[0], 'failures': row[1], 'retry_at': row[2]}
+
+    def put_negative(self, artist, title, reason, failures, retry_at):
+        """Record that a song could not be fetched, and when to try again."""
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO negative_results "
+                "(key, reason, failures, retry_at, updated_at) VALUES (?, ?, ?, ?, ?)",
+                (normalize_key(artist, title), reason, failures, retry_at, time.time()))
+
+    def delete_negative(self, artist, title):
+        """Forget a recorded failure so the next lookup goes to the network."""
+        with self.lock:
+            self.conn.execute("DELETE FROM negative_results WHERE key = ?",
+                              (normalize_key(artist, title),))
+
+    def get_meta(self, name, default=None):
+        """Read a value from the meta table."""
+        with self.lock:
+            row = self.conn.execute("SELECT value FROM meta WHERE name = ?", (name,)).fetchone()
+            return row[0] if row else default
+
+    def set_meta(self, name, value):
+        """Write a value to the meta table."""
+        with self.lock:
+            self.conn.execute("INSERT OR REPLACE INTO meta (name, value) VALUES (?, ?)",
+                              (name, value))
+
+    def migrate_json_dir(self, directory):
+        """Import legacy per-song ``{artist}_{title}.json`` files once."""
+        if self.get_meta('json_migrated'):
+            return 0
+
+        migrated = 0
+        for path in glob.glob(os.path.join(directory, '*.json')):
+            name = os.path.splitext(os.path.basename(path))[0]
+            if '_' not in name:
+                continue
+            artist, title = name.split('_', 1)
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    lyrics = json.load(f)
+                self.put(artist, title, lyrics)
+                migrated += 1
+            except Exception as e:
+                print(f"Error migrating cache file {path}: {e}")
+
+        self.set_meta('json_migrated', str(time.time()))
+        if migrated:
+            print(f"Migrated {migrated} cached lyrics files into {self.path}")
+        return migrated
+
+    def get_stats(self):
+        """Return hit/miss counters and current size."""
+        with self.lock:
+            stats = dict(self.stats)
+            stats['entries'] = self.entry_count
+            stats['bytes'] = self.total_bytes
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = stats['hits'] / lookups if lookups else 0.0
+        searches = stats['search_hits'] + stats['search_misses']
+        stats['search_hit_rate'] = stats['search_hits'] / searches if searches else 0.0
+        return stats
+
+    def close(self):
+        """Close the database connection."""
+        with self.lock:
+            self.conn.close()
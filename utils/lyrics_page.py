@@ -0,0 +1,134 @@
+from html.parser import HTMLParser
+
+# Lyrics container formats Genius has used, in the order they are tried
+OLD_FORMAT = 'old'        # <div class="lyrics">
+NEW_FORMAT = 'new'        # <div class="Lyrics__Container-sc-1ynbvzw-6">
+NEWEST_FORMAT = 'newest'  # <div data-lyrics-container="true">, one per block
+LYRICS_FORMATS = (OLD_FORMAT, NEW_FORMAT, NEWEST_FORMAT)
+
+# Formats with a single container; the page can stop being read once it closes
+SINGLE_CONTAINER_FORMATS = (OLD_FORMAT, NEW_FORMAT)
+
+CHUNK_SIZE = 16 * 1024
+
+# Text Genius shows instead of lyrics for songs that have none
+NO_LYRICS_NOTICES = ('LyricsPlaceholder', 'This song is an instrumental',
+                     'Lyrics for this song have yet to be released')
+
+# Elements without an end tag, which must not open an excluded block
+VOID_TAGS = frozenset(('area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link',
+                       'meta', 'source', 'track', 'wbr'))
+
+
+def container_format(attrs):
+    """Return the formats a div's attributes mark as a lyrics container."""
+    formats = []
+    attrs = dict(attrs)
+    classes = (attrs.get('class') or '').split()
+    if 'lyrics' in classes:
+        formats.append(OLD_FORMAT)
+    if 'Lyrics__Container-sc-1ynbvzw-6' in classes:
+        formats.append(NEW_FORMAT)
+    if attrs.get('data-lyrics-container') == 'true':
+        formats.append(NEWEST_FORMAT)
+    return formats
+
+
+class LyricsPageParser(HTMLParser):
+    """Collect the text of lyrics containers in a single pass over a page.
+
+    Only the text inside containers of the requested formats is kept; the
+    rest of the page is scanned without building a tree. ``<br>`` inside a
+    container becomes a line break. Blocks Genius marks with
+    ``data-exclude-from-selection`` (the song header, inline "You might
+    also like" widgets) are skipped.
+    """
+
+    def __init__(self, formats=LYRICS_FORMATS):
+        super().__init__(convert_charrefs=True)
+        self.formats = tuple(formats)
+        self.depth = {}  # Format -> div nesting depth inside its open container
+        self.parts = {}  # Format -> text of the open container
+        self.found = {fmt: [] for fmt in self.formats}  # Format -> finished containers
+        self.excluded = 0  # Element nesting depth inside an excluded block
+
+    @property
+    def finished(self):
+        """True once nothing later in the page can change the result."""
+        return bool(self.formats) and all(
+            fmt in SINGLE_CONTAINER_FORMATS and self.found[fmt] for fmt in self.formats)
+
+    def handle_starttag(self, tag, attrs):
+        if self.excluded:
+            if tag not in VOID_TAGS:
+                self.excluded += 1
+            return
+        if self.parts and tag not in VOID_TAGS and \
+                dict(attrs).get('data-exclude-from-selection') == 'true':
+            self.excluded = 1
+            return
+        if tag == 'br':
+            self.handle_data('\n')
+            return
+        if tag != 'div':
+            return
+        for fmt in self.depth:
+            self.depth[fmt] += 1
+        for fmt in container_format(attrs):
+            if fmt in self.found and fmt not in self.depth:
+                if fmt in SINGLE_CONTAINER_FORMATS and self.found[fmt]:
+                    continue  # Only the first container counts
+                self.depth[fmt] = 1
+                self.parts[fmt] = []
+
+    def handle_startendtag(self, tag, attrs):
+        if tag == 'br' and not self.excluded:
+            self.handle_data('\n')
+
+    def handle_endtag(self, tag):
+        if self.excluded:
+            if tag not in VOID_TAGS:
+                self.excluded -= 1
+            return
+        if tag != 'div':
+            return
+        for fmt in list(self.depth):
+            self.depth[fmt] -= 1
+            if not self.depth[fmt]:
+                del self.depth[fmt]
+                self.found[fmt].append(''.join(self.parts.pop(fmt)))
+
+    def handle_data(self, data):
+        if self.excluded:
+            return
+        for parts in self.parts.values():
+            parts.append(data)
+
+    def result(self):
+        """Return (format, text) for the first format that was found, or (None, None)."""
+        for fmt in self.formats:
+            if self.found[fmt]:
+                return fmt, '\n'.join(self.found[fmt])
+        return None, None
+
+
+def has_no_lyrics_notice(html):
+    """Check whether a page says the song has no lyrics, rather than failing to parse."""
+    return any(notice in html for notice in NO_LYRICS_NOTICES)
+
+
+def extract_lyrics(html, formats=LYRICS_FORMATS):
+    """Return (format, lyrics text) from a Genius page, or (None, None).
+
+    Formats are tried in the given order. The page is fed in chunks so
+    reading stops as soon as every requested single-container format has
+    been found.
+    """
+    parser = LyricsPageParser(formats)
+    for start in range(0, len(html), CHUNK_SIZE):
+        parser.feed(html[start:start + CHUNK_SIZE])
+        if parser.finished:
+            break
+    else:
+        parser.close()
+    return parser.result()
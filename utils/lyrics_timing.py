@@ -0,0 +1,276 @@
+import re
+from array import array
+from bisect import bisect_right
+
+# [mm:ss], [mm:ss.xx] or [mm:ss:xx] line stamps and <mm:ss.xx> word stamps
+LINE_TIMESTAMP = re.compile(r'\[(\d+):(\d{1,2})(?:[.:](\d{1,3}))?\]')
+WORD_TIMESTAMP = re.compile(r'<(\d+):(\d{1,2})(?:[.:](\d{1,3}))?>')
+OFFSET_TAG = re.compile(r'\[offset:\s*([+-]?\d+)\s*\]', re.IGNORECASE)
+METADATA_TAG = re.compile(r'^\[[a-zA-Z#]+:.*\]$')
+
+
+def stamp_to_ms(minutes, seconds, fraction):
+    """Convert timestamp parts to milliseconds (fraction is 1-3 digits)."""
+    ms = (int(minutes) * 60 + int(seconds)) * 1000
+    if fraction:
+        ms += int(fraction.ljust(3, '0')[:3])
+    return ms
+
+
+def is_lrc(text):
+    """Check whether text looks like LRC (most lyric lines are time-stamped)."""
+    lines = [line for line in (text or '').splitlines() if line.strip()]
+    if not lines:
+        return False
+    stamped = sum(1 for line in lines if LINE_TIMESTAMP.match(line.strip()))
+    return stamped >= max(1, len(lines) // 2)
+
+
+def parse_words(text, line_start):
+    """Split an enhanced-LRC line into (plain text, [[start_ms, word], ...])."""
+    parts = WORD_TIMESTAMP.split(text)
+    if len(parts) == 1:
+        return text.strip(), None
+
+    words = []
+    if parts[0].strip():
+        words.append([line_start, parts[0].strip()])
+    for i in range(1, len(parts), 4):
+        start = stamp_to_ms(parts[i], parts[i + 1], parts[i + 2])
+        word = parts[i + 3].strip()
+        if word:
+            words.append([start, word])
+    plain = ' '.join(word for _, word in words)
+    return plain, words or None
+
+
+def parse_lrc(text):
+    """Parse LRC or enhanced LRC into timed line dicts sorted by start time.
+
+    Times are in milliseconds. Lines with several stamps (repeated
+    choruses) are emitted once per stamp. Enhanced-LRC word stamps are kept
+    under 'words' as [start_ms, word] pairs; they are written for the first
+    stamp, so repeats get them shifted by the same amount as the line.
+    """
+    offset = 0
+    match = OFFSET_TAG.search(text or '')
+    if match:
+        # A positive offset means lyrics should appear earlier
+        offset = -int(match.group(1))
+
+    timed = []
+    for raw in (text or '').splitlines():
+        raw = raw.strip()
+        stamps = []
+        while True:
+            match = LINE_TIMESTAMP.match(raw)
+            if not match:
+                break
+            stamps.append(stamp_to_ms(*match.groups()))
+            raw = raw[match.end():]
+        if not stamps or METADATA_TAG.match(raw):
+            continue
+        line_text, first_words = parse_words(raw, stamps[0])
+        if not line_text:
+            continue
+        for start in stamps:
+            words = None
+            if first_words:
+                shift = start - stamps[0] + offset
+                words = [[max(0, word_start + shift), word] for word_start, word in first_words]
+            timed.append((max(0, start + offset), line_text, words))
+    timed.sort(key=lambda item: item[0])
+
+    lyrics = []
+    for i, (start, line_text, words) in enumerate(timed):
+        end = timed[i + 1][0] if i + 1 < len(timed) else None
+        line = {
+            'text': line_text,
+            'start_time': start,
+            'duration': end - start if end is not None else None,
+            'line_number': i,
+        }
+        if words:
+            line['words'] = words
+        lyrics.append(line)
+    return lyrics
+
+
+def has_timing(lyrics):
+    """Check whether every line of parsed lyrics has a start time."""
+    return bool(lyrics) and all(isinstance(line, dict) and line.get('start_time') is not None
+                                for line in lyrics)
+
+
+class SyncCorrection:
+    """User timing corrections for one song: a global offset plus anchors.
+
+    The offset shifts every line (positive means later). Anchors pin a
+    playback position to a lyrics position; between anchors the mapping is
+    interpolated linearly and outside them the nearest anchor's shift
+    applies. Mapping a position is a binary search over the anchors.
+    """
+
+    def __init__(self, offset_ms=0, anchors=None):
+        self.offset_ms = int(offset_ms)
+        self.anchors = sorted((int(position), int(lyric)) for position, lyric in anchors or [])
+        self._reindex()
+
+    def _reindex(self):
+        self.positions = array('q', [position for position, _ in self.anchors])
+        self.lyric_times = array('q', [lyric for _, lyric in self.anchors])
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data.get('offset_ms', 0), data.get('anchors'))
+
+    def as_dict(self):
+        return {'offset_ms': self.offset_ms,
+                'anchors': [[position, lyric] for position, lyric in self.anchors]}
+
+    def is_empty(self):
+        return not self.offset_ms and not self.anchors
+
+    def nudge(self, delta_ms):
+        """Shift every line by delta_ms (positive shows lines later)."""
+        self.offset_ms += int(delta_ms)
+
+    def add_anchor(self, progress_ms, lyric_ms):
+        """Record that lyrics position lyric_ms is sung at playback progress_ms.
+
+        Anchors that would make the mapping run backwards are dropped.
+        """
+        position = int(progress_ms) - self.offset_ms
+        lyric_ms = int(lyric_ms)
+        self.anchors = sorted(
+            [(p, l) for p, l in self.anchors
+             if (p < position and l < lyric_ms) or (p > position and l > lyric_ms)]
+            + [(position, lyric_ms)])
+        self._reindex()
+
+    def merge(self, later):
+        """Apply corrections made on top of these ones.
+
+        The later offset adds to this one and the later anchors keep the
+        playback positions they were set at, replacing conflicting anchors.
+        """
+        self.offset_ms += later.offset_ms
+        for position, lyric_ms in later.anchors:
+            self.add_anchor(position + later.offset_ms, lyric_ms)
+
+    def to_lyrics_time(self, progress_ms):
+        """Map a playback position to the lyrics' own timeline."""
+        position = progress_ms - self.offset_ms
+        count = len(self.positions)
+        if not count:
+            return position
+        i = bisect_right(self.positions, position)
+        if i == 0:
+            return position + self.lyric_times[0] - self.positions[0]
+        if i == count:
+            return position + self.lyric_times[-1] - self.positions[-1]
+        p0, p1 = self.positions[i - 1], self.positions[i]
+        l0, l1 = self.lyric_times[i - 1], self.lyric_times[i]
+        return int(l0 + (position - p0) * (l1 - l0) / (p1 - p0))
+
+
+class TimingIndex:
+    """Sorted start-time array for finding the current line in O(log n).
+
+    Built once per song from the displayed lines' start times. When any
+    line lacks a start time it falls back to spreading lines evenly over
+    the track. An optional SyncCorrection maps playback positions first.
+    """
+
+    def __init__(self, start_times, corrections=None):
+        self.count = len(start_times)
+        self.synced = self.count > 0 and all(start is not None for start in start_times)
+        self.starts = array('q', start_times if self.synced else [])
+        self.corrections = corrections
+
+    def line_start(self, index, duration_ms=0):
+        """Return the lyrics-timeline start of a line."""
+        if self.synced:
+            return self.starts[index]
+        return int(index * duration_ms / self.count) if self.count else 0
+
+    def line_at(self, progress_ms, duration_ms=0):
+        """Return the index of the line playing at progress_ms, or -1 if none."""
+        if not self.count:
+            return -1
+        if self.corrections is not None:
+            progress_ms = self.corrections.to_lyrics_time(progress_ms)
+        if self.synced:
+            return max(0, bisect_right(self.starts, progress_ms) - 1)
+        if not duration_ms:
+            return 0
+        # Linear estimate when the lyrics carry no timing
+        line = int(progress_ms / duration_ms * self.count)
+        return max(0, min(line, self.count - 1))
+
+
+LATIN_WORD = re.compile(r"[a-z']+")
+VOWEL_GROUP = re.compile(r'[aeiouy]+')
+INSTRUMENTAL_SECTIONS = ('instrumental', 'solo', 'break', 'interlude', 'drop')
+
+
+def count_syllables(text):
+    """Rough syllable count, used as the sung length of a line."""
+    text = (text or '').lower()
+    count = 0
+    for word in LATIN_WORD.findall(text):
+        groups = len(VOWEL_GROUP.findall(word))
+        if groups > 1 and word.endswith('e') and not word.endswith(('le', 'ee')):
+            groups -= 1  # Silent final e
+        count += max(1, groups)
+    # Scripts without Latin vowels: count roughly one syllable per character
+    other = len(re.sub(r"[\sa-z'\W]", '', LATIN_WORD.sub('', text)))
+    return max(1, count + other)
+
+
+def estimate_timings(lyrics, duration_ms, intro_ratio=0.06, outro_ratio=0.05,
+                     line_overhead=1.5, stanza_gap=3.0, section_gap=4.0, instrumental_gap=16.0):
+    """Estimate start_time/duration for plain lyrics from their structure.
+
+    Each line is weighted by its syllable count plus a breath, with extra
+    weight for stanza breaks, new sections and instrumental sections
+    recorded by parse_lyrics_with_timing. Lead-in and tail time model the
+    intro and outro. Returns new line dicts marked 'estimated'.
+    """
+    if not lyrics or not duration_ms:
+        return lyrics
+
+    intro_ms = min(max(duration_ms * intro_ratio, 3000), 15000)
+    outro_ms = min(max(duration_ms * outro_ratio, 3000), 12000)
+    if lyrics[0].get('sections_before') and 'intro' in lyrics[0]['sections_before'][0].lower():
+        intro_ms = min(intro_ms, 2000)  # The intro is sung, not instrumental
+    available = max(duration_ms - intro_ms - outro_ms, duration_ms * 0.5)
+
+    gaps = []
+    weights = []
+    for i, line in enumerate(lyrics):
+        gap = 0.0
+        if i > 0:
+            for section in line.get('sections_before') or []:
+                if any(name in section.lower() for name in INSTRUMENTAL_SECTIONS):
+                    gap += instrumental_gap
+                else:
+                    gap += section_gap
+            if not gap and line.get('stanza_break'):
+                gap = stanza_gap
+        gaps.append(gap)
+        weights.append(count_syllables(line.get('text')) + line_overhead)
+
+    scale = available / (sum(weights) + sum(gaps))
+    position = intro_ms
+    timed = []
+    for line, gap, weight in zip(lyrics, gaps, weights):
+        position += gap * scale
+        line_duration = weight * scale
+        timed_line = dict(line)
+        timed_line['start_time'] = int(position)
+        timed_line['duration'] = int(line_duration)
+        timed_line['estimated'] = True
+        timed.append(timed_line)
+        position += line_duration
+    return timed
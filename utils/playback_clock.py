@@ -0,0 +1,121 @@
+import threading
+import time
+
+
+class PlaybackClock:
+    """Local model of the Spotify playback position between API syncs.
+
+    Stores the last confirmed progress together with a monotonic timestamp
+    and extrapolates the position locally, so readers can query it at frame
+    rate without touching the network.
+    """
+
+    def __init__(self, min_sync_interval=1.0, max_sync_interval=10.0,
+                 backoff_factor=1.5, seek_threshold_ms=1500, clock=time.monotonic):
+        self.clock = clock  # Seconds source; replays substitute an accelerated one
+        self.min_sync_interval = min_sync_interval
+        self.max_sync_interval = max_sync_interval
+        self.backoff_factor = backoff_factor
+        self.seek_threshold_ms = seek_threshold_ms
+        self.lock = threading.Lock()
+
+        # Last confirmed state from Spotify
+        self.track_id = None
+        self.track = None
+        self.progress_ms = 0
+        self.duration_ms = 0
+        self.is_playing = False
+        self.synced_at = None
+
+        # Adaptive sync schedule
+        self.sync_interval = min_sync_interval
+        self.force_sync = True
+        self.sync_count = 0
+
+    def _position_at(self, now):
+        """Extrapolate the position at a monotonic time (lock must be held)."""
+        if self.synced_at is None:
+            return 0
+        position = self.progress_ms
+        if self.is_playing:
+            position += int((now - self.synced_at) * 1000)
+        if self.duration_ms:
+            position = min(position, self.duration_ms)
+        return max(0, position)
+
+    def position_ms(self):
+        """Return the current estimated playback position in milliseconds."""
+        with self.lock:
+            return self._position_at(self.clock())
+
+    def snapshot(self):
+        """Return (track, position_ms, duration_ms, is_playing) atomically."""
+        with self.lock:
+            return (self.track, self._position_at(self.clock()),
+                    self.duration_ms, self.is_playing)
+
+    def request_sync(self):
+        """Force a sync on the next check, e.g. after a user action."""
+        with self.lock:
+            self.force_sync = True
+            self.sync_interval = self.min_sync_interval
+
+    def seconds_until_sync(self):
+        """Return how long to wait before the next Spotify sync is due."""
+        with self.lock:
+            if self.force_sync or self.synced_at is None:
+                return 0.0
+            now = self.clock()
+            wait = self.sync_interval - (now - self.synced_at)
+            # Re-sync right after the predicted end of the track
+            if self.is_playing and self.duration_ms:
+                remaining = (self.duration_ms - self._position_at(now)) / 1000
+                wait = min(wait, remaining + 0.3)
+            return max(0.0, wait)
+
+    def sync_due(self):
+        """Check whether the clock should be re-synced with Spotify."""
+        return self.seconds_until_sync() <= 0
+
+    def sync(self, playback):
+        """Update the clock from a current_playback() response.
+
+        Returns the list of detected changes: 'track_changed', 'paused',
+        'resumed' and 'seeked'.
+        """
+        now = self.clock()
+        events = []
+        with self.lock:
+            item = playback.get('item') if playback else None
+            track_id = item.get('id') if item else None
+            is_playing = bool(playback and playback.get('is_playing') and item)
+            progress_ms = (playback.get('progress_ms') or 0) if playback else 0
+            duration_ms = (item.get('duration_ms') or 0) if item else 0
+
+            if track_id != self.track_id:
+                if track_id is not None:
+                    events.append('track_changed')
+            elif track_id is not None and self.synced_at is not None:
+                expected = self._position_at(now)
+                if abs(progress_ms - expected) > self.seek_threshold_ms:
+                    events.append('seeked')
+
+            if is_playing != self.is_playing:
+                events.append('resumed' if is_playing else 'paused')
+
+            self.track_id = track_id
+            self.track = item
+            self.progress_ms = progress_ms
+            self.duration_ms = duration_ms
+            self.is_playing = is_playing
+            self.synced_at = now
+            self.force_sync = False
+            self.sync_count += 1
+
+            # Poll quickly right after a change, back off while stable
+            if events:
+                self.sync_interval = self.min_sync_interval
+            else:
+                self.sync_interval = min(self.sync_interval * self.backoff_factor,
+                                         self.max_sync_interval)
+        return events
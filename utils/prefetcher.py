@@ -0,0 +1,103 @@
+import json
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+
+class SpotifyQueueSource:
+    """Upcoming tracks from the user's Spotify queue."""
+
+    def __init__(self, spotify_controller):
+        self.spotify_controller = spotify_controller
+
+    def get_upcoming(self, limit):
+        """Return up to limit upcoming track items."""
+        return self.spotify_controller.get_upcoming_tracks(limit)
+
+
+class LocalQueueSource:
+    """Local stand-in for Spotify's /me/player/queue endpoint.
+
+    Takes either a list of track items or the path to a JSON file shaped
+    like the endpoint's response (``{"currently_playing": ..., "queue": [...]}``).
+    """
+
+    def __init__(self, tracks=None, path=None):
+        self.tracks = list(tracks or [])
+        self.path = path
+
+    def get_upcoming(self, limit):
+        """Return up to limit upcoming track items."""
+        tracks = self.tracks
+        if self.path:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                tracks = json.load(f).get('queue', [])
+        return [track for track in tracks if track and track.get('type', 'track') == 'track'][:limit]
+
+
+class Prefetcher:
+    """Warm the lyrics and album-art caches for the next tracks in the queue."""
+
+    def __init__(self, queue_source, lyrics_fetcher, art_cache, depth=3, max_concurrent=2,
+                 remember=256):
+        self.queue_source = queue_source
+        self.lyrics_fetcher = lyrics_fetcher
+        self.art_cache = art_cache
+        self.depth = depth
+        self.remember = remember
+        self.executor = ThreadPoolExecutor(max_workers=max_concurrent,
+                                           thread_name_prefix="prefetch")
+        self.lock = threading.Lock()
+        self.warmed = OrderedDict()  # Track IDs already prefetched or in flight
+        self.stats = {'runs': 0, 'tracks': 0, 'skipped': 0, 'lyrics_warmed': 0,
+                      'art_warmed': 0, 'errors': 0}
+
+    def prefetch(self):
+        """Look up the upcoming tracks and warm caches for them in the background."""
+        self.executor.submit(self._prefetch_upcoming)
+
+    def _prefetch_upcoming(self):
+        """Read the queue and schedule one warm-up job per new track."""
+        try:
+            tracks = self.queue_source.get_upcoming(self.depth)
+        except Exception as e:
+            self.stats['errors'] += 1
+            print(f"Error reading upcoming queue: {e}")
+            return
+
+        self.stats['runs'] += 1
+        for track in tracks:
+            track_id = track.get('id')
+            with self.lock:
+                if track_id in self.warmed:
+                    self.stats['skipped'] += 1
+                    continue
+                self.warmed[track_id] = True
+                while len(self.warmed) > self.remember:
+                    self.warmed.popitem(last=False)
+            self.stats['tracks'] += 1
+            self.executor.submit(self._warm_track, track)
+
+    def _warm_track(self, track):
+        """Fetch lyrics and album art for one track so the caches hold them."""
+        try:
+            artist = track['artists'][0]['name']
+            title = track['name']
+            if self.lyrics_fetcher and self.lyrics_fetcher.fetch_lyrics(
+                    artist, title, track.get('id'), track.get('duration_ms')):
+                self.stats['lyrics_warmed'] += 1
+            if self.art_cache and self.art_cache.load(track) is not None:
+                self.stats['art_warmed'] += 1
+        except Exception as e:
+            self.stats['errors'] += 1
+            print(f"Error prefetching {track.get('name')}: {e}")
+            with self.lock:
+                self.warmed.pop(track.get('id'), None)
+
+    def get_stats(self):
+        """Return prefetch counters."""
+        return dict(self.stats)
+
+    def shutdown(self):
+        """Stop the prefetch workers."""
+        self.executor.shutdown(wait=False)
@@ -0,0 +1,59 @@
+import threading
+
+
+class Call:
+    """One in-flight call and the callers waiting on it."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Let concurrent callers with the same key share one call.
+
+    The first caller for a key runs the function; callers arriving while
+    it runs wait and get its result (or its exception). Once it returns,
+    the next call for the key runs again, so results are never cached here.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.calls = {}
+        self.stats = {'calls': 0, 'shared': 0}
+
+    def do(self, key, fn, *args, **kwargs):
+        """Run fn(*args, **kwargs) once for all concurrent callers with this key."""
+        with self.lock:
+            call = self.calls.get(key)
+            leader = call is None
+            if leader:
+                call = self.calls[key] = Call()
+                self.stats['calls'] += 1
+            else:
+                self.stats['shared'] += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn(*args, **kwargs)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self.lock:
+                del self.calls[key]
+            call.done.set()
+
+    def get_stats(self):
+        """Return how many calls ran and how many callers shared one."""
+        with self.lock:
+            stats = dict(self.stats)
+            stats['in_flight'] = len(self.calls)
+        return stats
@@ -0,0 +1,84 @@
+import re
+import unicodedata
+
+# Version suffixes Spotify appends after " - ", e.g. "Song - Remastered 2011"
+VERSION_SUFFIX = re.compile(
+    r'\s+-\s+.*\b(remaster(ed)?|live|mono|stereo|version|edit|mix|remix|demo|acoustic|'
+    r'instrumental|deluxe|bonus|single|radio|explicit|clean|session|take|recorded)\b.*$',
+    re.IGNORECASE)
+BRACKETS = re.compile(r'\(.*?\)|\[.*?\]')
+FEATURING = re.compile(r'\s+(feat\.?|ft\.?|featuring)\s+.*$', re.IGNORECASE)
+ARTIST_SEPARATORS = re.compile(r'\s*(,|&|;|/|\bfeat\.?|\bft\.?|\bfeaturing\b)\s*', re.IGNORECASE)
+PUNCTUATION = re.compile(r"[^\w\s]")
+
+
+def normalize_text(text):
+    """Fold case, width and whitespace so equivalent names compare equal."""
+    text = unicodedata.normalize('NFKC', text or '').casefold()
+    return re.sub(r'\s+', ' ', text).strip()
+
+
+def strip_version(title):
+    """Remove version and featuring decorations from a track title."""
+    title = VERSION_SUFFIX.sub('', title or '')
+    title = BRACKETS.sub('', title)
+    title = FEATURING.sub('', title)
+    return title.strip()
+
+
+def has_version(title):
+    """Check whether a title carries a version decoration (remaster, live, feat., brackets)."""
+    return normalize_text(strip_version(title)) != normalize_text(title)
+
+
+def normalize_title(title):
+    """Normalize a title so alternate versions of a song share one key."""
+    title = normalize_text(strip_version(title))
+    title = PUNCTUATION.sub('', title.replace("'", ''))
+    return re.sub(r'\s+', ' ', title).strip()
+
+
+def primary_artist(artist):
+    """Return the first credited artist, normalized."""
+    first = ARTIST_SEPARATORS.split(artist or '')[0]
+    first = PUNCTUATION.sub('', normalize_text(first).replace("'", ''))
+    return re.sub(r'\s+', ' ', first).strip()
+
+
+def trigrams(text):
+    """Return the set of character trigrams of a padded string."""
+    text = f"  {text} "
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def similarity(a, b):
+    """Score two normalized strings from 0 to 1 by token and trigram overlap."""
+    if a == b:
+        return 1.0
+    if not a or not b:
+        return 0.0
+    tokens_a, tokens_b = set(a.split()), set(b.split())
+    token_score = len(tokens_a & tokens_b) / len(tokens_a | tokens_b)
+    grams_a, grams_b = trigrams(a), trigrams(b)
+    gram_score = 2 * len(grams_a & grams_b) / (len(grams_a) + len(grams_b))
+    return (token_score + gram_score) / 2
+
+
+def score_hit(hit, artist, title):
+    """Score a Genius search hit against the artist and title being looked up."""
+    result = hit.get('result') or {}
+    hit_title = normalize_title(result.get('title') or '')
+    hit_artist = primary_artist((result.get('primary_artist') or {}).get('name') or '')
+    wanted_artist = primary_artist(artist)
+    title_score = similarity(normalize_title(title), hit_title)
+    artist_score = 1.0 if hit_artist == wanted_artist else similarity(wanted_artist, hit_artist)
+    return 0.6 * title_score + 0.4 * artist_score
+
+
+def rank_hits(hits, artist, title):
+    """Order search hits best match first; ties keep the search engine's order.
+
+    Covers and translations are usually filed under another primary artist
+    or a decorated title, so they sink below the original.
+    """
+    return sorted(hits, key=lambda hit: -score_hit(hit, artist, title))
@@ -0,0 +1,295 @@
+"""Fetch lyrics for a whole playlist or library ahead of time.
+
+Fills the same lyrics cache the app reads, so the first play of every
+song is a cache hit. Tracks come from one of:
+    --playlist ID         a Spotify playlist (needs Spotify login)
+    --saved-tracks FILE   a saved-tracks export: Spotify API pages ({"items": [{"track": ...}]})
+                          or the account data export (YourLibrary.json)
+    --csv FILE            rows of artist,title with optional duration_ms,track_id columns
+
+Progress is appended to a file as each track finishes, so an interrupted
+run picks up where it stopped.
+
+Usage:
+    python warm_cache.py --playlist 37i9dQZF1DXcBWIGoYBM5M
+    python warm_cache.py --csv songs.csv --workers 4 --rate 2
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+# Add the current directory to the path to ensure modules can be found
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from main import load_config, initialize_spotify, REQUIRED_CONFIG_KEYS
+from lyrics_fetcher import GeniusLyricsFetcher, MISS_NETWORK, MISS_ERROR
+from utils.lyrics_cache import normalize_key
+
+# Outcomes that are not retried on resume; transient misses are
+DONE_STATUSES = ('cached', 'fetched', 'no_hits', 'no_lyrics')
+
+
+class RateLimiter:
+    """Space out calls to at most ``rate`` per second across threads."""
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self.lock = threading.Lock()
+        self.next_at = time.monotonic()
+
+    def wait(self):
+        """Block until the next call is allowed."""
+        with self.lock:
+            now = time.monotonic()
+            start = max(now, self.next_at)
+            self.next_at = start + self.interval
+        if start > now:
+            time.sleep(start - now)
+
+
+def track_entry(track):
+    """Build a warm-up entry from a Spotify track object."""
+    artists = track.get('artists') or []
+    if not artists or not track.get('name'):
+        return None
+    return {
+        'artist': artists[0]['name'],
+        'title': track['name'],
+        'track_id': track.get('id'),
+        'duration_ms': track.get('duration_ms'),
+    }
+
+
+def load_saved_tracks(path):
+    """Read tracks from a saved-tracks export."""
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+
+    # Account data export: {"tracks": [{"artist", "track", "uri"}, ...]}
+    if isinstance(data, dict) and 'tracks' in data:
+        entries = []
+        for item in data['tracks']:
+            if item.get('artist') and item.get('track'):
+                uri = item.get('uri') or ''
+                entries.append({
+                    'artist': item['artist'],
+                    'title': item['track'],
+                    'track_id': uri.rsplit(':', 1)[-1] if uri.startswith('spotify:track:') else None,
+                    'duration_ms': None,
+                })
+        return entries
+
+    # Web API pages of /me/tracks, one page or a list of them
+    pages = data if isinstance(data, list) else [data]
+    items = []
+    for page in pages:
+        items.extend(page.get('items', []) if isinstance(page, dict) and 'items' in page else [page])
+    entries = [track_entry(item.get('track') or item) for item in items if isinstance(item, dict)]
+    return [entry for entry in entries if entry]
+
+
+def load_csv(path):
+    """Read artist,title[,duration_ms,track_id] rows; a header row is optional."""
+    entries = []
+    with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+        rows = list(csv.reader(f))
+    if rows and [cell.strip().lower() for cell in rows[0][:2]] == ['artist', 'title']:
+        header = [cell.strip().lower() for cell in rows[0]]
+        rows = [dict(zip(header, row)) for row in rows[1:]]
+    else:
+        rows = [dict(zip(['artist', 'title', 'duration_ms', 'track_id'], row)) for row in rows]
+    for row in rows:
+        artist = (row.get('artist') or '').strip()
+        title = (row.get('title') or '').strip()
+        if not artist or not title:
+            continue
+        duration = (row.get('duration_ms') or '').strip()
+        entries.append({
+            'artist': artist,
+            'title': title,
+            'track_id': (row.get('track_id') or '').strip() or None,
+            'duration_ms': int(duration) if duration.isdigit() else None,
+        })
+    return entries
+
+
+def load_playlist(config, playlist_id):
+    """Read a playlist's tracks from Spotify, or None if it cannot be read.
+    
+    Asks for playlist access on top of the app's usual scope, so a login
+    made by the lyrics window is upgraded once, here.
+    """
+    from controllers.spotify_controller import PLAYLIST_SCOPE
+    spotify_controller = initialize_spotify(config, None, scope=PLAYLIST_SCOPE)
+    if not spotify_controller:
+        return None
+    try:
+        tracks = spotify_controller.get_playlist_tracks(playlist_id)
+    finally:
+        spotify_controller.cleanup()
+    if tracks is None:
+        return None
+    entries = [track_entry(track) for track in tracks]
+    return [entry for entry in entries if entry]
+
+
+def entry_key(entry):
+    return entry['track_id'] or normalize_key(entry['artist'], entry['title'])
+
+
+class Progress:
+    """Append-only record of finished tracks, so a rerun can skip them."""
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.done = {}
+        if path and os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue  # Line cut short by an interrupted run
+                    self.done[record['key']] = record['status']
+
+    def is_done(self, entry):
+        return self.done.get(entry_key(entry)) in DONE_STATUSES
+
+    def record(self, entry, status):
+        if not self.path:
+            return
+        line = json.dumps({'key': entry_key(entry), 'artist': entry['artist'],
+                           'title': entry['title'], 'status': status}, ensure_ascii=False)
+        with self.lock:
+            self.done[entry_key(entry)] = status
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(line + '\n')
+
+
+def warm_track(fetcher, limiter, entry):
+    """Fetch one track's lyrics into the cache and return its status."""
+    artist, title, track_id = entry['artist'], entry['title'], entry['track_id']
+    if fetcher.get_lyrics_from_cache(artist, title, track_id):
+        return 'cached'
+    limiter.wait()
+    lyrics = fetcher.fetch_lyrics(artist, title, track_id, entry['duration_ms'])
+    if lyrics:
+        return 'fetched'
+    miss = fetcher.cache.get_negative(artist, title)
+    return miss['reason'] if miss else MISS_ERROR
+
+
+def warm(fetcher, entries, progress, workers=4, rate=1.0):
+    """Warm the cache for every entry not already done; return status counts."""
+    limiter = RateLimiter(rate)
+    counts = {'skipped': 0}
+    pending = [entry for entry in entries if not progress.is_done(entry)]
+    counts['skipped'] = len(entries) - len(pending)
+    total = len(pending)
+    finished = 0
+
+    def finish(future, entry):
+        """Record a finished track's status."""
+        nonlocal finished
+        try:
+            status = future.result()
+        except Exception as e:
+            print(f"Error warming {entry['artist']} - {entry['title']}: {e}")
+            status = MISS_ERROR
+        progress.record(entry, status)
+        counts[status] = counts.get(status, 0) + 1
+        finished += 1
+        print(f"[{finished}/{total}] {status:>9}  {entry['artist']} - {entry['title']}")
+
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="warm")
+    in_flight = {}
+    try:
+        while pending or in_flight:
+            # Keep the queue short so an interrupt leaves little unrecorded work
+            while pending and len(in_flight) < workers * 2:
+                entry = pending.pop(0)
+                in_flight[executor.submit(warm_track, fetcher, limiter, entry)] = entry
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                finish(future, in_flight.pop(future))
+    except KeyboardInterrupt:
+        print("\nInterrupted; finishing tracks in progress (rerun to resume)...")
+        for future in in_flight:
+            future.cancel()
+        executor.shutdown(wait=True)
+        # Record the tracks that were already running, so a rerun skips them
+        for future, entry in in_flight.items():
+            if not future.cancelled():
+                finish(future, entry)
+    finally:
+        executor.shutdown(wait=True)
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--playlist', help="Spotify playlist ID or URI")
+    source.add_argument('--saved-tracks', help="saved-tracks export (JSON)")
+    source.add_argument('--csv', help="CSV of artist,title[,duration_ms,track_id]")
+    parser.add_argument('--workers', type=int, default=4, help="concurrent fetches")
+    parser.add_argument('--rate', type=float, default=1.0,
+                        help="tracks sent to Genius per second (0 = unlimited)")
+    parser.add_argument('--progress', default='warm_cache_progress.jsonl',
+                        help="progress file for resuming ('' to disable)")
+    parser.add_argument('--cache-dir', default='lyrics_cache', help="lyrics cache directory")
+    parser.add_argument('--genius-api', default='https://api.genius.com',
+                        help="Genius API base URL (for testing against a stand-in server)")
+    args = parser.parse_args()
+
+    # Spotify is only needed to read a playlist
+    config = load_config(REQUIRED_CONFIG_KEYS if args.playlist else ['genius_access_token'])
+    if not config:
+        return 1
+
+    if args.playlist:
+        entries = load_playlist(config, args.playlist)
+    elif args.saved_tracks:
+        entries = load_saved_tracks(args.saved_tracks)
+    else:
+        entries = load_csv(args.csv)
+    if entries is None:
+        print("Could not load the playlist; see the error above")
+        return 1
+    if not entries:
+        print("No tracks to warm")
+        return 1
+
+    fetcher = GeniusLyricsFetcher(config['genius_access_token'], cache_dir=args.cache_dir)
+    fetcher.base_url = args.genius_api.rstrip('/')
+    progress = Progress(args.progress)
+
+    print(f"Warming lyrics for {len(entries)} tracks...")
+    started = time.monotonic()
+    counts = warm(fetcher, entries, progress, args.workers, args.rate)
+    elapsed = time.monotonic() - started
+
+    print("\n=== Summary ===")
+    print(f"Tracks:          {len(entries)}")
+    print(f"Already done:    {counts.pop('skipped')}")
+    print(f"Already cached:  {counts.pop('cached', 0)}")
+    print(f"Fetched:         {counts.pop('fetched', 0)}")
+    print(f"No Genius hit:   {counts.pop('no_hits', 0)}")
+    print(f"No lyrics:       {counts.pop('no_lyrics', 0)}")
+    failed = counts.pop(MISS_NETWORK, 0) + counts.pop(MISS_ERROR, 0) + sum(counts.values())
+    print(f"Failed (retry):  {failed}")
+    print(f"Time:            {elapsed:.1f} s")
+    http_stats = fetcher.http.get_stats() if hasattr(fetcher.http, 'get_stats') else None
+    if http_stats:
+        print(f"HTTP:            {json.dumps(http_stats)}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())